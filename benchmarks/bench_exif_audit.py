@@ -0,0 +1,56 @@
+"""Compare the Pillow _getexif() audit with the header-only exif_audit engine."""
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gpfix.exif_audit import audit_file, audit_files
+
+def exif_jpeg(date):
+    """Build a small JPEG whose APP1 segment holds DateTimeOriginal and CreateDate."""
+    value = date.encode() + b'\0'
+    # Header, IFD0 (Exif pointer only) at 8, Exif IFD at 26, values at 56
+    tiff = b'II' + struct.pack('<HI', 42, 8)
+    tiff += struct.pack('<H', 1) + struct.pack('<HHII', 0x8769, 4, 1, 26) + b'\0' * 4
+    tiff += struct.pack('<H', 2) + struct.pack('<HHII', 0x9003, 2, 20, 56) + struct.pack('<HHII', 0x9004, 2, 20, 76) + b'\0' * 4
+    tiff += value * 2
+    app1 = b'Exif\0\0' + tiff
+    # A few KB of stand-in scan data so the files are not all header
+    return b'\xff\xd8\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + b'\xff\xda\0\x02' + b'\0' * 4096 + b'\xff\xd9'
+
+def pillow_audit(path):
+    """The original check: open with Pillow and read tags 36867/36868."""
+    from PIL import Image
+    with Image.open(path) as image:
+        exif_data = image._getexif()
+    return exif_data and (exif_data.get(36867) or exif_data.get(36868))
+
+def timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed:7.3f}s {count / elapsed:10.0f} files/s")
+
+def main(count=5000):
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        data = exif_jpeg('2020:01:01 12:00:00')
+        for number in range(count):
+            path = Path(root) / f'IMG_{number:06d}.jpg'
+            path.write_bytes(data)
+            paths.append(str(path))
+
+        print(f"Files: {count}")
+        try:
+            import PIL  # noqa: F401
+            timed("Pillow _getexif", count, lambda: [pillow_audit(path) for path in paths])
+        except ImportError:
+            print("Pillow not installed, skipping the Pillow path")
+        timed("Header-only, serial", count, lambda: [audit_file(path) for path in paths])
+        timed("Header-only, pool", count, lambda: list(audit_files(paths)))
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
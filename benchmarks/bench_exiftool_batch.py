@@ -0,0 +1,55 @@
+"""Measure exiftool write throughput (files/s) for different batch sizes.
+
+Uses the real exiftool when EXIFTOOL_PATH points at it, otherwise the
+fake_exiftool.py stand-in (see its docstring for latency settings).
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('EXIFTOOL_PATH', str(Path(__file__).resolve().parent / 'fake_exiftool.py'))
+
+from gpfix.exiftool_pool import ExiftoolBatcher, ExiftoolPool
+
+def run(files, batch_size, pool_size=4):
+    """Write three date tags to every file and return files per second."""
+    pool = ExiftoolPool(size=pool_size)
+    batcher = ExiftoolBatcher(pool, batch_size=batch_size, flush_interval=0.05)
+    start = time.perf_counter()
+
+    def submit_all(chunk):
+        return [batcher.submit([
+            '-DateTimeOriginal=2020:01:01 12:00:00',
+            '-CreateDate=2020:01:01 12:00:00',
+            '-ModifyDate=2020:01:01 12:00:00',
+            str(path),
+        ]) for path in chunk]
+
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        chunks = [files[i::pool_size] for i in range(pool_size)]
+        futures = [future for chunk_futures in executor.map(submit_all, chunks) for future in chunk_futures]
+    batcher.close()
+    wait(futures)
+    elapsed = time.perf_counter() - start
+    pool.close()
+    failed = sum(1 for future in futures if future.result().returncode != 0)
+    return len(files) / elapsed, failed
+
+def main(count=2048):
+    with tempfile.TemporaryDirectory() as root:
+        files = []
+        for number in range(count):
+            path = Path(root) / f'IMG_{number:06d}.jpg'
+            path.touch()
+            files.append(path)
+        print(f"exiftool: {os.environ['EXIFTOOL_PATH']}, files: {count}")
+        for batch_size in (1, 32, 256):
+            rate, failed = run(files, batch_size)
+            print(f"batch size {batch_size:>3}: {rate:8.0f} files/s ({failed} failed)")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
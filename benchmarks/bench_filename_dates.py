@@ -0,0 +1,71 @@
+"""Compare the original per-pattern re.search + strptime loop with filename_dates.extract_date."""
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gpfix.filename_dates import extract_date
+
+# The patterns and loop extract_dates.py used before filename_dates
+patterns = [
+    r'Screenshot_(\d{4})(\d{2})(\d{2})-(\d{2})-(\d{2})-(\d{2})',
+    r'Screenshot_(\d{4})-(\d{2})-(\d{2})-(\d{2})-(\d{2})-(\d{2})',
+    r'IMG_(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})',
+    r'_(\d{4})(\d{2})(\d{2})_',
+    r'-(\d{4})(\d{2})(\d{2})-',
+    r'IMG-(\d{4})(\d{2})(\d{2})-WA.*',
+]
+
+def original_extract(filename):
+    for pattern in patterns:
+        match = re.search(pattern, filename)
+        if match:
+            try:
+                if len(match.groups()) == 6:
+                    date_str = f"{match.group(1)}-{match.group(2)}-{match.group(3)} {match.group(4)}:{match.group(5)}:{match.group(6)}"
+                    date_obj = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
+                elif len(match.groups()) == 4:
+                    date_str = f"{match.group(1)}-{match.group(2)}-{match.group(3)} {match.group(4)}:00:00"
+                    date_obj = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
+                else:
+                    continue
+                return date_obj
+            except ValueError:
+                continue
+    return None
+
+def synthetic_names(count, seed=0):
+    """Generate a mix of camera, screenshot, messenger and undated file names."""
+    rng = random.Random(seed)
+    templates = [
+        'IMG_{Y}{m}{d}_{H}{M}{S}.jpg', 'PXL_{Y}{m}{d}_{H}{M}{S}123.jpg', 'VID_{Y}{m}{d}_{H}{M}{S}.mp4',
+        'Screenshot_{Y}{m}{d}-{H}{M}{S}.png', 'Screenshot_{Y}-{m}-{d}-{H}-{M}-{S}.png',
+        'IMG-{Y}{m}{d}-WA{S}01.jpg', 'signal-{Y}-{m}-{d}-{H}{M}{S}.jpg', 'DSC{S}{M}{H}.JPG', 'image{S}.png',
+    ]
+    names = []
+    for _ in range(count):
+        names.append(rng.choice(templates).format(
+            Y=rng.randint(2005, 2024), m=f'{rng.randint(1, 12):02d}', d=f'{rng.randint(1, 28):02d}',
+            H=f'{rng.randint(0, 23):02d}', M=f'{rng.randint(0, 59):02d}', S=f'{rng.randint(0, 59):02d}'))
+    return names
+
+def timed(label, func, names):
+    start = time.perf_counter()
+    dated = sum(1 for name in names if func(name))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:7.2f}s  {len(names) / elapsed:10.0f} names/s  {dated} dated")
+    return elapsed
+
+def main(count=1_000_000):
+    names = synthetic_names(count)
+    print(f"File names: {count}")
+    before = timed("original", original_extract, names)
+    after = timed("filename_dates", extract_date, names)
+    print(f"Speedup: {before / after:.1f}x")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
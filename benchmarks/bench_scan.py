@@ -0,0 +1,57 @@
+"""Compare a serial os.walk with the parallel file_scanner over a synthetic takeout.
+
+Usage: python3 benchmarks/bench_scan.py [number of files] [seconds per directory read] [workers]
+
+Local disks answer directory reads from cache, so the difference is small
+there. A latency per directory read (e.g. 0.005) stands in for the round
+trip to an NFS or SMB share, which is where reading directories in parallel
+pays off.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarks_dir, '..'))
+sys.path.insert(0, benchmarks_dir)
+
+from gpfix import file_scanner
+from synthetic_takeout import generate
+
+def walk(directory):
+    return [os.path.join(root, file) for root, dirs, files in os.walk(directory) for file in files]
+
+def parallel_scan(directory, workers):
+    return [entry.path for entry in file_scanner.scan(directory, workers=workers)]
+
+def with_latency(latency):
+    """Make every os.scandir call wait latency seconds first, as a network file system would."""
+    scandir = os.scandir
+
+    def slow_scandir(path='.'):
+        time.sleep(latency)
+        return scandir(path)
+
+    os.scandir = slow_scandir
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else file_scanner.scan_workers
+    work = tempfile.mkdtemp()
+    try:
+        generate(work, count)
+        if latency:
+            with_latency(latency)
+        for name, run in (('os.walk', walk), (f'file_scanner ({workers} workers)', lambda directory: parallel_scan(directory, workers))):
+            start = time.perf_counter()
+            found = run(work)
+            elapsed = time.perf_counter() - start
+            print(f'{name:28} {elapsed:7.3f}s  {len(found) / elapsed:10.0f} files/s  {len(found)} files')
+    finally:
+        shutil.rmtree(work)
+
+if __name__ == '__main__':
+    main()
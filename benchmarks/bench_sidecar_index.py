@@ -0,0 +1,53 @@
+"""Compare the per-file os.walk sidecar search with a single-pass SidecarIndex."""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gpfix.sidecar_index import build_sidecar_index
+
+def make_tree(root, albums, files_per_album):
+    """Create a synthetic takeout with one JSON sidecar per media file."""
+    media = []
+    for album in range(albums):
+        album_dir = Path(root) / f'Album {album}'
+        album_dir.mkdir(parents=True)
+        for number in range(files_per_album):
+            name = f'IMG_{album:04d}{number:05d}.jpg'
+            (album_dir / name).touch()
+            (album_dir / (name + '.json')).write_text('{}')
+            media.append(album_dir / name)
+    return media
+
+def walk_lookup(source_dir, image_file):
+    """The original find_json_file: walk the whole tree for each file."""
+    for root, _, files in os.walk(source_dir):
+        json_filename = image_file + '.json'
+        if json_filename in files:
+            return Path(root) / json_filename
+    return None
+
+def main(albums=20, files_per_album=100):
+    with tempfile.TemporaryDirectory() as root:
+        media = make_tree(root, albums, files_per_album)
+
+        start = time.perf_counter()
+        for path in media:
+            walk_lookup(root, path.name)
+        walk_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = build_sidecar_index(root)
+        for path in media:
+            index.lookup(path)
+        index_time = time.perf_counter() - start
+
+    print(f"Files: {len(media)}")
+    print(f"os.walk per file: {walk_time:.3f}s")
+    print(f"Sidecar index:    {index_time:.3f}s ({walk_time / index_time:.0f}x faster)")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
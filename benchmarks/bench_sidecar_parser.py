@@ -0,0 +1,87 @@
+"""Compare reading sidecars with json.load against sidecar_parser, in a process pool and from its cache.
+
+Usage: python3 benchmarks/bench_sidecar_parser.py [number of sidecars] [people per sidecar]
+
+People entries pad the sidecars the way tagged faces do in real takeouts.
+"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from gpfix import sidecar_parser
+from gpfix.sidecar_parser import SidecarStore, parse_many
+
+def create_sidecars(directory, count, people):
+    """Write count sidecars over 100 folders; return their paths."""
+    rng = random.Random(0)
+    paths = []
+    for index in range(count):
+        folder = os.path.join(directory, f'Photos from {2000 + index % 100}')
+        os.makedirs(folder, exist_ok=True)
+        timestamp = str(rng.randrange(946684800, 1700000000))
+        data = {
+            'title': f'IMG_{index}.jpg',
+            'description': '',
+            'imageViews': '3',
+            'creationTime': {'timestamp': timestamp, 'formatted': '1 Jan 2020, 00:00:00 UTC'},
+            'photoTakenTime': {'timestamp': timestamp, 'formatted': '1 Jan 2020, 00:00:00 UTC'},
+            'geoData': {'latitude': rng.uniform(-60, 70), 'longitude': rng.uniform(-180, 180),
+                        'altitude': 0.0, 'latitudeSpan': 0.0, 'longitudeSpan': 0.0},
+            'geoDataExif': {'latitude': 0.0, 'longitude': 0.0, 'altitude': 0.0, 'latitudeSpan': 0.0, 'longitudeSpan': 0.0},
+            'people': [{'name': f'Person {rng.randrange(1000)}'} for _ in range(people)],
+            'url': f'https://photos.google.com/photo/{index:032x}',
+            'googlePhotosOrigin': {'mobileUpload': {'deviceType': 'ANDROID_PHONE'}},
+        }
+        path = os.path.join(folder, f'IMG_{index}.jpg.json')
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=2)
+        paths.append(path)
+    return paths
+
+def json_load(paths):
+    """The previous way: load each whole sidecar with json.load."""
+    result = {}
+    for path in paths:
+        with open(path) as file:
+            data = json.load(file)
+        result[path] = (data.get('photoTakenTime', {}).get('timestamp', ''), data.get('creationTime', {}).get('timestamp', ''))
+    return result
+
+def serial_parse(paths):
+    return {path: sidecar_parser.parse_file(path) for path in paths}
+
+def store_parse(paths, cache_file):
+    store = SidecarStore(cache_file)
+    store.prefetch(paths)
+    result = {path: store.get(path) for path in paths}
+    store.close()
+    return result
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    people = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    work = tempfile.mkdtemp()
+    try:
+        paths = create_sidecars(work, count, people)
+        cache_file = os.path.join(work, 'sidecar-cache.sqlite')
+        backend = 'orjson' if sidecar_parser.orjson else 'json'
+        for name, run in (('json.load', json_load),
+                          (f'sidecar_parser ({backend})', serial_parse),
+                          ('parse_many (process pool)', parse_many),
+                          ('SidecarStore, cold cache', lambda paths: store_parse(paths, cache_file)),
+                          ('SidecarStore, warm cache', lambda paths: store_parse(paths, cache_file))):
+            start = time.perf_counter()
+            parsed = run(paths)
+            elapsed = time.perf_counter() - start
+            print(f'{name:28} {elapsed:7.3f}s  {len(parsed) / elapsed:9.0f} sidecars/s')
+    finally:
+        shutil.rmtree(work)
+
+if __name__ == '__main__':
+    main()
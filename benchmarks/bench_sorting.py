@@ -0,0 +1,69 @@
+"""Compare the old serial sorter with the FileMover engine over synthetic files.
+
+Usage: python3 benchmarks/bench_sorting.py [number of files] [workers]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# sorting logs to ~/takeout-put at import time, so give it a scratch home
+os.environ['HOME'] = tempfile.mkdtemp()
+os.makedirs(os.path.join(os.environ['HOME'], 'takeout-put'))
+
+from gpfix import sorting
+from gpfix.file_mover import FileMover
+
+PREFIXES = ('IMG_', 'VID_', 'IMG-20200101-WA', 'VID-20200101-WA', 'PXL_', 'Screenshot_', 'Snapchat-', 'photo_')
+
+def create_files(directory, count):
+    """Create count empty files spread over 100 subfolders, with a few clashing names."""
+    for index in range(count):
+        folder = os.path.join(directory, f'album{index % 100}')
+        os.makedirs(folder, exist_ok=True)
+        # Every 50th name repeats the one created just before it, in another folder
+        number = index - 1 if index % 50 == 0 and index else index
+        open(os.path.join(folder, f'{PREFIXES[number % len(PREFIXES)]}{number}.jpg'), 'w').close()
+
+def serial_sort(directory, output):
+    """The previous engine: a walk, then one makedirs and shutil.move per file."""
+    file_paths = [os.path.join(root, file) for root, dirs, files in os.walk(directory) for file in files]
+    for src_path in file_paths:
+        dest_folder = os.path.join(output, os.path.basename(sorting.classify(os.path.basename(src_path))))
+        os.makedirs(dest_folder, exist_ok=True)
+        shutil.move(src_path, os.path.join(dest_folder, os.path.basename(src_path)))
+
+def parallel_sort(directory, output, workers):
+    """The new engine: one pruned walk, folders created once, concurrent renames."""
+    sorting.output_dir = output
+    sorting.destination_dirs = {folder: os.path.join(output, folder) for folder in sorting.destination_dirs}
+    moves, originals = sorting.collect_files(directory)
+    mover = FileMover(workers=workers)
+    mover.prepare(sorting.destination_dirs.values())
+    for src_path, dest_path, error in mover.move_all(moves):
+        if error:
+            raise error
+
+def count_files(directory):
+    return sum(len(files) for root, dirs, files in os.walk(directory))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else sorting.mover_workers
+    for name, run in (('serial shutil.move', serial_sort),
+                      (f'FileMover ({workers} workers)', lambda source, output: parallel_sort(source, output, workers))):
+        work = tempfile.mkdtemp()
+        source = os.path.join(work, 'source')
+        output = os.path.join(source, 'final')
+        create_files(source, count)
+        start = time.perf_counter()
+        run(source, output)
+        elapsed = time.perf_counter() - start
+        print(f'{name:28} {elapsed:7.2f}s  {count / elapsed:9.0f} files/s  {count_files(output)} files sorted')
+        shutil.rmtree(work)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Stand-in for exiftool used by the benchmarks.
+
+Understands plain invocations and `-stay_open True -@ -`. Tag writes are not
+applied; each existing file is reported as updated, missing files as errors.
+Set FAKE_EXIFTOOL_STARTUP, FAKE_EXIFTOOL_OVERHEAD and FAKE_EXIFTOOL_LATENCY
+(seconds) to simulate interpreter startup, per-command and per-file work, and
+FAKE_EXIFTOOL_HANG to a file name to make any command on that file hang.
+"""
+import os
+import sys
+import time
+
+startup = float(os.environ.get('FAKE_EXIFTOOL_STARTUP', '0'))
+overhead = float(os.environ.get('FAKE_EXIFTOOL_OVERHEAD', '0'))
+latency = float(os.environ.get('FAKE_EXIFTOOL_LATENCY', '0'))
+hang = os.environ.get('FAKE_EXIFTOOL_HANG')
+
+def run(args):
+    """Execute one command; return the exit status exiftool would use."""
+    time.sleep(overhead)
+    files = []
+    echo4 = []
+    writes = False
+    args = iter(args)
+    for arg in args:
+        if arg in ('-echo4', '-echo3', '-echo'):
+            value = next(args, '')
+            (echo4 if arg == '-echo4' else []).append(value)
+            if arg != '-echo4':
+                print(value)
+        elif arg.startswith('-'):
+            writes = writes or '=' in arg
+        else:
+            files.append(arg)
+    updated = failed = 0
+    for file_name in files:
+        time.sleep(latency)
+        while file_name == hang:
+            time.sleep(60)
+        if os.path.isfile(file_name):
+            updated += 1
+            if not writes:
+                print(f"File Name                       : {os.path.basename(file_name)}")
+        else:
+            failed += 1
+            print(f"Error: File not found - {file_name}", file=sys.stderr)
+    if writes:
+        print(f"    {updated} image files updated")
+        if failed:
+            print(f"    {failed} files weren't updated due to errors")
+    for value in echo4:
+        print(value, file=sys.stderr)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return 1 if failed else 0
+
+def stay_open():
+    """Read argument lines from stdin, running a command at each -executeN."""
+    args = []
+    lines = iter(sys.stdin.readline, '')
+    for line in lines:
+        arg = line.rstrip('\n')
+        if arg == '-stay_open':
+            if next(lines, 'False').strip() == 'False':
+                return
+            continue
+        if arg.startswith('-execute'):
+            run(args)
+            args = []
+            print(f"{{ready{arg[len('-execute'):]}}}", flush=True)
+        else:
+            args.append(arg)
+
+def main(argv):
+    time.sleep(startup)
+    if argv[:4] == ['-stay_open', 'True', '-@', '-']:
+        stay_open()
+        return 0
+    return run(argv)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
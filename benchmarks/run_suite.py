@@ -0,0 +1,188 @@
+"""Run every script end to end on a synthetic takeout and record how long each one takes.
+
+Usage: python3 benchmarks/run_suite.py [--scale 1k|100k|1M] [--latency SECONDS] [--output FILE] [--compare FILE]
+
+A takeout is generated (see synthetic_takeout.py) in a scratch home
+directory, and process_images, extract_dates, sorting and
+check_no_of_processed_images run one after the other against it, as the
+README describes, with benchmarks/fake_exiftool.py standing in for exiftool.
+For each script the results file records wall time, files/s, user and
+system CPU time, peak RSS (of the script, and of the exiftool processes it
+started), read/write syscall counts and context switches. --compare prints
+the ratio to an earlier results file, so runs from two commits can be put
+side by side.
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import platform
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+benchmarks_dir = Path(__file__).resolve().parent
+repo_dir = benchmarks_dir.parent
+
+sys.path.insert(0, str(benchmarks_dir))
+
+from synthetic_takeout import generate
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+# Each step: (name, script, extra arguments, lines typed at its prompts, folder under
+# the home directory holding its input files)
+STEPS = [
+    ('process_images', 'process_images.py', [], 'n\ny\n', 'takeout'),
+    ('extract_dates', 'extract_dates.py', [], '', 'takeout-put/noexifdata'),
+    ('sorting', 'sorting.py', [], '', 'takeout-put'),
+    ('check', 'check_no_of_processed_images.py', [], '', 'takeout-put/final'),
+]
+
+# With --fused, process_images does the work of extract_dates and sorting in the same pass
+FUSED_STEPS = [
+    ('process_images --fused', 'process_images.py', ['--fused'], 'n\n', 'takeout'),
+    ('check', 'check_no_of_processed_images.py', [], '', 'takeout-put/final'),
+]
+
+def parse_scale(value):
+    return SCALES.get(value) or int(value)
+
+def count_media(directory):
+    """Count files that are not sidecars, logs or databases under directory."""
+    count = 0
+    for root, dirs, files in os.walk(directory):
+        count += sum(1 for name in files if not name.endswith(('.json', '.jsonl', '.sqlite', '.sqlite-wal', '.sqlite-shm')))
+    return count
+
+def measure_child(stats_file, script, args):
+    """Run script as __main__ in this process and write its resource usage to stats_file at exit."""
+    def dump():
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        stats = {
+            'user_s': usage.ru_utime,
+            'system_s': usage.ru_stime,
+            'peak_rss_kb': usage.ru_maxrss,
+            'children_peak_rss_kb': children.ru_maxrss,
+            'voluntary_context_switches': usage.ru_nvcsw,
+            'involuntary_context_switches': usage.ru_nivcsw,
+        }
+        try:
+            # Linux only: read-like and write-like syscalls made by every thread
+            with open('/proc/self/io') as file:
+                io = dict(line.split(': ') for line in file.read().splitlines())
+            stats['read_syscalls'] = int(io['syscr'])
+            stats['write_syscalls'] = int(io['syscw'])
+        except OSError:
+            pass
+        with open(stats_file, 'w') as file:
+            json.dump(stats, file)
+
+    atexit.register(dump)
+    sys.argv = [script] + args
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name='__main__')
+
+def run_step(name, script, args, answers, home, env, files):
+    """Run one script in a child process; return its measurements."""
+    stats_file = os.path.join(home, f"{name.split()[0]}-stats.json")
+    command = [sys.executable, __file__, '--measure-child', stats_file, str(repo_dir / script)] + args
+    start = time.perf_counter()
+    result = subprocess.run(command, input=answers, env=env, cwd=home, text=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} failed with exit status {result.returncode}:\n{result.stderr}")
+    with open(stats_file) as file:
+        stats = json.load(file)
+    return dict(name=name, files=files, wall_s=round(elapsed, 3),
+                files_per_s=round(files / elapsed, 1) if elapsed else None, **stats)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    before = {step['name']: step for step in baseline['steps']} if baseline else {}
+    print(f"{'step':<24} {'files':>9} {'wall s':>9} {'files/s':>10} {'RSS MB':>8} {'syscalls':>10}" + ('  vs baseline' if before else ''))
+    for step in results['steps']:
+        syscalls = step.get('read_syscalls', 0) + step.get('write_syscalls', 0)
+        line = (f"{step['name']:<24} {step['files']:>9} {step['wall_s']:>9.2f} {step['files_per_s'] or 0:>10.0f} "
+                f"{step['peak_rss_kb'] / 1024:>8.1f} {syscalls:>10}")
+        old = before.get(step['name'])
+        if old and old['wall_s']:
+            line += f"  {step['wall_s'] / old['wall_s']:.2f}x time"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scripts end to end on a synthetic takeout.")
+    parser.add_argument('--scale', type=parse_scale, default=SCALES['1k'], help="number of media files: 1k, 100k, 1M or a number")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the generated takeout")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the fake exiftool spends per file")
+    parser.add_argument('--overhead', type=float, default=0.0, help="seconds the fake exiftool spends per command")
+    parser.add_argument('--fused', action='store_true', help="run process_images --fused instead of the three separate steps")
+    parser.add_argument('--output', default='benchmark-results.json', help="results file to write")
+    parser.add_argument('--compare', metavar='FILE', help="earlier results file to compare with")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch home directory")
+    parser.add_argument('--measure-child', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_child:
+        stats_file, script, *script_args = args.measure_child
+        measure_child(stats_file, script, script_args)
+        return
+
+    home = tempfile.mkdtemp(prefix='gpfix-bench-')
+    env = dict(os.environ, HOME=home, EXIFTOOL_PATH=str(benchmarks_dir / 'fake_exiftool.py'),
+               FAKE_EXIFTOOL_LATENCY=str(args.latency), FAKE_EXIFTOOL_OVERHEAD=str(args.overhead))
+    try:
+        print(f"Generating {args.scale} files in {home}...")
+        start = time.perf_counter()
+        takeout = generate(os.path.join(home, 'takeout'), args.scale, args.seed)
+        generate_s = time.perf_counter() - start
+
+        results = {
+            'commit': git_commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'exiftool_latency': args.latency,
+            'exiftool_overhead': args.overhead,
+            'fused': args.fused,
+            'takeout': dict(takeout, generate_s=round(generate_s, 3)),
+            'steps': [],
+        }
+        for name, script, script_args, answers, input_dir in (FUSED_STEPS if args.fused else STEPS):
+            files = count_media(os.path.join(home, input_dir))
+            print(f"Running {name} on {files} files...")
+            results['steps'].append(run_step(name, script, script_args, answers, home, env, files))
+
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+        baseline = None
+        if args.compare:
+            with open(args.compare) as file:
+                baseline = json.load(file)
+        print()
+        print_results(results, baseline)
+        print(f"\nResults written to {args.output}")
+    finally:
+        if args.keep:
+            print(f"Scratch directory kept at {home}")
+        else:
+            shutil.rmtree(home, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
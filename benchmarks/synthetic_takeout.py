@@ -0,0 +1,182 @@
+"""Generate a synthetic Google Photos takeout tree for the benchmarks.
+
+Usage: python3 benchmarks/synthetic_takeout.py DIRECTORY [number of files] [seed]
+
+The tree looks like an extracted takeout: 'Takeout/Google Photos/Photos from
+YYYY' folders plus album folders repeating some of their files. Media files
+are tiny but valid: JPEGs and PNGs with EXIF dates and offsets, MP4s with a movie header,
+and a share of JPEGs without EXIF. Sidecars follow Google's naming quirks:
+names truncated to 46/47 characters, '.supplemental-metadata.json', 'IMG.jpg(1).json' for
+'IMG(1).jpg', and edited copies sharing the original's sidecar. Some files have
+no sidecar at all and only a date in their name.
+"""
+import datetime
+import json
+import os
+import random
+import struct
+import sys
+import zlib
+
+# Share of files that get copied into an album folder as well
+album_duplicate_ratio = 0.2
+
+# Share of files without a sidecar, left for extract_dates
+no_sidecar_ratio = 0.1
+
+# Share of sidecars using the newer '.supplemental-metadata.json' name
+supplemental_ratio = 0.5
+
+QUICKTIME_EPOCH = datetime.datetime(1904, 1, 1)
+
+def tiff_dates(date, offset='+00:00'):
+    """Build a little-endian TIFF structure with ModifyDate in IFD0 and DateTimeOriginal/CreateDate/OffsetTimeOriginal in the Exif IFD."""
+    value = date.encode() + b'\0'
+    # Header at 0, IFD0 at 8 (ModifyDate, Exif pointer), Exif IFD at 38, values from 80
+    tiff = b'II' + struct.pack('<HI', 42, 8)
+    tiff += struct.pack('<H', 2) + struct.pack('<HHII', 0x0132, 2, 20, 80) + struct.pack('<HHII', 0x8769, 4, 1, 38)
+    tiff += b'\0' * 4
+    tiff += (struct.pack('<H', 3) + struct.pack('<HHII', 0x9003, 2, 20, 100) + struct.pack('<HHII', 0x9004, 2, 20, 120)
+             + struct.pack('<HHII', 0x9011, 2, 7, 140))
+    tiff += b'\0' * 4
+    return tiff + value * 3 + offset.encode() + b'\0'
+
+def jpeg_stub(date=None):
+    """A minimal JPEG, with an Exif segment holding date if given."""
+    if date is None:
+        return b'\xff\xd8\xff\xda\0\x02\0\0\xff\xd9'
+    app1 = b'Exif\0\0' + tiff_dates(date)
+    return b'\xff\xd8\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + b'\xff\xda\0\x02\0\0\xff\xd9'
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def png_stub(date):
+    """A 1x1 PNG with an eXIf chunk holding date."""
+    return (b'\x89PNG\r\n\x1a\n'
+            + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+            + png_chunk(b'eXIf', tiff_dates(date))
+            + png_chunk(b'IDAT', zlib.compress(b'\0\0'))
+            + png_chunk(b'IEND', b''))
+
+def mp4_stub(moment):
+    """An MP4 with only ftyp and a moov/mvhd box carrying moment as creation and modification time."""
+    seconds = int((moment - QUICKTIME_EPOCH).total_seconds())
+    mvhd = struct.pack('>B3xIIII', 0, seconds, seconds, 1000, 0) + b'\0' * 80
+    moov = struct.pack('>I4s', 8 + 8 + len(mvhd), b'moov') + struct.pack('>I4s', 8 + len(mvhd), b'mvhd') + mvhd
+    return struct.pack('>I4s4sI', 16, b'ftyp', b'isom', 0) + moov
+
+def media_name(kind, moment, number):
+    """Return a file name in the style of the given kind of source."""
+    stamp = moment.strftime('%Y%m%d_%H%M%S')
+    if kind == 'camera':
+        return f'IMG_{stamp}.jpg'
+    if kind == 'pixel':
+        return f'PXL_{stamp}{number % 1000:03d}.jpg'
+    if kind == 'screenshot':
+        return f"Screenshot_{moment.strftime('%Y%m%d-%H%M%S')}.png"
+    if kind == 'whatsapp':
+        return f"IMG-{moment.strftime('%Y%m%d')}-WA{number % 10000:04d}.jpg"
+    if kind == 'video':
+        return f'VID_{stamp}.mp4'
+    if kind == 'long':
+        return f'received_photo_from_a_friend_with_a_long_name_{number}.jpg'
+    return f'photo{number}.jpg'
+
+KINDS = ('camera', 'camera', 'camera', 'pixel', 'screenshot', 'whatsapp', 'video', 'long', 'plain', 'plain')
+
+def media_bytes(name, moment, rng):
+    """Content for a media file; a fifth of the JPEGs carry no EXIF."""
+    date = moment.strftime('%Y:%m:%d %H:%M:%S')
+    if name.endswith('.png'):
+        return png_stub(date)
+    if name.endswith('.mp4'):
+        return mp4_stub(moment)
+    return jpeg_stub(date if rng.random() >= 0.2 else None)
+
+def sidecar_name(media, rng):
+    """Return the sidecar file name Google would use for media."""
+    stem, ext = os.path.splitext(media)
+    counter = ''
+    if stem.endswith(')') and '(' in stem:
+        stem, counter = stem[:stem.rindex('(')], stem[stem.rindex('('):]
+    name = stem + ext
+    if rng.random() < supplemental_ratio:
+        return (name + '.supplemental-metadata')[:46] + counter + '.json'
+    return name[:47] + counter + '.json'
+
+def sidecar(media, moment, rng):
+    timestamp = str(int(moment.replace(tzinfo=datetime.timezone.utc).timestamp()))
+    return json.dumps({
+        'title': media,
+        'creationTime': {'timestamp': timestamp},
+        'photoTakenTime': {'timestamp': timestamp},
+        'geoData': {'latitude': round(rng.uniform(-60, 70), 6), 'longitude': round(rng.uniform(-180, 180), 6)},
+    })
+
+def generate(directory, count, seed=0):
+    """Write a takeout tree with count media files (album copies included) under directory.
+
+    Returns a dict of counts describing what was written.
+    """
+    rng = random.Random(seed)
+    root = os.path.join(directory, 'Takeout', 'Google Photos')
+    stats = {'media': 0, 'sidecars': 0, 'album_copies': 0, 'without_sidecar': 0, 'bytes': 0}
+    used = set()
+    albums = [f'Album {index}' for index in range(max(1, count // 500))]
+    made = set()
+
+    def write(folder, name, data):
+        path = os.path.join(root, folder)
+        if folder not in made:
+            os.makedirs(path, exist_ok=True)
+            made.add(folder)
+        with open(os.path.join(path, name), 'wb') as file:
+            file.write(data)
+        stats['bytes'] += len(data)
+
+    number = 0
+    while stats['media'] < count:
+        number += 1
+        moment = datetime.datetime(2012, 1, 1) + datetime.timedelta(seconds=rng.randrange(12 * 365 * 86400))
+        name = media_name(rng.choice(KINDS), moment, number)
+        folder = f'Photos from {moment.year}'
+        if (folder, name) in used:
+            # A clash in the same folder is how Google ends up with 'IMG(1).jpg'
+            stem, ext = os.path.splitext(name)
+            name = f'{stem}(1){ext}'
+            if (folder, name) in used:
+                continue
+        used.add((folder, name))
+        data = media_bytes(name, moment, rng)
+        write(folder, name, data)
+        stats['media'] += 1
+
+        has_sidecar = rng.random() >= no_sidecar_ratio
+        if has_sidecar:
+            write(folder, sidecar_name(name, rng), sidecar(name, moment, rng).encode())
+            stats['sidecars'] += 1
+            if name.endswith('.jpg') and stats['media'] < count and rng.random() < 0.05:
+                # An edited copy sharing the original's sidecar
+                stem, ext = os.path.splitext(name)
+                write(folder, f'{stem}-edited{ext}', data + b'\0')
+                stats['media'] += 1
+        else:
+            stats['without_sidecar'] += 1
+
+        if stats['media'] < count and rng.random() < album_duplicate_ratio:
+            album = rng.choice(albums)
+            if (album, name) not in used:
+                used.add((album, name))
+                write(album, name, data)
+                if has_sidecar:
+                    write(album, sidecar_name(name, rng), sidecar(name, moment, rng).encode())
+                    stats['sidecars'] += 1
+                stats['media'] += 1
+                stats['album_copies'] += 1
+    return stats
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    print(generate(sys.argv[1], *(int(arg) for arg in sys.argv[2:4])))
@@ -0,0 +1,5 @@
+"""Google Photos Fixer: restore the dates of Google Photos Takeout files and sort them.
+
+The steps live in their own modules (process_images, extract_dates, sorting,
+check_no_of_processed_images) and run from the gpfix command (see cli).
+"""
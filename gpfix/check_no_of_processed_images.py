@@ -0,0 +1,124 @@
+import os
+from datetime import datetime
+import sys
+import logging
+import argparse
+
+from . import file_scanner
+from . import log_sink
+from .exif_audit import AUDIT_EXTENSIONS, DATED, ERROR, AuditCache, audit_files_cached, find_files, write_report
+
+# Log records go to the shared JSON-lines log (see log_sink)
+logger = logging.getLogger('check')
+cache_file = os.path.expanduser('~/takeout-put/check-cache.sqlite')
+
+# Function to print a text-based progress bar
+def print_progress_bar(iteration, total, prefix='', length=40, fill='█', print_end="\r"):
+    """Print a text-based progress bar."""
+    percent = ("{0:.1f}").format(100 * (iteration / float(total)))
+    filled_length = int(length * iteration // total)
+    bar = fill * filled_length + '-' * (length - filled_length)
+    sys.stdout.write(f'\r{prefix} |{bar}| {percent}% Complete')
+    sys.stdout.flush()
+    if iteration == total:
+        print()
+
+# Directory path to scan
+directory_to_scan = os.path.expanduser('~/takeout-put')
+
+def set_directories(destination):
+    """Scan destination, keeping the results cache there."""
+    global directory_to_scan, cache_file
+    directory_to_scan = os.path.expanduser(str(destination))
+    cache_file = os.path.join(directory_to_scan, 'check-cache.sqlite')
+
+# Get today's date in the format used by EXIF
+today_date_str = datetime.now().strftime('%Y:%m')
+
+# Function to check if a date is today's date
+def is_today(date_str):
+    return date_str.startswith(today_date_str) if date_str else False
+
+# Function to check if a date is not today's date
+def is_not_today(date_str):
+    return not is_today(date_str)
+
+def main(report=None, workers=None, rebuild=False, files=None, destination=None):
+    """Count files by the EXIF date they carry; files limits the count to those paths instead of scanning.
+
+    With destination, that folder is scanned instead of directory_to_scan (see set_directories).
+    """
+    if destination is not None:
+        set_directories(destination)
+    # Try to import tqdm for progress bar; imported here as it is slow to load
+    try:
+        from tqdm import tqdm
+        tqdm_installed = True
+    except ImportError:
+        tqdm_installed = False
+
+    # Initialize counters
+    count_today_exif_data = 0
+    count_other_dates_exif_data = 0
+    count_no_exif_data = 0
+
+    # Collect all files to process
+    if files is None:
+        all_files = list(find_files(directory_to_scan))
+    else:
+        all_files = [str(path) for path in files if str(path).lower().endswith(AUDIT_EXTENSIONS)]
+    total_files = len(all_files)
+    results = []
+
+    # Read EXIF headers of new or changed files in a process pool, with or without tqdm
+    cache = AuditCache(cache_file, rebuild=rebuild)
+    if tqdm_installed:
+        pbar = tqdm(total=total_files, file=sys.stdout, desc="Processing files")
+    for current_file, result in enumerate(audit_files_cached(all_files, cache, workers=workers), 1):
+        file_path = result.path
+        if result.status == DATED:
+            if is_today(result.date):
+                count_today_exif_data += 1
+                logger.info(f'Today\'s date EXIF file: {file_path}', extra={'file': file_path, 'stage': 'audit', 'outcome': 'today'})
+            elif is_not_today(result.date):
+                count_other_dates_exif_data += 1
+        elif result.status == ERROR:
+            print(f"Error processing {file_path}: {result.error}", file=sys.stderr)
+            count_no_exif_data += 1
+            logger.error(f'Error processing {file_path}: {result.error}', extra={'file': file_path, 'stage': 'audit', 'outcome': 'error'})
+        else:
+            count_no_exif_data += 1
+            logger.info(f'No EXIF data: {file_path}', extra={'file': file_path, 'stage': 'audit', 'outcome': 'no-exif'})
+        if report:
+            results.append(result)
+
+        # Update the progress bar
+        if tqdm_installed:
+            pbar.update(1)
+        else:
+            print_progress_bar(current_file, total_files, prefix='Progress')
+    if tqdm_installed:
+        pbar.close()
+    cache.close()
+
+    if report:
+        write_report(results, report)
+
+    # Print the results
+    print("\nProcessing complete.")
+    print(f"Files with EXIF data of today's date: {count_today_exif_data}")
+    print(f"Files with EXIF data of other dates: {count_other_dates_exif_data}")
+    print(f"Files with NO EXIF data: {count_no_exif_data}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count processed files by the EXIF date they carry.")
+    parser.add_argument('--report', metavar='FILE', help="write a per-file report; .csv for CSV, JSON otherwise")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--rebuild', action='store_true', help="ignore cached results and read every file again")
+    parser.add_argument('--follow-symlinks', action='store_true', help="also scan directories reached through symbolic links")
+    parser.add_argument('--log-level', choices=log_sink.LEVELS, default='info', help="least severe level written to the log")
+    args = parser.parse_args()
+    log_sink.configure(level=args.log_level)
+    file_scanner.follow_symlinks = args.follow_symlinks
+
+    main(report=args.report, workers=args.workers, rebuild=args.rebuild)
@@ -0,0 +1,150 @@
+"""gpfix: run the Google Photos Fixer steps from one command.
+
+    gpfix apply            restore EXIF dates from the JSON files (process_images.py)
+    gpfix date-from-name   set dates of the remaining files from their names (extract_dates.py)
+    gpfix sort             sort the results into folders by file name (sorting.py)
+    gpfix audit            count results by the EXIF date they carry (check_no_of_processed_images.py)
+    gpfix all              all of the above, in one process
+    gpfix all --fused      all of the above in a single pass, moving each file once
+
+Nothing is asked unless --check-first-batch is given, so runs can be
+scheduled unattended. The step modules are only imported once a command runs,
+so --help stays fast.
+"""
+import argparse
+import os
+import sys
+
+default_source = '~/takeout'
+default_destination = '~/takeout-put'
+
+# Same as log_sink.LEVELS; spelled out so --help does not load logging
+LEVELS = ('debug', 'info', 'warning', 'error')
+
+def setup(args):
+    """Start logging and metrics, and apply the options every step shares."""
+    from . import log_sink
+    from . import metrics
+    log_sink.configure(os.path.join(os.path.expanduser(args.destination), 'log.jsonl'), level=args.log_level)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    if args.follow_symlinks:
+        from . import file_scanner
+        file_scanner.follow_symlinks = True
+    if getattr(args, 'rewrite', False):
+        from . import tag_check
+        tag_check.skip_unchanged = False
+
+def run_apply(args):
+    from . import process_images
+    return process_images.process_files(args.check_first_batch, resume=args.resume, archives=args.archive,
+                                        dedup_mode=args.dedup, fused=getattr(args, 'fused', False),
+                                        source=args.source, destination=args.destination)
+
+def run_date_from_name(args, file_names=None):
+    from . import extract_dates
+    destination = os.path.expanduser(args.destination)
+    return extract_dates.process_files(os.path.join(destination, 'noexifdata'), os.path.join(destination, 'proc'),
+                                       resume=args.resume, file_names=file_names,
+                                       journal_path=os.path.join(destination, 'journal.sqlite'))
+
+def run_sort(args, files=None):
+    from . import sorting
+    return sorting.main(resume=args.resume, files=files, destination=args.destination)
+
+def run_audit(args, files=None):
+    from . import check_no_of_processed_images as check
+    check.main(report=args.report, workers=args.workers, rebuild=args.rebuild, files=files, destination=args.destination)
+
+def run_all(args):
+    """Run every step, handing each the files the previous one produced instead of walking the tree again.
+
+    With --resume, files left by an interrupted run are not known to this
+    run, so every step after the first walks its folder as the scripts do.
+    With --fused, the first step also sets dates from file names and sorts,
+    so only the audit follows it. The sort step is also handed the
+    '_original' backups exiftool left next to the files, which it deletes.
+    """
+    placed = run_apply(args)
+    if args.fused:
+        run_audit(args, None if args.resume else placed)
+        return
+    if args.resume:
+        run_date_from_name(args)
+        run_audit(args, run_sort(args))
+        return
+
+    from . import process_images
+    no_exif = [path for path in placed if path.parent == process_images.no_exif_data_dir]
+    moved = run_date_from_name(args, [path.name for path in no_exif])
+    renamed = {os.path.normpath(source): output for source, output in moved}
+    files = [renamed.get(os.path.normpath(path), str(path)) for path in placed]
+    run_audit(args, run_sort(args, files + original_backups(files)))
+
+def original_backups(files):
+    """Return the '<file>_original' backups exiftool left next to files, so the sort step deletes them."""
+    return [path + '_original' for path in files if os.path.lexists(path + '_original')]
+
+COMMANDS = {
+    'apply': run_apply,
+    'date-from-name': run_date_from_name,
+    'sort': run_sort,
+    'audit': run_audit,
+    'all': run_all,
+}
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--source', default=default_source, help="extracted takeout to read (default: %(default)s)")
+    common.add_argument('--destination', default=default_destination,
+                        help="folder for results, the journal and the log (default: %(default)s)")
+    common.add_argument('--resume', action='store_true', help="skip files an interrupted earlier run already handled")
+    common.add_argument('--follow-symlinks', action='store_true', help="also scan directories reached through symbolic links")
+    common.add_argument('--log-level', choices=LEVELS, default='info',
+                        help="least severe level written to the log")
+    common.add_argument('--profile', action='store_true', help="print per-stage timings at the end of the run")
+    common.add_argument('--profile-output', metavar='FILE', help="also dump cProfile stats to FILE (implies --profile)")
+    common.add_argument('--metrics-port', type=int, metavar='PORT', help="serve live counters at http://127.0.0.1:PORT/metrics")
+
+    writes = argparse.ArgumentParser(add_help=False)
+    writes.add_argument('--rewrite', action='store_true', help="write dates even to files that already hold them")
+
+    apply = argparse.ArgumentParser(add_help=False)
+    apply.add_argument('--archive', nargs='+', metavar='PART', help="read media from these Takeout .zip/.tgz parts instead of --source")
+    apply.add_argument('--dedup', choices=('link', 'report'),
+                       help="process one copy of identical files; hardlink the others to it, or list them in duplicates.csv")
+    apply.add_argument('--check-first-batch', action='store_true',
+                       help="show the EXIF data of the first 5 files and ask before going on")
+
+    audit = argparse.ArgumentParser(add_help=False)
+    audit.add_argument('--report', metavar='FILE', help="write a per-file report; .csv for CSV, JSON otherwise")
+    audit.add_argument('--workers', type=int, help="number of worker processes (default: one per CPU)")
+    audit.add_argument('--rebuild', action='store_true', help="ignore cached results and read every file again")
+
+    parser = argparse.ArgumentParser(prog='gpfix', description="Restore dates of Google Photos Takeout files and sort them.",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__.split('\n\n')[1])
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND', required=True)
+    commands.add_parser('apply', parents=[common, writes, apply], help="restore EXIF dates from the JSON files")
+    commands.add_parser('date-from-name', parents=[common, writes], help="set dates of files without JSON data from their names")
+    commands.add_parser('sort', parents=[common], help="sort the results into folders by file name")
+    commands.add_parser('audit', parents=[common, audit], help="count results by the EXIF date they carry")
+    all_steps = commands.add_parser('all', parents=[common, writes, apply, audit], help="run every step in one process")
+    all_steps.add_argument('--fused', action='store_true',
+                           help="tag, date from the file name and sort each file in one pass, moving it only once")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'dedup', None) and getattr(args, 'archive', None):
+        build_parser().error("--dedup works on an extracted takeout and cannot be combined with --archive")
+    setup(args)
+    command = COMMANDS[args.command]
+    if args.profile or args.profile_output:
+        from . import metrics
+        metrics.profile(lambda: command(args), args.profile_output)
+    else:
+        command(args)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
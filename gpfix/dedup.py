@@ -0,0 +1,102 @@
+import csv
+import hashlib
+import os
+import re
+import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from .journal import quick_hash
+
+# Threads hashing files at once; reading and hashing both release the GIL
+hash_workers = 4
+
+# Bytes read at a time for a full hash
+full_hash_chunk = 1024 * 1024
+
+# Google's year folders hold every photo; album folders hold copies of some of them
+YEAR_FOLDER = re.compile(r'Photos from \d{4}$')
+
+def full_hash(path):
+    """Hash the whole content of a file."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(full_hash_chunk), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def canonical_order(path):
+    """Sort key putting the copy to keep first: a year folder's copy, then the shortest path."""
+    path = str(path)
+    return not YEAR_FOLDER.search(os.path.dirname(path)), len(path), path
+
+def _refine(groups, hash_function, executor):
+    """Split each group of paths by hash_function, keeping only groups of two or more."""
+    paths = [path for group in groups for path in group]
+    digests = dict(zip(paths, executor.map(_try_hash(hash_function), paths)))
+    refined = []
+    for group in groups:
+        by_hash = defaultdict(list)
+        for path in group:
+            if digests[path] is not None:
+                by_hash[digests[path]].append(path)
+        refined.extend(same for same in by_hash.values() if len(same) > 1)
+    return refined
+
+def _try_hash(hash_function):
+    """Wrap hash_function so an unreadable file hashes to None and is left out."""
+    def run(path):
+        try:
+            return hash_function(path)
+        except OSError:
+            return None
+    return run
+
+def find_duplicates(paths, workers=None):
+    """Group files with identical content.
+
+    Files are grouped by size first; only files sharing a size get a quick
+    hash of their first and last 64 KB, and only those sharing that get a
+    full hash. Returns a dict mapping the copy to keep (see canonical_order)
+    to the list of its duplicates.
+    """
+    by_size = defaultdict(list)
+    for path in paths:
+        try:
+            by_size[os.path.getsize(path)].append(path)
+        except OSError:
+            continue
+    groups = [same for same in by_size.values() if len(same) > 1]
+
+    with ThreadPoolExecutor(max_workers=workers or hash_workers) as executor:
+        groups = _refine(groups, quick_hash, executor)
+        groups = _refine(groups, full_hash, executor)
+
+    duplicates = {}
+    for paths in groups:
+        paths = sorted(paths, key=canonical_order)
+        duplicates[paths[0]] = paths[1:]
+    return duplicates
+
+def link_duplicate(target, link_path):
+    """Make link_path a hardlink to target, or a copy where hardlinks are not possible.
+
+    Returns False without touching anything if link_path already exists.
+    """
+    if os.path.lexists(link_path):
+        return False
+    try:
+        os.link(target, link_path)
+    except OSError:
+        shutil.copy2(target, link_path)
+    return True
+
+def write_report(duplicates, path):
+    """Write a CSV listing each duplicate next to the copy kept in its place."""
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['canonical', 'duplicate', 'size'])
+        for canonical, copies in duplicates.items():
+            size = os.path.getsize(canonical)
+            for copy in copies:
+                writer.writerow([str(canonical), str(copy), size])
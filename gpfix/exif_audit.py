@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .file_scanner import scan
+from . import native_exif
+
+# Files the audit looks at
+AUDIT_EXTENSIONS = ('.jpg', '.jpeg', '.tiff', '.png', '.heic')
+
+# Result statuses
+DATED = 'dated'
+NO_EXIF = 'no_exif'
+ERROR = 'error'
+
+# Tags checked for a date, in order of preference
+DATE_TAGS = ('DateTimeOriginal', 'CreateDate')
+
+# How many files each worker process handles per task
+audit_chunk_size = 256
+
+# Entries kept in the audit cache; the least recently used are evicted beyond this
+audit_cache_max_entries = 1_000_000
+
+AuditResult = namedtuple('AuditResult', 'path date source_tag status error')
+
+def audit_file(path):
+    """Read the date of one file from its EXIF header only."""
+    try:
+        dates = native_exif.read_dates(path)
+    except Exception as e:
+        return AuditResult(path, None, None, ERROR, str(e))
+    for tag in DATE_TAGS:
+        if dates.get(tag):
+            return AuditResult(path, dates[tag], tag, DATED, None)
+    return AuditResult(path, None, None, NO_EXIF, None)
+
+def find_files(directory):
+    """Yield every file under directory with an extension the audit handles."""
+    for entry in scan(directory, extensions=AUDIT_EXTENSIONS):
+        yield entry.path
+
+def audit_files(paths, workers=None, chunk_size=None):
+    """Audit paths across a process pool, yielding an AuditResult per file in order."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(audit_file, paths, chunksize=chunk_size or audit_chunk_size)
+
+class AuditCache:
+    """Audit results stored in SQLite, keyed on (device, inode, size, mtime_ns).
+
+    A file that has not changed since it was last audited keeps the same key,
+    so its result can be reused without reading it. Entries are loaded into
+    memory when the cache opens. Each open is a new run; entries not used for
+    the most runs are evicted once there are more than max_entries.
+    """
+
+    def __init__(self, path, max_entries=None, rebuild=False):
+        self.max_entries = max_entries or audit_cache_max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS audit ('
+            'device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, '
+            'date TEXT, source_tag TEXT, status TEXT, run INTEGER, '
+            'PRIMARY KEY (device, inode, size, mtime_ns))'
+        )
+        if rebuild:
+            self.connection.execute('DELETE FROM audit')
+        self.run = (self.connection.execute('SELECT MAX(run) FROM audit').fetchone()[0] or 0) + 1
+        self.entries = {
+            row[:4]: row[4:] for row in self.connection.execute(
+                'SELECT device, inode, size, mtime_ns, date, source_tag, status FROM audit')
+        }
+        self.used = []
+        self.added = []
+
+    @staticmethod
+    def key(path):
+        """Return the cache key of the file at path."""
+        stat = os.stat(path)
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def get(self, path, key):
+        """Return the cached AuditResult for key, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.used.append(key)
+        date, source_tag, status = entry
+        return AuditResult(path, date, source_tag, status, None)
+
+    def put(self, key, result):
+        """Remember a result; errors are not cached so they are retried next time."""
+        if result.status != ERROR:
+            self.entries[key] = (result.date, result.source_tag, result.status)
+            self.added.append(key + (result.date, result.source_tag, result.status, self.run))
+
+    def close(self):
+        """Save new and used entries, evict the least recently used ones, and close the database."""
+        self.connection.executemany('UPDATE audit SET run = ? WHERE device = ? AND inode = ? AND size = ? AND mtime_ns = ?',
+                                    [(self.run,) + key for key in self.used])
+        self.connection.executemany('INSERT OR REPLACE INTO audit VALUES (?, ?, ?, ?, ?, ?, ?, ?)', self.added)
+        count = self.connection.execute('SELECT COUNT(*) FROM audit').fetchone()[0]
+        if count > self.max_entries:
+            self.connection.execute(
+                'DELETE FROM audit WHERE rowid IN (SELECT rowid FROM audit ORDER BY run LIMIT ?)',
+                (count - self.max_entries,))
+        self.connection.commit()
+        self.connection.close()
+
+def audit_files_cached(paths, cache, workers=None, chunk_size=None):
+    """Audit paths, answering unchanged files from cache and reading only new or modified ones.
+
+    Cached results are yielded first, then the results of the files that had to be read.
+    """
+    misses = []
+    for path in paths:
+        try:
+            key = cache.key(path)
+        except OSError as e:
+            yield AuditResult(path, None, None, ERROR, str(e))
+            continue
+        result = cache.get(path, key)
+        if result is None:
+            misses.append((path, key))
+        else:
+            yield result
+    if not misses:
+        return
+    for (path, key), result in zip(misses, audit_files([path for path, _ in misses], workers, chunk_size)):
+        cache.put(key, result)
+        yield result
+
+def write_report(results, path):
+    """Write results to path as JSON or CSV, depending on its extension."""
+    fields = AuditResult._fields
+    with open(path, 'w', newline='') as file:
+        if str(path).lower().endswith('.csv'):
+            writer = csv.writer(file)
+            writer.writerow(fields)
+            writer.writerows(results)
+        else:
+            json.dump([result._asdict() for result in results], file, indent=1)
@@ -0,0 +1,269 @@
+import atexit
+from concurrent.futures import Future
+import itertools
+import os
+import queue
+import subprocess
+import threading
+import time
+
+# Executable to run; override with EXIFTOOL_PATH (e.g. to point at a stand-in for testing)
+exiftool_path = os.environ.get('EXIFTOOL_PATH', 'exiftool')
+
+# Number of long-lived exiftool processes in the default pool
+default_pool_size = 4
+
+class ExiftoolWorker:
+    """A single `exiftool -stay_open True -@ -` process that executes commands sent over stdin."""
+
+    def __init__(self, executable=None):
+        self.executable = executable or exiftool_path
+        self.counter = itertools.count(1)
+        self.process = None
+        self.start()
+
+    def start(self):
+        """Launch the exiftool process and the threads that read its output."""
+        self.process = subprocess.Popen(
+            [self.executable, '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding='utf-8', errors='replace', bufsize=1,
+        )
+        self.stdout_lines = queue.Queue()
+        self.stderr_lines = queue.Queue()
+        for stream, lines in ((self.process.stdout, self.stdout_lines), (self.process.stderr, self.stderr_lines)):
+            threading.Thread(target=self._read_lines, args=(stream, lines), daemon=True).start()
+
+    @staticmethod
+    def _read_lines(stream, lines):
+        """Forward lines from a pipe to a queue; None marks end of stream."""
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def restart(self):
+        """Kill the current process (if any) and start a fresh one."""
+        self.stop(graceful=False)
+        self.start()
+
+    def stop(self, graceful=True):
+        """Shut the process down, asking it to exit cleanly when graceful is set."""
+        process = self.process
+        if process is None:
+            return
+        self.process = None
+        try:
+            if graceful and process.poll() is None:
+                process.stdin.write('-stay_open\nFalse\n')
+                process.stdin.flush()
+                process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        for stream in (process.stdin, process.stdout, process.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def _read_until(self, lines, marker, deadline, args, timeout):
+        """Collect lines up to the '{readyN}' marker, raising on timeout or a dead process."""
+        output = []
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(args, timeout)
+            try:
+                line = lines.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(args, timeout)
+            if line is None:
+                raise subprocess.CalledProcessError(self.process.poll() or -1, args, ''.join(output))
+            if line.rstrip('\r\n') == marker:
+                return ''.join(output)
+            output.append(line)
+
+    def execute(self, args, timeout=None):
+        """Run one exiftool command and return a CompletedProcess; restarts the process on timeout or crash."""
+        return self.execute_many([args], timeout=timeout)[0]
+
+    def execute_many(self, commands, timeout=None):
+        """Send several commands in one write and return a CompletedProcess for each.
+
+        Every command ends with its own -executeN, so exiftool reports success
+        or failure per command and one bad file does not fail the others.
+        The timeout covers the whole batch.
+        """
+        sections = []
+        markers = []
+        for args in commands:
+            number = next(self.counter)
+            marker = f'{{ready{number}}}'
+            markers.append(marker)
+            sections.extend(list(args) + ['-echo4', marker, f'-execute{number}'])
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        try:
+            if self.process is None or self.process.poll() is not None:
+                self.restart()
+            self.process.stdin.write(''.join(f'{arg}\n' for arg in sections))
+            self.process.stdin.flush()
+            for args, marker in zip(commands, markers):
+                stdout = self._read_until(self.stdout_lines, marker, deadline, args, timeout)
+                stderr = self._read_until(self.stderr_lines, marker, deadline, args, timeout)
+                returncode = 1 if any(line.startswith('Error') for line in stderr.splitlines()) else 0
+                results.append(subprocess.CompletedProcess(args, returncode, stdout, stderr))
+        except (subprocess.SubprocessError, OSError):
+            # A hung or crashed worker is replaced so the next command gets a clean process
+            self.restart()
+            raise
+        return results
+
+class ExiftoolPool:
+    """A fixed number of ExiftoolWorkers shared between threads."""
+
+    def __init__(self, size=default_pool_size, executable=None, timeout=30):
+        self.size = size
+        self.executable = executable
+        self.timeout = timeout
+        self.idle = queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+
+    def _checkout(self):
+        """Take an idle worker, starting a new one while the pool is below size."""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.workers) < self.size:
+                worker = ExiftoolWorker(self.executable)
+                self.workers.append(worker)
+                return worker
+        return self.idle.get()
+
+    def execute(self, args, timeout=None, check=False):
+        """Run exiftool with args on a pooled worker, like subprocess.run(['exiftool', *args])."""
+        worker = self._checkout()
+        try:
+            result = worker.execute(args, timeout=self.timeout if timeout is None else timeout)
+        finally:
+            self.idle.put(worker)
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, args, result.stdout, result.stderr)
+        return result
+
+    def execute_many(self, commands, timeout=None):
+        """Run a batch of exiftool commands on one pooled worker and return their results in order."""
+        worker = self._checkout()
+        try:
+            return worker.execute_many(commands, timeout=self.timeout if timeout is None else timeout)
+        finally:
+            self.idle.put(worker)
+
+    def close(self):
+        """Stop every worker in the pool."""
+        with self.lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.stop()
+        self.idle = queue.Queue()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide exiftool pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ExiftoolPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+def run_exiftool(args, timeout=None, check=False):
+    """Run exiftool with args on the default pool."""
+    return get_pool().execute(args, timeout=timeout, check=check)
+
+class ExiftoolBatcher:
+    """Collect exiftool commands from many threads and send them to the pool in batches.
+
+    A batch is sent once batch_size commands are pending or the oldest pending
+    command has waited flush_interval seconds. submit() returns a Future that
+    resolves to the command's CompletedProcess.
+    """
+
+    def __init__(self, pool=None, batch_size=32, flush_interval=0.5, timeout=30):
+        self.pool = pool or get_pool()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.pending = []
+        self.oldest = None
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self.flusher.start()
+
+    def submit(self, args):
+        """Queue one exiftool command and return a Future for its result."""
+        future = Future()
+        with self.lock:
+            if not self.pending:
+                self.oldest = time.monotonic()
+            self.pending.append((args, future))
+            batch = self._take() if len(self.pending) >= self.batch_size else None
+        if batch:
+            self._send(batch)
+        return future
+
+    def _take(self):
+        """Remove and return all pending commands; the caller holds the lock."""
+        batch, self.pending = self.pending, []
+        self.oldest = None
+        return batch
+
+    def _flush_periodically(self):
+        """Send batches whose oldest command has waited longer than flush_interval."""
+        while not self.closed.wait(self.flush_interval / 4):
+            with self.lock:
+                stale = self.oldest is not None and time.monotonic() - self.oldest >= self.flush_interval
+                batch = self._take() if stale else None
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch):
+        """Run a batch and resolve its futures, retrying one by one if the batch as a whole fails."""
+        commands = [args for args, _ in batch]
+        # The timeout is per command, so larger batches get proportionally longer
+        timeout = None if self.timeout is None else self.timeout * len(commands)
+        try:
+            results = self.pool.execute_many(commands, timeout=timeout)
+        except (subprocess.SubprocessError, OSError) as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Isolate the command that hung or crashed the worker
+            for item in batch:
+                self._send([item])
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def flush(self):
+        """Send every pending command now, including any queued by callbacks of the commands sent."""
+        while True:
+            with self.lock:
+                batch = self._take()
+            if not batch:
+                break
+            self._send(batch)
+
+    def close(self):
+        """Flush pending commands and stop the background flusher."""
+        self.closed.set()
+        self.flusher.join()
+        self.flush()
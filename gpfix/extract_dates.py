@@ -0,0 +1,200 @@
+import os
+import shutil
+import logging
+import subprocess
+import sys
+import time
+import threading
+import argparse
+from concurrent.futures import Future
+
+from . import geo_timezone
+from . import log_sink
+from . import metrics
+from . import native_exif
+from . import tag_check
+from .filename_dates import extract_date
+from .exiftool_pool import ExiftoolBatcher
+from .journal import MOVED, TAGGED, Journal
+
+# Log records go to the shared JSON-lines log (see log_sink)
+logger = logging.getLogger('extract_dates')
+
+# Define source and output directories; gpfix passes its own to process_files
+source_dir = os.path.expanduser('~/takeout-put/noexifdata')  # Adjust path as needed
+output_dir = os.path.expanduser('~/takeout-put/proc')        # Adjust path as needed
+journal_file = os.path.expanduser('~/takeout-put/journal.sqlite')
+
+# EXIF writes are sent to exiftool in batches of up to this many files,
+# or after waiting this many seconds for a batch to fill
+exif_batch_size = 32
+exif_flush_interval = 0.5
+exif_batcher = None
+
+# Patch DateTimeOriginal in place when the file already has it, instead of having
+# exiftool rewrite the whole file
+native_writer = True
+
+# Records the state of each file so an interrupted run can be resumed; opened by process_files
+journal = None
+
+# Files that already held their date and were left unchanged (see tag_check)
+unchanged_files = 0
+unchanged_lock = threading.Lock()
+
+def extract_date_from_filename(filename):
+    """Return the date encoded in filename (see filename_dates.DATE_PATTERNS), or None."""
+    return extract_date(filename)
+
+def update_file_dates(file_path, new_date, source_path=None):
+    """Queue the EXIF date write for file_path; its modification time is set once the write is done.
+
+    The file's current date is read first (see tag_check), and if it already
+    matches only the modification time is set. source_path is where the file
+    was moved from, and is recorded in the journal once tagged.
+    """
+    start = time.perf_counter()
+    timestamp = new_date.timestamp()
+    exif_date_str = new_date.strftime('%Y:%m:%d %H:%M:%S')
+    tag_date = exif_date_str
+    if str(file_path).lower().endswith(native_exif.QUICKTIME_EXTENSIONS):
+        # Names hold this computer's local time; MP4/MOV files store UTC
+        tag_date = geo_timezone.to_utc(exif_date_str)
+    done = Future()
+
+    def finish(future, outcome='tagged'):
+        global unchanged_files
+        try:
+            result = future.result()
+            if result.returncode != 0:
+                raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+            # Set the modification date after exiftool, which rewrites the file
+            os.utime(file_path, (timestamp, timestamp))
+            if journal and source_path:
+                journal.record(source_path, TAGGED)
+            metrics.observe('write', time.perf_counter() - start)
+            metrics.count(outcome)
+            if outcome == 'unchanged':
+                with unchanged_lock:
+                    unchanged_files += 1
+                message = f"{file_path} already holds date {exif_date_str}, left unchanged"
+            else:
+                message = f"Set dates of {file_path} to {exif_date_str}"
+            logger.info(message, extra={'file': file_path, 'stage': 'writer', 'duration': time.perf_counter() - start, 'outcome': outcome})
+        except Exception as e:
+            metrics.count('failed')
+            logger.error(f"Error updating file dates for {file_path}: {e}",
+                         extra={'file': file_path, 'stage': 'writer', 'duration': time.perf_counter() - start, 'outcome': 'failed'})
+        done.set_result(None)
+
+    def write(check):
+        if check.result():
+            finish(completed(subprocess.CompletedProcess([file_path], 0)), 'unchanged')
+            return
+        with metrics.timed('native_write'):
+            written = native_writer and native_exif.write_dates(file_path, {'DateTimeOriginal': tag_date})
+        if written:
+            finish(completed(subprocess.CompletedProcess([file_path], 0)))
+            return
+        # Update EXIF Date/Time Original using exiftool
+        exif_batcher.submit([
+            f'-DateTimeOriginal={tag_date}',
+            file_path
+        ]).add_done_callback(finish)
+
+    if tag_check.skip_unchanged:
+        # Files whose format is not read natively are read by exiftool in the same batches as the writes
+        with metrics.timed('tag_check'):
+            tag_check.check(file_path, {'DateTimeOriginal': tag_date}, exif_batcher).add_done_callback(write)
+    else:
+        write(completed(False))
+    return done
+
+def completed(result):
+    """Return a Future already holding result."""
+    future = Future()
+    future.set_result(result)
+    return future
+
+def process_files(source_dir, output_dir, resume=False, file_names=None, journal_path=None):
+    """Move files from source_dir whose names hold a date to output_dir and set their dates.
+
+    file_names limits the run to those files of source_dir instead of all of
+    them. The journal is kept in journal_path, journal_file by default.
+    Returns (source path, output path) for every file moved.
+    """
+    global exif_batcher, journal, unchanged_files
+    exif_batcher = ExiftoolBatcher(batch_size=exif_batch_size, flush_interval=exif_flush_interval)
+    journal = Journal(journal_path or journal_file, 'extract_dates', resume=resume)
+    unchanged_files = 0
+    files = os.listdir(source_dir) if file_names is None else list(file_names)
+    moved = []
+    total_files = len(files)
+    
+    # Ensure output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+
+    if resume:
+        # Tag files an interrupted run moved but had not tagged yet
+        for source_path, output_path in journal.in_state(MOVED):
+            date_obj = extract_date_from_filename(os.path.basename(source_path))
+            if output_path and date_obj and os.path.isfile(output_path):
+                update_file_dates(output_path, date_obj, source_path)
+
+    for index, file_name in enumerate(files):
+        file_path = os.path.join(source_dir, file_name)
+        with metrics.timed('filename_date'):
+            date_obj = extract_date_from_filename(file_name)
+        if date_obj and journal.state(file_path) is None:
+            # Create corresponding path in output directory
+            output_path = os.path.join(output_dir, file_name)
+            if os.path.isfile(file_path):
+                # Move file to output directory
+                with metrics.timed('move'):
+                    shutil.move(file_path, output_path)
+                journal.record(file_path, MOVED, destination=output_path)
+                moved.append((file_path, output_path))
+                metrics.count('moved')
+                # Update file dates
+                with metrics.timed('submit'):
+                    update_file_dates(output_path, date_obj, file_path)
+        else:
+            metrics.count('skipped')
+        
+        # Print progress
+        with metrics.timed('progress'):
+            progress = (index + 1) / total_files * 100
+            progress_bar_length = 50
+            filled_length = int(progress_bar_length * (index + 1) // total_files)
+            progress_bar = '█' * filled_length + '-' * (progress_bar_length - filled_length)
+            sys.stdout.write(f"\rProgress |{progress_bar}| {progress:.1f}% Complete")
+            sys.stdout.flush()
+
+    # Wait for the remaining EXIF writes
+    exif_batcher.close()
+    journal.close()
+    sys.stdout.write('\n')  # Move to next line after completion
+    if unchanged_files:
+        print("Files already holding their date, left unchanged:", unchanged_files)
+    return moved
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Set EXIF dates from dates found in file names.")
+    parser.add_argument('--resume', action='store_true', help="skip files an interrupted earlier run already moved or tagged")
+    parser.add_argument('--rewrite', action='store_true', help="write dates even to files that already hold them")
+    parser.add_argument('--log-level', choices=log_sink.LEVELS, default='error', help="least severe level written to the log")
+    parser.add_argument('--profile', action='store_true', help="print per-stage timings at the end of the run")
+    parser.add_argument('--profile-output', metavar='FILE', help="also dump cProfile stats to FILE (implies --profile)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help="serve live counters at http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+    log_sink.configure(level=args.log_level)
+    tag_check.skip_unchanged = not args.rewrite
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    # Process files
+    run = lambda: process_files(source_dir, output_dir, resume=args.resume)
+    if args.profile or args.profile_output:
+        metrics.profile(run, args.profile_output)
+    else:
+        run()
@@ -0,0 +1,98 @@
+import errno
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+
+class FileMover:
+    """Move files into destination folders from several threads without overwriting anything.
+
+    Within a filesystem a move is a single os.rename; across filesystems the
+    file is copied next to its destination and renamed into place. When a
+    name is already taken in a destination folder, by an existing file or by
+    another move in flight, ' (1)', ' (2)', ... is added before the extension.
+    """
+
+    def __init__(self, workers=8, chunk_size=256):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+        self.claimed = set()
+        self.prepared = set()
+
+    def prepare(self, directories):
+        """Create every destination folder once, before any file is moved.
+
+        The names already in each folder are read here, so claiming a name
+        later needs no filesystem check.
+        """
+        for directory in set(map(str, directories)):
+            os.makedirs(directory, exist_ok=True)
+            with self.lock:
+                self.prepared.add(directory)
+                self.claimed.update(os.path.join(directory, name) for name in os.listdir(directory))
+
+    def claim(self, directory, file_name):
+        """Reserve a free path for file_name in directory and return it."""
+        stem, ext = os.path.splitext(file_name)
+        counter = 0
+        with self.lock:
+            while True:
+                candidate = os.path.join(directory, file_name if counter == 0 else f"{stem} ({counter}){ext}")
+                if candidate not in self.claimed and (directory in self.prepared or not os.path.lexists(candidate)):
+                    self.claimed.add(candidate)
+                    return candidate
+                counter += 1
+
+    def move(self, src_path, directory, file_name=None):
+        """Move src_path into directory under a free name and return the new path."""
+        src_path = str(src_path)
+        dest_path = self.claim(str(directory), file_name or os.path.basename(src_path))
+        try:
+            os.rename(src_path, dest_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                self.release(dest_path)
+                raise
+            # Different filesystem: copy beside the destination, then rename into place
+            temp_path = dest_path + '.partial'
+            try:
+                shutil.copy2(src_path, temp_path)
+                os.rename(temp_path, dest_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                self.release(dest_path)
+                raise
+            os.remove(src_path)
+        return dest_path
+
+    def release(self, dest_path):
+        """Give back a path claimed for a move that did not happen."""
+        with self.lock:
+            self.claimed.discard(dest_path)
+
+    def move_all(self, moves):
+        """Run (src_path, directory) moves concurrently.
+
+        Yields (src_path, new path, None) for each move, or (src_path, None,
+        exception) if it failed, in the order the moves were given.
+        """
+        def run(chunk):
+            results = []
+            for src_path, directory in chunk:
+                try:
+                    with metrics.timed('move'):
+                        results.append((src_path, self.move(src_path, directory), None))
+                except Exception as e:
+                    results.append((src_path, None, e))
+            return results
+
+        # Hand out moves in chunks so the thread pool overhead is paid per chunk, not per file
+        moves = list(moves)
+        chunks = [moves[i:i + self.chunk_size] for i in range(0, len(moves), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for results in executor.map(run, chunks):
+                yield from results
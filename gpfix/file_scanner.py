@@ -0,0 +1,140 @@
+import os
+import queue
+import threading
+
+# Directories read at the same time. Reading a directory is mostly waiting on the file
+# system, and on a network share each read is a round trip, so the waits overlap.
+scan_workers = 8
+
+# Descend into symlinked directories (each real directory is read once); set by
+# --follow-symlinks. Symlinks to files are listed either way, as os.walk does.
+follow_symlinks = False
+
+# Directories' worth of entries that may wait for the consumer before the scan pauses
+queue_size = 64
+
+# Tells workers to stop and the consumer that the scan is done
+_done = object()
+
+def scan_directories(root, extensions=None, name_filter=None, exclude=(), follow=None, workers=None):
+    """Read the tree under root in parallel, yielding (directory, file entries) as each directory is read.
+
+    The file entries are os.DirEntry objects, so their type (and on Windows
+    their stat) information comes without another system call. Directories
+    are read by `workers` threads taking them from one shared queue, so a
+    thread that finishes a small directory moves on to the next one while
+    others are still busy; directories come in no particular order.
+
+    Only files whose name ends with one of `extensions` (compared in lower
+    case) and for which name_filter(name) is true are listed. Directories in
+    `exclude`, such as an output folder inside root, are not entered.
+    `follow` overrides follow_symlinks. Unreadable directories are skipped;
+    any other error in a worker, such as one raised by name_filter, is
+    raised here and ends the scan.
+    """
+    follow = follow_symlinks if follow is None else follow
+    extensions = tuple(extension.lower() for extension in extensions) if extensions else None
+    excluded = {os.path.normpath(os.path.abspath(path)) for path in exclude}
+    pending = queue.Queue()
+    results = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+    lock = threading.Lock()
+    outstanding = [1]
+    visited = set()
+    threads = []
+
+    def enter(path, entry=None):
+        """Return True if the directory at path should be read."""
+        if excluded and os.path.normpath(os.path.abspath(path)) in excluded:
+            return False
+        if not follow:
+            return entry is None or not entry.is_symlink()
+        # A symlink may lead back to a directory already read
+        try:
+            info = entry.stat() if entry else os.stat(path)
+        except OSError:
+            return False
+        with lock:
+            if (info.st_dev, info.st_ino) in visited:
+                return False
+            visited.add((info.st_dev, info.st_ino))
+        return True
+
+    def read(directory):
+        files, directories = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if enter(entry.path, entry):
+                            directories.append(entry.path)
+                    elif ((extensions is None or entry.name.lower().endswith(extensions))
+                          and (name_filter is None or name_filter(entry.name))):
+                        files.append(entry)
+        except OSError:
+            pass
+        return files, directories
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def work():
+        while True:
+            directory = pending.get()
+            if directory is _done or stopped.is_set():
+                return
+            try:
+                files, directories = read(directory)
+                with lock:
+                    outstanding[0] += len(directories)
+                for path in directories:
+                    pending.put(path)
+                if files:
+                    put((directory, files))
+            except Exception as error:
+                # Raised again in the consumer, which would otherwise wait for this directory forever
+                put(error)
+            finally:
+                with lock:
+                    outstanding[0] -= 1
+                    finished = outstanding[0] == 0
+                if finished:
+                    for _ in threads:
+                        pending.put(_done)
+                    put(_done)
+
+    root = os.fspath(root)
+    if not enter(root):
+        return
+    pending.put(root)
+    threads.extend(threading.Thread(target=work, name='scan-worker', daemon=True)
+                   for _ in range(workers or scan_workers))
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is _done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Also reached when the consumer stops early; let the workers wind down
+        stopped.set()
+        for _ in threads:
+            pending.put(_done)
+
+def scan(root, extensions=None, name_filter=None, exclude=(), follow=None, workers=None):
+    """Yield an os.DirEntry for every file under root; see scan_directories for the options."""
+    for _, entries in scan_directories(root, extensions, name_filter, exclude, follow, workers):
+        yield from entries
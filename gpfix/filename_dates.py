@@ -0,0 +1,75 @@
+import re
+from datetime import datetime
+
+# Building blocks for the patterns below; hour, minute and second are optional
+# in a pattern and default to midnight
+_Y = r'(?P<Y>(?:19|20)\d{2})'
+_m = r'(?P<m>\d{2})'
+_d = r'(?P<d>\d{2})'
+_H = r'(?P<H>\d{2})'
+_M = r'(?P<M>\d{2})'
+_S = r'(?P<S>\d{2})'
+
+# Registry of (name, regex) pairs. When several match, the one starting
+# earliest in the file name wins; at the same position, the earlier entry.
+DATE_PATTERNS = [
+    ('screenshot', rf'Screenshot_{_Y}{_m}{_d}-{_H}-?{_M}-?{_S}'),                 # Screenshot_YYYYMMDD-HHMMSS
+    ('screenshot-dashed', rf'Screenshot_{_Y}-{_m}-{_d}-{_H}-{_M}-{_S}'),          # Screenshot_YYYY-MM-DD-HH-MM-SS
+    ('screenshot-underscore', rf'Screenshot_{_Y}{_m}{_d}_{_H}{_M}{_S}'),          # Screenshot_YYYYMMDD_HHMMSS
+    ('mac-screenshot', rf'Screen Shot {_Y}-{_m}-{_d} at {_H}\.{_M}\.{_S}'),       # Screen Shot YYYY-MM-DD at HH.MM.SS
+    ('screenrecorder', rf'Screenrecorder-{_Y}-{_m}-{_d}-{_H}-{_M}-{_S}'),         # Screenrecorder-YYYY-MM-DD-HH-MM-SS
+    ('img', rf'IMG_{_Y}{_m}{_d}_{_H}{_M}{_S}'),                                   # IMG_YYYYMMDD_HHMMSS
+    ('vid', rf'VID_{_Y}{_m}{_d}_{_H}{_M}{_S}'),                                   # VID_YYYYMMDD_HHMMSS
+    ('pixel', rf'PXL_{_Y}{_m}{_d}_{_H}{_M}{_S}'),                                 # PXL_YYYYMMDD_HHMMSSmmm
+    ('signal', rf'signal-{_Y}-{_m}-{_d}-{_H}-?{_M}-?{_S}'),                       # signal-YYYY-MM-DD-HHMMSS
+    ('telegram', rf'(?:photo|video)_{_Y}-{_m}-{_d}_{_H}-{_M}-{_S}'),              # photo_YYYY-MM-DD_HH-MM-SS
+    ('whatsapp', rf'(?:IMG|VID|AUD|PTT)-{_Y}{_m}{_d}-WA'),                        # IMG-YYYYMMDD-WA*
+    ('camera', rf'(?<!\d){_Y}{_m}{_d}_{_H}{_M}{_S}(?!\d)'),                       # YYYYMMDD_HHMMSS
+    ('underscore-date', rf'_{_Y}{_m}{_d}_'),                                      # _YYYYMMDD_
+    ('dash-date', rf'-{_Y}{_m}{_d}-'),                                            # -YYYYMMDD-
+]
+
+_group_name = re.compile(r'\(\?P<(\w+)>')
+
+_compiled = None
+_fields = {}
+
+def _compile():
+    """Join every registered pattern into one alternation with uniquely named groups."""
+    global _compiled, _fields
+    alternatives = []
+    for index, (name, regex) in enumerate(DATE_PATTERNS):
+        prefixed = _group_name.sub(lambda match: f'(?P<p{index}_{match.group(1)}>', regex)
+        alternatives.append(f'(?P<p{index}>{prefixed})')
+    compiled = re.compile('|'.join(alternatives))
+    fields = {}
+    for index in range(len(DATE_PATTERNS)):
+        outer = compiled.groupindex[f'p{index}']
+        fields[outer] = tuple(compiled.groupindex[f'p{index}_{field}'] for field in 'YmdHMS'
+                              if f'p{index}_{field}' in compiled.groupindex)
+    _compiled, _fields = compiled, fields
+
+def register_pattern(name, regex, first=False):
+    """Add a pattern using named groups Y, m, d and optionally H, M, S."""
+    entry = (name, regex)
+    if first:
+        DATE_PATTERNS.insert(0, entry)
+    else:
+        DATE_PATTERNS.append(entry)
+    _compile()
+
+def extract_date(filename):
+    """Return the datetime encoded in filename, or None."""
+    search = _compiled.search
+    position = 0
+    while True:
+        match = search(filename, position)
+        if match is None:
+            return None
+        try:
+            return datetime(*map(int, match.group(*_fields[match.lastindex])))
+        except ValueError:
+            # Not a real date (e.g. month 13); look for another match further on
+            position = match.start() + 1
+
+_compile()
@@ -0,0 +1,422 @@
+import datetime
+import functools
+import math
+
+try:
+    import zoneinfo
+except ImportError:
+    # Python < 3.9: every location gets the offset of its longitude (see tzinfo_at)
+    zoneinfo = None
+
+# Coordinates are looked up per cell of this many degrees; every photo in a cell gets the
+# same zone, so a library needs one nearest-point search per place it was taken
+cell_size = 0.5
+
+# A cell farther than this from every point below is at sea or in a polar region, and
+# gets the offset of its longitude
+max_distance_km = 1500
+
+EARTH_RADIUS_KM = 6371
+
+# Offline zone index: each line names an IANA zone followed by latitude/longitude pairs of
+# places in it. A location gets the zone of the nearest place, which is exact away from
+# borders and off by at most the neighbouring zone's offset close to one.
+ZONE_POINTS = """
+America/St_Johns 47.56 -52.71 48.95 -57.95
+America/Halifax 44.65 -63.58 45.96 -66.64 46.24 -63.13 46.14 -60.19
+America/Toronto 43.65 -79.38 45.42 -75.70 45.50 -73.57 46.81 -71.21 48.38 -89.25 46.49 -80.99 48.45 -68.52
+America/New_York 40.71 -74.01 42.36 -71.06 38.91 -77.04 33.75 -84.39 25.76 -80.19 28.54 -81.38 42.33 -83.05 39.96 -83.00 35.23 -80.84 40.44 -79.99 43.05 -76.15 44.48 -73.21 30.33 -81.66 32.08 -81.09 37.54 -77.44 38.25 -85.76 39.77 -86.16 27.95 -82.46 43.66 -70.26 42.89 -78.88 35.78 -78.64 32.78 -79.93 36.85 -75.98 41.50 -81.69 38.35 -81.63 46.54 -87.40 36.17 -83.92
+America/Chicago 41.88 -87.63 29.76 -95.37 32.78 -96.80 30.27 -97.74 29.42 -98.49 44.98 -93.27 38.63 -90.20 39.10 -94.58 29.95 -90.07 36.16 -86.78 35.15 -90.05 41.26 -95.93 35.47 -97.52 43.04 -87.91 46.88 -96.79 32.30 -90.18 33.52 -86.80 27.80 -97.40 37.69 -97.34 41.59 -93.62 43.55 -96.73 30.45 -91.19 34.75 -92.29 33.58 -101.86 46.81 -100.78 44.51 -88.01 30.69 -88.04 35.22 -101.83 36.15 -95.99
+America/Winnipeg 49.90 -97.14 53.82 -101.25
+America/Regina 50.45 -104.62 52.13 -106.67
+America/Denver 39.74 -104.99 40.76 -111.89 35.08 -106.65 43.62 -116.20 45.78 -108.50 46.59 -112.04 41.14 -104.82 31.76 -106.49 44.08 -103.23 38.83 -104.82 42.87 -106.31 37.27 -107.88 32.32 -106.76
+America/Edmonton 53.55 -113.49 51.05 -114.07 62.45 -114.37 56.73 -111.38
+America/Phoenix 33.45 -112.07 32.22 -110.97 35.20 -111.65 32.69 -114.63
+America/Los_Angeles 34.05 -118.24 37.77 -122.42 47.61 -122.33 45.52 -122.68 32.72 -117.16 36.17 -115.14 38.58 -121.49 36.74 -119.79 39.53 -119.81 44.05 -123.09 47.66 -117.43 40.80 -124.16 35.37 -119.02 42.33 -122.87 46.60 -120.51 33.83 -116.55
+America/Vancouver 49.28 -123.12 48.43 -123.37 49.89 -119.50 53.92 -122.75 54.31 -130.32
+America/Whitehorse 60.72 -135.06
+America/Iqaluit 63.75 -68.52
+America/Anchorage 61.22 -149.90 64.84 -147.72 58.30 -134.42 57.79 -152.41 66.90 -162.60 71.29 -156.79 60.55 -151.26
+Pacific/Honolulu 21.31 -157.86 19.71 -155.08 20.89 -156.47 21.98 -159.37
+America/Puerto_Rico 18.47 -66.11 18.34 -64.93
+America/Mexico_City 19.43 -99.13 20.67 -103.35 25.69 -100.32 19.04 -98.21 21.88 -102.29 17.06 -96.73 20.97 -89.62 19.18 -96.14 16.75 -93.12 22.15 -100.98 18.92 -99.23
+America/Cancun 21.16 -86.85 20.63 -87.07 18.50 -88.30
+America/Tijuana 32.51 -117.04 32.62 -115.45
+America/Hermosillo 29.07 -110.96 27.49 -109.93
+America/Mazatlan 23.25 -106.41 24.14 -110.31 24.81 -107.39
+America/Chihuahua 28.63 -106.07 25.54 -103.41
+America/Ciudad_Juarez 31.69 -106.42
+America/Guatemala 14.63 -90.51
+America/Belize 17.25 -88.77
+America/El_Salvador 13.69 -89.22
+America/Tegucigalpa 14.07 -87.19 15.50 -88.03
+America/Managua 12.11 -86.24
+America/Costa_Rica 9.93 -84.08
+America/Panama 8.98 -79.52
+America/Havana 23.11 -82.37 20.02 -75.83 21.38 -77.92
+America/Jamaica 18.02 -76.80
+America/Port-au-Prince 18.59 -72.31
+America/Santo_Domingo 18.49 -69.93 19.45 -70.70
+America/Nassau 25.05 -77.35
+America/Barbados 13.10 -59.61
+America/Port_of_Spain 10.65 -61.50
+America/Martinique 14.60 -61.07
+America/Curacao 12.11 -68.93
+America/Bogota 4.71 -74.07 6.24 -75.58 3.45 -76.53 10.39 -75.51 7.12 -73.12 -4.22 -69.94
+America/Caracas 10.48 -66.90 10.65 -71.61 8.12 -63.55
+America/Guyana 6.80 -58.16
+America/Paramaribo 5.85 -55.20
+America/Cayenne 4.92 -52.33
+America/Guayaquil -0.18 -78.47 -2.19 -79.89 -2.90 -79.00
+Pacific/Galapagos -0.74 -90.31
+America/Lima -12.05 -77.04 -16.41 -71.54 -8.11 -79.03 -13.53 -71.97 -3.75 -73.25
+America/La_Paz -16.50 -68.15 -17.78 -63.18 -19.05 -65.26
+America/Santiago -33.45 -70.67 -36.83 -73.05 -23.65 -70.40 -41.47 -72.94 -18.48 -70.31 -29.90 -71.25
+America/Punta_Arenas -53.16 -70.91
+Pacific/Easter -27.11 -109.35
+America/Argentina/Buenos_Aires -34.60 -58.38 -31.42 -64.18 -32.89 -68.83 -24.78 -65.41 -38.00 -57.56 -41.13 -71.31 -54.80 -68.30 -27.47 -58.83 -45.86 -67.48 -38.95 -68.06
+America/Montevideo -34.90 -56.16 -31.38 -57.96
+America/Asuncion -25.26 -57.58 -22.35 -60.03
+America/Sao_Paulo -23.55 -46.63 -22.91 -43.17 -19.92 -43.94 -15.79 -47.88 -25.43 -49.27 -30.03 -51.23 -27.60 -48.55 -16.69 -49.26 -20.32 -40.34
+America/Bahia -12.97 -38.50 -14.79 -39.05
+America/Recife -8.05 -34.88 -7.12 -34.86 -9.67 -35.74
+America/Fortaleza -3.72 -38.54 -5.79 -35.21 -2.53 -44.30 -5.09 -42.80
+America/Belem -1.46 -48.50 0.03 -51.07
+America/Araguaina -10.18 -48.33
+America/Manaus -3.12 -60.02 2.82 -60.67
+America/Santarem -2.44 -54.71
+America/Cuiaba -15.60 -56.10 -20.44 -54.65
+America/Porto_Velho -8.76 -63.90
+America/Rio_Branco -9.97 -67.81
+America/Noronha -3.85 -32.42
+America/Nuuk 64.18 -51.72 69.22 -51.10
+Atlantic/Bermuda 32.29 -64.78
+Atlantic/Stanley -51.70 -57.85
+Atlantic/Reykjavik 64.15 -21.94 65.68 -18.09 65.26 -14.39
+Atlantic/Faroe 62.01 -6.77
+Atlantic/Azores 37.74 -25.67 38.66 -27.22
+Atlantic/Madeira 32.65 -16.91
+Atlantic/Canary 28.12 -15.43 28.46 -16.25 28.96 -13.55
+Atlantic/Cape_Verde 14.93 -23.51 16.89 -24.98
+Europe/London 51.51 -0.13 53.48 -2.24 52.49 -1.89 55.95 -3.19 55.86 -4.25 53.41 -2.99 54.60 -5.93 51.48 -3.18 50.38 -4.14 57.15 -2.09 57.48 -4.22 53.80 -1.55 50.72 -1.88 52.63 1.30 54.98 -1.61 58.98 -2.96 60.15 -1.15 49.19 -2.11
+Europe/Dublin 53.35 -6.26 51.90 -8.47 53.27 -9.05 52.66 -8.63 54.27 -8.47
+Europe/Lisbon 38.72 -9.14 41.15 -8.61 37.02 -7.93 40.21 -8.43
+Europe/Madrid 40.42 -3.70 41.39 2.17 37.39 -5.98 39.47 -0.38 43.26 -2.93 42.88 -8.54 36.72 -4.42 39.57 2.65 41.65 -0.88 43.36 -5.85 37.18 -3.60 38.35 -0.48 41.65 -4.72
+Europe/Gibraltar 36.14 -5.35
+Europe/Andorra 42.51 1.52
+Europe/Paris 48.86 2.35 45.76 4.84 43.30 5.37 43.60 1.44 44.84 -0.58 47.22 -1.55 48.58 7.75 50.63 3.06 43.70 7.27 48.39 -4.49 42.70 9.45 49.44 1.10 47.32 5.04 45.78 3.08 49.26 4.03 48.11 -1.68 41.93 8.74 43.48 -1.56 45.19 5.72
+Europe/Monaco 43.74 7.42
+Europe/Brussels 50.85 4.35 51.22 4.40 50.63 5.57 51.05 3.72 50.41 4.44
+Europe/Amsterdam 52.37 4.90 51.92 4.48 53.22 6.57 51.44 5.47 52.09 5.12 50.85 5.69
+Europe/Luxembourg 49.61 6.13
+Europe/Berlin 52.52 13.40 53.55 9.99 48.14 11.58 50.94 6.96 50.11 8.68 48.78 9.18 51.34 12.37 51.05 13.74 54.32 10.14 53.08 8.80 52.37 9.73 49.45 11.08 51.51 7.47 54.09 12.14 47.99 7.84 50.98 11.03 52.13 11.63 49.01 8.40 49.24 6.99 47.56 10.22
+Europe/Zurich 47.38 8.54 46.20 6.14 46.95 7.45 46.00 8.95 47.56 7.59 46.85 9.53
+Europe/Vaduz 47.14 9.52
+Europe/Vienna 48.21 16.37 47.07 15.44 47.27 11.40 47.80 13.04 48.31 14.29 46.62 14.31
+Europe/Rome 41.90 12.50 45.46 9.19 40.85 14.27 45.07 7.69 38.12 13.36 43.77 11.26 44.49 11.34 45.44 12.32 39.22 9.12 37.50 15.09 41.12 16.87 46.50 11.35 44.41 8.93 43.62 13.52 39.30 16.25 40.72 8.56 45.65 13.78
+Europe/Malta 35.90 14.51
+Europe/Copenhagen 55.68 12.57 56.16 10.20 57.05 9.92 55.40 10.39 55.10 14.70
+Europe/Oslo 59.91 10.75 60.39 5.32 63.43 10.40 69.65 18.96 58.97 5.73 67.28 14.40 70.66 23.68 62.47 6.15 58.15 8.00 78.22 15.65
+Europe/Stockholm 59.33 18.07 57.71 11.97 55.60 13.00 63.83 20.26 65.58 22.15 67.86 20.23 62.39 17.31 57.64 18.30 59.86 17.64 63.18 14.64
+Europe/Helsinki 60.17 24.94 61.50 23.76 65.01 25.47 68.66 27.54 60.45 22.27 62.24 25.75 62.60 29.76 66.50 25.73
+Europe/Tallinn 59.44 24.75 58.38 26.72 58.25 22.49
+Europe/Riga 56.95 24.11 55.87 26.54 56.51 21.01
+Europe/Vilnius 54.69 25.28 54.90 23.90 55.70 21.14
+Europe/Warsaw 52.23 21.01 50.06 19.94 51.11 17.04 54.35 18.65 52.41 16.93 53.43 14.55 51.76 19.46 50.04 22.00 53.13 23.16 50.26 19.02 53.78 20.49 51.25 22.57 49.30 19.95
+Europe/Prague 50.08 14.44 49.20 16.61 49.82 18.26 49.74 13.38 50.77 15.06
+Europe/Bratislava 48.15 17.11 48.72 21.26 49.22 18.74
+Europe/Budapest 47.50 19.04 46.25 20.15 47.53 21.63 46.07 18.23 47.68 17.63
+Europe/Ljubljana 46.06 14.51 45.55 13.73
+Europe/Zagreb 45.81 15.98 43.51 16.44 42.65 18.09 45.33 14.44 45.55 18.69
+Europe/Sarajevo 43.86 18.41 44.77 17.19
+Europe/Belgrade 44.79 20.45 45.25 19.84 43.32 21.90 42.66 21.17
+Europe/Podgorica 42.44 19.26
+Europe/Tirane 41.33 19.82 40.47 19.49
+Europe/Skopje 42.00 21.43 41.12 20.80
+Europe/Sofia 42.70 23.32 42.14 24.75 43.21 27.91 42.51 27.46 43.84 25.95
+Europe/Bucharest 44.43 26.10 46.77 23.62 47.16 27.59 45.76 21.23 44.18 28.63 45.65 25.61 44.32 23.80 47.65 26.26
+Europe/Chisinau 47.01 28.86 46.84 29.63
+Europe/Athens 37.98 23.73 40.64 22.94 35.34 25.14 38.25 21.73 36.43 28.22 39.67 20.85 39.64 22.42 37.45 25.33 39.11 26.55
+Europe/Istanbul 41.01 28.98 39.93 32.86 38.42 27.14 36.90 30.71 37.00 35.32 39.90 41.27 37.91 40.23 41.00 39.72 40.19 29.06 38.72 35.48 37.07 37.38 36.80 34.63 38.50 43.38 41.29 36.33
+Asia/Nicosia 35.17 33.36 34.68 33.04 34.92 32.42
+Europe/Kiev 50.45 30.52 49.84 24.03 46.48 30.72 49.99 36.23 48.46 35.05 47.84 35.14 51.50 31.29 48.92 24.71 48.02 37.80 49.44 32.06
+Europe/Simferopol 44.95 34.10 44.62 33.52
+Europe/Minsk 53.90 27.56 52.10 23.69 55.19 30.20 52.42 31.01 53.68 23.83
+Europe/Kaliningrad 54.71 20.51
+Europe/Moscow 55.76 37.62 59.94 30.31 56.33 44.00 55.79 49.12 47.24 39.71 45.04 38.98 64.54 40.54 68.97 33.07 43.59 39.72 54.19 37.62 51.67 39.18 57.63 39.87 61.79 34.36 43.03 44.68 58.60 49.67 54.78 32.05 67.64 53.01
+Europe/Volgograd 48.71 44.51
+Europe/Samara 53.20 50.15 54.31 48.40
+Europe/Astrakhan 46.35 48.04
+Europe/Saratov 51.53 46.03
+Asia/Yekaterinburg 56.84 60.61 55.16 61.40 58.01 56.25 57.15 65.53 61.00 69.00 51.77 55.10 54.74 55.97 66.53 66.61 61.25 73.40
+Asia/Omsk 54.99 73.37
+Asia/Novosibirsk 55.01 82.93
+Asia/Barnaul 53.35 83.78
+Asia/Tomsk 56.48 84.95
+Asia/Novokuznetsk 53.76 87.11 55.35 86.09
+Asia/Krasnoyarsk 56.01 92.87 53.72 91.44 69.35 88.20 51.72 94.45 66.00 100.00
+Asia/Irkutsk 52.29 104.30 51.83 107.58 56.15 101.63 58.00 108.00
+Asia/Chita 52.03 113.50
+Asia/Yakutsk 62.03 129.73 56.66 124.71 66.00 125.00 71.64 128.87
+Asia/Vladivostok 43.12 131.89 48.48 135.08 50.55 137.01 44.60 132.80
+Asia/Sakhalin 46.96 142.73 53.59 142.95
+Asia/Magadan 59.56 150.80
+Asia/Srednekolymsk 67.45 153.70
+Asia/Kamchatka 53.04 158.65
+Asia/Anadyr 64.73 177.51 69.70 170.30
+Africa/Casablanca 33.57 -7.59 34.02 -6.84 31.63 -8.01 35.76 -5.83 30.42 -9.60 34.03 -5.00 34.68 -1.91 31.93 -4.43
+Africa/El_Aaiun 27.15 -13.20 23.68 -15.96
+Africa/Algiers 36.75 3.06 35.70 -0.63 36.37 6.61 31.61 -2.22 22.79 5.53 36.90 7.76 32.49 3.67 27.87 -0.29 26.72 8.47
+Africa/Tunis 36.81 10.18 34.74 10.76 33.88 10.10 33.92 8.13
+Africa/Tripoli 32.89 13.19 32.12 20.09 27.04 14.43 32.76 22.64 24.96 10.18 25.92 20.00
+Africa/Cairo 30.04 31.24 31.20 29.92 25.69 32.64 27.26 33.81 24.09 32.90 27.91 34.33 29.20 25.52 22.37 31.61
+Africa/Khartoum 15.50 32.56 19.62 37.22 13.18 30.22 12.05 24.88 17.70 33.97
+Africa/Juba 4.85 31.58 7.70 27.99 9.53 31.66
+Africa/Addis_Ababa 9.03 38.74 7.06 38.48 11.59 37.39 9.31 42.12
+Africa/Asmara 15.32 38.93
+Africa/Djibouti 11.59 43.15
+Africa/Mogadishu 2.05 45.32 9.56 44.07 -0.36 42.55 8.41 48.48
+Africa/Nairobi -1.29 36.82 -4.04 39.67 0.51 35.27 3.12 35.60
+Africa/Kampala 0.35 32.58 2.77 32.30
+Africa/Kigali -1.94 30.06
+Africa/Bujumbura -3.38 29.36
+Africa/Dar_es_Salaam -6.79 39.21 -3.37 36.68 -2.52 32.90 -6.17 35.75 -10.68 35.65 -6.16 39.19
+Africa/Lusaka -15.39 28.32 -12.97 28.64 -17.86 25.86
+Africa/Harare -17.83 31.05 -20.15 28.58
+Africa/Maputo -25.97 32.57 -19.84 34.84 -15.12 39.27 -13.31 35.24
+Africa/Blantyre -15.79 35.01 -13.96 33.79
+Africa/Johannesburg -26.20 28.05 -33.92 18.42 -29.86 31.02 -25.75 28.19 -33.96 25.60 -29.12 26.21 -28.74 24.76 -23.90 29.45 -33.02 27.91 -28.56 16.52
+Africa/Maseru -29.31 27.48
+Africa/Mbabane -26.32 31.13
+Africa/Gaborone -24.63 25.92 -21.17 27.51 -19.98 23.42
+Africa/Windhoek -22.56 17.08 -22.96 14.51 -17.92 19.77 -26.65 15.16
+Africa/Luanda -8.84 13.23 -12.58 13.41 -12.78 15.74 -14.92 13.49 -9.54 20.38
+Africa/Lubumbashi -11.66 27.48 0.52 25.19 -2.51 28.86 -6.13 23.59
+Africa/Kinshasa -4.44 15.27 0.05 18.26 -5.04 18.82
+Africa/Brazzaville -4.27 15.28 -4.78 11.86 1.61 16.05
+Africa/Libreville 0.42 9.47 -1.63 13.58
+Africa/Malabo 3.75 8.78
+Africa/Douala 4.05 9.77 3.87 11.52 9.30 13.39 10.59 14.32
+Africa/Bangui 4.39 18.56 8.41 20.65
+Africa/Ndjamena 12.13 15.06 17.92 19.11 13.83 20.83
+Africa/Lagos 6.52 3.38 9.08 7.40 12.00 8.52 4.82 7.05 13.06 5.24 11.85 13.16 7.38 3.95 6.34 5.63
+Africa/Porto-Novo 6.37 2.39 9.34 2.63
+Africa/Niamey 13.51 2.11 16.97 7.99 13.80 8.99
+Africa/Lome 6.13 1.22 9.55 1.19
+Africa/Accra 5.60 -0.19 6.69 -1.62 9.40 -0.85
+Africa/Ouagadougou 12.37 -1.52 11.18 -4.30
+Africa/Abidjan 5.36 -4.01 7.69 -5.03 9.46 -5.63
+Africa/Monrovia 6.30 -10.80
+Africa/Freetown 8.48 -13.23
+Africa/Conakry 9.64 -13.58 10.38 -9.31
+Africa/Bissau 11.86 -15.60
+Africa/Dakar 14.72 -17.47 14.79 -16.93 12.58 -16.27
+Africa/Banjul 13.45 -16.58
+Africa/Nouakchott 18.07 -15.96 20.94 -17.04 22.68 -12.71
+Africa/Bamako 12.64 -8.00 16.77 -3.01 18.44 1.41 14.45 -11.44
+Africa/Sao_Tome 0.34 6.73
+Indian/Antananarivo -18.88 47.51 -23.35 43.67 -12.35 49.29
+Indian/Comoro -11.70 43.26
+Indian/Mauritius -20.16 57.50
+Indian/Reunion -20.88 55.45
+Indian/Mahe -4.62 55.45
+Indian/Maldives 4.18 73.51 -0.69 73.15
+Indian/Chagos -7.31 72.41
+Asia/Jerusalem 31.77 35.21 32.09 34.78 32.79 34.99 29.56 34.95 31.25 34.79
+Asia/Gaza 31.50 34.47
+Asia/Beirut 33.89 35.50 34.44 35.85
+Asia/Damascus 33.51 36.29 36.20 37.13 35.52 35.79 35.33 40.14 37.05 41.22
+Asia/Amman 31.95 35.93 29.53 35.01 32.34 36.21
+Asia/Baghdad 33.31 44.36 30.51 47.78 36.19 44.01 36.34 43.13 32.62 44.02 33.42 43.30
+Asia/Riyadh 24.71 46.68 21.49 39.19 26.43 50.10 21.39 39.86 24.47 39.61 18.22 42.51 28.38 36.57 27.51 41.69 20.00 48.00
+Asia/Kuwait 29.38 47.99
+Asia/Bahrain 26.23 50.59
+Asia/Qatar 25.29 51.53
+Asia/Dubai 25.20 55.27 24.45 54.38 25.29 56.35
+Asia/Muscat 23.59 58.41 17.02 54.09 20.68 58.87
+Asia/Aden 12.79 45.02 15.37 44.19 14.54 49.12 16.94 51.15
+Asia/Tehran 35.69 51.39 32.65 51.67 29.59 52.58 36.30 59.61 38.08 46.29 31.32 48.67 27.18 56.27 34.31 47.07 30.28 57.08 29.50 60.86 37.28 49.58
+Asia/Kabul 34.56 69.21 31.63 65.71 36.71 67.11 34.35 62.20 34.43 70.45
+Asia/Karachi 24.86 67.01 31.55 74.34 33.68 73.05 34.01 71.58 30.18 66.99 30.20 71.47 25.39 68.37 35.92 74.31 28.42 70.30
+Asia/Kolkata 28.61 77.21 19.08 72.88 12.97 77.59 13.08 80.27 22.57 88.36 17.39 78.49 23.02 72.57 18.52 73.86 26.91 75.79 26.85 80.95 34.08 74.80 9.93 76.27 8.52 76.94 25.59 85.14 26.14 91.74 21.15 79.09 20.30 85.82 15.50 73.83 23.26 77.41 30.73 76.78 25.32 82.97 34.16 77.58 11.67 92.74 27.33 88.61 24.82 93.94 26.92 70.91
+Asia/Colombo 6.93 79.86 9.66 80.02 7.29 80.63
+Asia/Kathmandu 27.72 85.32 28.21 83.99 26.45 87.27
+Asia/Thimphu 27.47 89.64
+Asia/Dhaka 23.81 90.41 22.36 91.78 24.90 91.87 22.85 89.54
+Asia/Yangon 16.87 96.20 21.96 96.08 19.75 96.13 25.38 97.40 12.44 98.60
+Asia/Bangkok 13.76 100.50 18.79 98.99 7.88 98.39 14.97 102.10 9.14 99.33 16.43 102.83 7.01 100.47 17.41 104.78
+Asia/Vientiane 17.97 102.63 19.89 102.13 15.12 105.80
+Asia/Phnom_Penh 11.56 104.93 13.36 103.86 10.63 103.52
+Asia/Ho_Chi_Minh 10.82 106.63 21.03 105.85 16.05 108.20 12.24 109.20 10.03 105.78 20.86 106.68 22.34 103.84 18.68 105.68
+Asia/Kuala_Lumpur 3.14 101.69 5.41 100.34 1.49 103.74 6.12 102.24 4.60 101.08
+Asia/Kuching 1.55 110.34 5.98 116.07 3.17 113.04 5.84 118.12
+Asia/Singapore 1.35 103.82
+Asia/Brunei 4.89 114.94
+Asia/Jakarta -6.21 106.85 -6.91 107.61 -7.25 112.75 3.60 98.67 -0.95 100.35 -2.99 104.76 -7.80 110.36 5.55 95.32 0.51 101.45 -5.43 105.26 1.13 104.05
+Asia/Pontianak -0.03 109.33 -2.21 113.92
+Asia/Makassar -5.15 119.43 -8.65 115.22 -1.27 116.83 1.47 124.84 -10.17 123.61 -8.58 116.12 -0.89 119.87
+Asia/Jayapura -2.53 140.72 -0.86 134.06 -8.49 140.40 -3.70 128.18 -4.55 136.88
+Asia/Dili -8.56 125.57
+Asia/Manila 14.60 120.98 10.32 123.89 7.07 125.61 16.41 120.60 10.72 122.56 9.74 118.74 8.48 124.65 13.14 123.74 18.20 120.59
+Asia/Shanghai 31.23 121.47 39.90 116.41 23.13 113.26 22.54 114.06 30.57 104.07 29.56 106.55 34.34 108.94 30.59 114.31 32.06 118.80 36.07 120.38 41.81 123.43 45.80 126.53 36.06 103.83 25.04 102.71 26.07 119.30 20.04 110.34 38.04 114.51 22.82 108.32 43.83 87.62 39.47 75.99 29.65 91.13 40.84 111.75 36.62 101.78 38.47 106.27 28.23 112.94 26.65 106.63 28.68 115.86 31.82 117.23 39.13 117.20 43.88 125.32 47.35 123.92 30.27 120.15 24.48 118.09 18.25 109.51 40.66 109.84 49.21 119.77 27.73 111.99 36.65 117.12 34.75 113.63 37.87 112.56 25.28 110.29 32.99 97.01
+Asia/Hong_Kong 22.32 114.17
+Asia/Macau 22.20 113.54
+Asia/Taipei 25.03 121.57 22.63 120.30 24.15 120.67 23.98 121.60 22.76 121.14
+Asia/Seoul 37.57 126.98 35.18 129.08 35.87 128.60 33.50 126.53 35.16 126.85 37.75 128.88 36.35 127.38
+Asia/Pyongyang 39.04 125.76 41.80 129.78 40.10 124.40
+Asia/Tokyo 35.68 139.69 34.69 135.50 43.06 141.35 33.59 130.40 26.21 127.68 38.27 140.87 35.18 136.91 34.39 132.46 31.60 130.56 36.56 136.66 33.84 132.77 41.77 140.73 24.34 124.16 43.77 142.36 43.33 145.58
+Asia/Ulaanbaatar 47.89 106.91 49.49 105.92 43.57 104.42 48.07 114.53
+Asia/Hovd 48.01 91.64 49.98 92.07
+Asia/Almaty 43.24 76.89 51.17 71.45 49.95 82.61 49.80 73.10 42.32 69.60 52.29 76.97 54.87 69.15 44.85 65.51
+Asia/Qostanay 53.21 63.63
+Asia/Aqtobe 50.28 57.17
+Asia/Atyrau 47.09 51.92
+Asia/Aqtau 43.65 51.16
+Asia/Oral 51.23 51.37
+Asia/Tashkent 41.30 69.24 40.78 72.34 40.38 71.79 37.22 67.28
+Asia/Samarkand 39.65 66.96 39.77 64.42 42.46 59.60 41.55 60.63
+Asia/Bishkek 42.87 74.57 40.53 72.80 42.49 78.39
+Asia/Dushanbe 38.56 68.79 40.28 69.62 37.49 71.55
+Asia/Ashgabat 37.96 58.33 39.09 63.58 40.02 52.97 37.60 61.83
+Asia/Baku 40.41 49.87 40.68 46.36 39.21 45.41
+Asia/Tbilisi 41.72 44.79 41.64 41.64 42.27 42.70
+Asia/Yerevan 40.18 44.51 40.79 43.85
+Australia/Sydney -33.87 151.21 -32.93 151.78 -35.28 149.13 -30.30 153.11 -31.08 150.92 -35.12 147.37 -29.76 151.12
+Australia/Broken_Hill -31.95 141.45
+Australia/Melbourne -37.81 144.96 -38.15 144.36 -36.76 144.28 -36.12 146.89 -37.56 143.85
+Australia/Brisbane -27.47 153.03 -19.26 146.82 -16.92 145.77 -23.38 150.51 -28.00 153.43 -20.73 139.49 -23.44 144.25 -10.58 142.22 -26.41 146.24
+Australia/Adelaide -34.93 138.60 -32.49 137.78 -30.45 131.00 -29.01 134.75
+Australia/Darwin -12.46 130.84 -23.70 133.88 -19.65 134.19 -14.47 132.26
+Australia/Perth -31.95 115.86 -20.31 118.58 -17.96 122.24 -28.77 114.61 -35.02 117.88 -30.75 121.47 -24.88 113.66 -15.77 128.74 -25.00 125.00
+Australia/Eucla -31.68 128.88
+Australia/Hobart -42.88 147.33 -41.44 147.14 -41.05 145.91
+Australia/Lord_Howe -31.55 159.08
+Pacific/Norfolk -29.04 167.95
+Pacific/Auckland -36.85 174.76 -41.29 174.78 -43.53 172.64 -45.88 170.50 -37.79 175.28 -39.49 176.91 -46.41 168.35 -35.73 174.32 -41.27 173.28 -38.14 176.25
+Pacific/Chatham -43.95 -176.56
+Pacific/Fiji -18.14 178.44 -16.43 179.38
+Pacific/Port_Moresby -9.44 147.18 -6.72 146.98 -5.22 145.79 -3.58 143.63 -6.06 144.97
+Pacific/Bougainville -6.23 155.56
+Pacific/Guadalcanal -9.43 159.96
+Pacific/Noumea -22.28 166.46
+Pacific/Efate -17.73 168.32
+Pacific/Apia -13.83 -171.76
+Pacific/Pago_Pago -14.28 -170.70
+Pacific/Tongatapu -21.14 -175.20
+Pacific/Niue -19.05 -169.87
+Pacific/Rarotonga -21.21 -159.78
+Pacific/Tahiti -17.54 -149.57 -16.50 -151.74
+Pacific/Marquesas -8.91 -140.10
+Pacific/Gambier -23.12 -134.97
+Pacific/Pitcairn -25.07 -130.10
+Pacific/Guam 13.44 144.79 15.18 145.75
+Pacific/Palau 7.34 134.48
+Pacific/Chuuk 7.45 151.85
+Pacific/Pohnpei 6.96 158.21
+Pacific/Kosrae 5.33 162.98
+Pacific/Majuro 7.09 171.38
+Pacific/Kwajalein 8.72 167.73
+Pacific/Nauru -0.55 166.92
+Pacific/Tarawa 1.45 172.97
+Pacific/Funafuti -8.52 179.20
+Pacific/Wallis -13.28 -176.18
+Pacific/Kanton -2.81 -171.68
+Pacific/Kiritimati 1.87 -157.36
+Pacific/Fakaofo -9.38 -171.25
+"""
+
+@functools.lru_cache(maxsize=None)
+def _points():
+    """Parse ZONE_POINTS into a list of (latitude, longitude, cosine of latitude, zone), in radians."""
+    points = []
+    for line in ZONE_POINTS.strip().splitlines():
+        zone, *values = line.split()
+        for index in range(0, len(values), 2):
+            latitude, longitude = math.radians(float(values[index])), math.radians(float(values[index + 1]))
+            points.append((latitude, longitude, math.cos(latitude), zone))
+    return points
+
+@functools.lru_cache(maxsize=None)
+def _cell_zone(row, column):
+    """Return the zone of the place nearest the centre of a cell, or None if none is near."""
+    latitude = math.radians((row + 0.5) * cell_size)
+    longitude = math.radians((column + 0.5) * cell_size)
+    cos_latitude = math.cos(latitude)
+    best, best_haversine = None, math.inf
+    for point_latitude, point_longitude, point_cos, zone in _points():
+        # Haversine formula without the final arcsine, which does not change the order
+        haversine = (math.sin((point_latitude - latitude) / 2) ** 2
+                     + cos_latitude * point_cos * math.sin((point_longitude - longitude) / 2) ** 2)
+        if haversine < best_haversine:
+            best, best_haversine = zone, haversine
+    distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(best_haversine)))
+    return best if distance <= max_distance_km else None
+
+@functools.lru_cache(maxsize=None)
+def _load_zone(name):
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        # No tz database on this system (e.g. Windows without the tzdata package)
+        return None
+
+def zone_at(latitude, longitude):
+    """Return the IANA zone name for a location, or None if it is far from any known place."""
+    return _cell_zone(math.floor(latitude / cell_size), math.floor(longitude / cell_size))
+
+def tzinfo_at(latitude, longitude):
+    """Return a tzinfo for a location: its zone if known, otherwise the offset of its longitude."""
+    name = zone_at(latitude, longitude)
+    zone = _load_zone(name) if name and zoneinfo else None
+    if zone is None:
+        # Nautical time: one hour per 15 degrees of longitude
+        zone = datetime.timezone(datetime.timedelta(hours=round(longitude / 15)))
+    return zone
+
+def local_time(timestamp, location=None):
+    """Return the aware local time at location ((latitude, longitude) or None) of a Unix timestamp.
+
+    Without a location this is the local time of this computer, which is also
+    how extract_dates reads dates found in file names.
+    """
+    moment = datetime.datetime.fromtimestamp(int(timestamp), datetime.timezone.utc)
+    if location is None:
+        return moment.astimezone()
+    return moment.astimezone(tzinfo_at(*location))
+
+def format_offset(moment):
+    """Return the UTC offset of an aware datetime as EXIF writes it, e.g. '+02:00'."""
+    minutes = int(moment.utcoffset().total_seconds()) // 60
+    sign = '-' if minutes < 0 else '+'
+    return f'{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}'
+
+def to_utc(exif_date, offset=None):
+    """Turn a local 'YYYY:MM:DD HH:MM:SS' date with its '+HH:MM' offset into the UTC date; '' stays ''.
+
+    Without an offset the date is in this computer's local time.
+    """
+    if not exif_date:
+        return ''
+    if offset:
+        moment = datetime.datetime.strptime(exif_date + offset.replace(':', ''), '%Y:%m:%d %H:%M:%S%z')
+    else:
+        moment = datetime.datetime.strptime(exif_date, '%Y:%m:%d %H:%M:%S').astimezone()
+    return moment.astimezone(datetime.timezone.utc).strftime('%Y:%m:%d %H:%M:%S')
+
+def sidecar_location(data):
+    """Return (latitude, longitude) from a loaded sidecar's geoData or geoDataExif, or None.
+
+    Google writes 0.0/0.0 when a photo has no location.
+    """
+    for key in ('geoData', 'geoDataExif'):
+        geo = data.get(key) or {}
+        latitude, longitude = geo.get('latitude'), geo.get('longitude')
+        if latitude is None or longitude is None:
+            continue
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except (TypeError, ValueError):
+            continue
+        if (latitude, longitude) != (0.0, 0.0) and -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+    return None
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# States a file goes through; each script records the ones that apply to it
+DISCOVERED = 'discovered'
+JSON_RESOLVED = 'json-resolved'
+TAGGED = 'tagged'
+MOVED = 'moved'
+
+# Bytes read from each end of a file for quick_hash
+quick_hash_chunk = 64 * 1024
+
+def quick_hash(path):
+    """Hash a file's size plus its first and last 64 KB; cheap enough to run on every file."""
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as file:
+        digest.update(file.read(quick_hash_chunk))
+        if size > 2 * quick_hash_chunk:
+            file.seek(-quick_hash_chunk, os.SEEK_END)
+            digest.update(file.read(quick_hash_chunk))
+        elif size > quick_hash_chunk:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+class Journal:
+    """Record the state of every file a script handles in an SQLite database, so an interrupted run can resume.
+
+    Each script writes under its own `stage` name. Records are kept in memory
+    and committed in batches of commit_size, or every commit_interval seconds;
+    after a crash at most one batch is lost and those files are redone. With
+    resume=False the stage's previous records are cleared; with resume=True
+    they are loaded so state() answers from memory.
+    """
+
+    def __init__(self, path, stage, resume=False, commit_size=1000, commit_interval=2.0):
+        self.stage = stage
+        self.commit_size = commit_size
+        self.commit_interval = commit_interval
+        self.lock = threading.Lock()
+        self.pending = []
+        self.last_commit = time.monotonic()
+        self.states = {}
+        self.destinations = {}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'stage TEXT NOT NULL, source TEXT NOT NULL, state TEXT NOT NULL, '
+            'content_hash TEXT, destination TEXT, updated REAL NOT NULL, '
+            'PRIMARY KEY (stage, source))'
+        )
+        if resume:
+            rows = self.connection.execute(
+                'SELECT source, state, destination FROM files WHERE stage = ?', (stage,))
+            for source, state, destination in rows:
+                self.states[source] = state
+                if destination:
+                    self.destinations[destination] = source
+        else:
+            self.connection.execute('DELETE FROM files WHERE stage = ?', (stage,))
+        self.connection.commit()
+
+    def state(self, source):
+        """Return the last recorded state of source, or None."""
+        return self.states.get(str(source))
+
+    def is_destination(self, path):
+        """Return True if path is where this stage already moved a file."""
+        return str(path) in self.destinations
+
+    def in_state(self, state):
+        """Return (source, destination) pairs whose last recorded state is `state`."""
+        with self.lock:
+            sources = [source for source, current in self.states.items() if current == state]
+            by_source = {source: destination for destination, source in self.destinations.items()}
+        return [(source, by_source.get(source)) for source in sources]
+
+    def record(self, source, state, content_hash=None, destination=None):
+        """Record that source reached state; written to disk with the next batch."""
+        source = str(source)
+        destination = str(destination) if destination is not None else None
+        with self.lock:
+            self.states[source] = state
+            if destination:
+                self.destinations[destination] = source
+            self.pending.append((self.stage, source, state, content_hash, destination, time.time()))
+            if len(self.pending) >= self.commit_size or time.monotonic() - self.last_commit >= self.commit_interval:
+                self._commit()
+
+    def _commit(self):
+        """Write pending records in one transaction; the caller holds the lock."""
+        if self.pending:
+            self.connection.executemany(
+                'INSERT INTO files (stage, source, state, content_hash, destination, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (stage, source) DO UPDATE SET state = excluded.state, '
+                'content_hash = COALESCE(excluded.content_hash, files.content_hash), '
+                'destination = COALESCE(excluded.destination, files.destination), '
+                'updated = excluded.updated',
+                self.pending,
+            )
+            self.connection.commit()
+            self.pending = []
+        self.last_commit = time.monotonic()
+
+    def flush(self):
+        """Commit every pending record now."""
+        with self.lock:
+            self._commit()
+
+    def close(self):
+        """Commit pending records and close the database."""
+        with self.lock:
+            self._commit()
+            self.connection.close()
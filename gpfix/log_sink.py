@@ -0,0 +1,116 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+# Every script logs to this one file, one JSON object per line
+default_log_file = os.path.expanduser('~/takeout-put/log.jsonl')
+
+# Level names accepted by configure (and the --log-level options of the scripts)
+LEVELS = ('debug', 'info', 'warning', 'error')
+
+# Structured fields a record may carry, passed as logging's extra={...}
+FIELDS = ('file', 'stage', 'duration', 'outcome')
+
+# The writer waits this long for more records before writing what it has, and writes
+# at most this many records at a time
+flush_interval = 0.5
+batch_size = 1000
+
+_writer = None
+
+class LogWriter(threading.Thread):
+    """Background thread taking log records off a queue and appending them to a file in batches."""
+
+    _stop_marker = object()
+
+    def __init__(self, path):
+        super().__init__(name='log-writer', daemon=True)
+        self.path = path
+        self.queue = queue.SimpleQueue()
+
+    def run(self):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            while True:
+                # Collect records for up to flush_interval after the first one arrives
+                records = [self.queue.get()]
+                deadline = time.monotonic() + flush_interval
+                try:
+                    while len(records) < batch_size and records[-1] is not self._stop_marker:
+                        records.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    pass
+                stop = records[-1] is self._stop_marker
+                if stop:
+                    records.pop()
+                if records:
+                    file.write(''.join(format_record(record) for record in records))
+                    file.flush()
+                if stop:
+                    return
+
+    def stop(self):
+        """Write every queued record and end the thread."""
+        self.queue.put(self._stop_marker)
+        self.join()
+
+def format_record(record):
+    """Format a log record as one JSON line."""
+    entry = {
+        'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+        'level': record.levelname.lower(),
+        'logger': record.name,
+        'message': record.getMessage(),
+    }
+    for field in FIELDS:
+        value = getattr(record, field, None)
+        if value is not None:
+            entry[field] = str(value) if field == 'file' else value
+    if record.exc_text:
+        entry['exception'] = record.exc_text
+    return json.dumps(entry, default=str) + '\n'
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hand records to the writer thread, formatting tracebacks here while they are still available."""
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+def configure(path=None, level='info'):
+    """Send every logger's records to the shared JSON-lines file through a background writer.
+
+    Safe to call more than once; later calls only change the level.
+    """
+    global _writer
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    if _writer is not None:
+        return
+    path = path or default_log_file
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _writer = LogWriter(path)
+    _writer.start()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(_writer.queue))
+    atexit.register(shutdown)
+
+def shutdown():
+    """Write the records still queued and stop the writer."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        for handler in logging.getLogger().handlers[:]:
+            if isinstance(handler, _QueueHandler):
+                logging.getLogger().removeHandler(handler)
+        writer.stop()
@@ -0,0 +1,182 @@
+import bisect
+import threading
+import time
+
+# Timing is off unless a script is run with --profile or --metrics-port; timed() then
+# costs one attribute check
+enabled = False
+
+# Latency histogram buckets: 1 µs up to about 20 minutes, each about 19% wider than the
+# last, so a percentile read from them is within that much of the true value
+BUCKET_GROWTH = 2 ** 0.25
+BUCKET_BOUNDS = [1e-6 * BUCKET_GROWTH ** index for index in range(122)]
+
+# Percentiles reported by summary() and exposed to scrapers
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """Count observed durations in fixed logarithmic buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+
+    def quantile(self, q):
+        """Return the upper bound of the bucket holding the q-th quantile, or 0.0 if empty."""
+        with self.lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket in enumerate(counts):
+            seen += bucket
+            if seen >= rank:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+def observe(stage, seconds):
+    """Record that one run of stage took seconds, when timing is enabled."""
+    if not enabled:
+        return
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(stage, Histogram())
+    histogram.observe(seconds)
+
+def count(event, amount=1):
+    """Add amount to the counter for event, e.g. 'tagged' or 'moved'."""
+    if enabled:
+        with _lock:
+            _counters[event] = _counters.get(event, 0) + amount
+
+class _Timer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_no_timer = _NoTimer()
+
+def timed(stage):
+    """Context manager recording how long its block takes under stage, when timing is enabled."""
+    return _Timer(stage) if enabled else _no_timer
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+def summary():
+    """Return a table of counters and per-stage latencies."""
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    lines = [f"{'stage':<16} {'count':>8} {'total s':>9} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for stage, histogram in histograms:
+        mean = histogram.total / histogram.count if histogram.count else 0.0
+        p50, p95, p99 = (histogram.quantile(q) * 1000 for q in QUANTILES)
+        lines.append(f"{stage:<16} {histogram.count:>8} {histogram.total:>9.3f} {mean * 1000:>9.3f} "
+                     f"{p50:>9.3f} {p95:>9.3f} {p99:>9.3f}")
+    if counters:
+        lines.append('')
+        lines.extend(f"{event:<16} {value:>8}" for event, value in counters)
+    return '\n'.join(lines)
+
+def prometheus_text():
+    """Return the counters and latencies in the Prometheus text exposition format."""
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    lines = ['# TYPE gpfix_stage_seconds summary']
+    for stage, histogram in histograms:
+        for q in QUANTILES:
+            lines.append(f'gpfix_stage_seconds{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q):.9f}')
+        lines.append(f'gpfix_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.9f}')
+        lines.append(f'gpfix_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+    lines.append('# TYPE gpfix_events_total counter')
+    lines.extend(f'gpfix_events_total{{event="{event}"}} {value}' for event, value in counters)
+    return '\n'.join(lines) + '\n'
+
+def serve(port, host='127.0.0.1'):
+    """Enable timing and serve live metrics at http://host:port/metrics from a background thread."""
+    global enabled
+    # Imported here so scripts not serving metrics do not pay for loading them
+    import http.server
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    enabled = True
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+def profile(func, output=None):
+    """Run func() with timing enabled and print the summary afterwards.
+
+    With output, func also runs under cProfile and the stats are dumped to
+    that file for pstats or snakeviz. cProfile only sees the calling thread;
+    the per-stage timings cover the worker threads.
+    """
+    global enabled
+    import cProfile
+    import pstats
+    enabled = True
+    profiler = cProfile.Profile() if output else None
+    try:
+        if profiler:
+            profiler.enable()
+        return func()
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(output)
+        print('\n' + summary())
+        if profiler:
+            print(f"\nProfile written to {output}; top functions by cumulative time:")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
@@ -0,0 +1,367 @@
+import datetime
+import mmap
+import os
+import struct
+import zlib
+
+# Tags this module can write, and where they live in a TIFF (EXIF) structure
+EXIF_IFD_POINTER = 0x8769
+IFD0_DATE_TAGS = {0x0132: 'ModifyDate'}
+EXIF_IFD_DATE_TAGS = {0x9003: 'DateTimeOriginal', 0x9004: 'CreateDate', 0x9011: 'OffsetTimeOriginal'}
+
+# EXIF dates are 19 characters plus a NUL terminator, offsets ('+02:00') 6
+EXIF_DATE_LENGTH = 20
+OFFSET_LENGTH = 7
+ASCII = 2
+
+# QuickTime times count seconds from 1904-01-01 UTC
+QUICKTIME_EPOCH = datetime.datetime(1904, 1, 1)
+
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
+PNG_EXTENSIONS = ('.png',)
+HEIF_EXTENSIONS = ('.heic', '.heif')
+QUICKTIME_EXTENSIONS = ('.mp4', '.mov', '.m4v', '.3gp')
+TIFF_EXTENSIONS = ('.tif', '.tiff')
+
+def supports(path):
+    """Return True if the file extension is one write_dates may be able to handle."""
+    return str(path).lower().endswith(JPEG_EXTENSIONS + PNG_EXTENSIONS + HEIF_EXTENSIONS + QUICKTIME_EXTENSIONS)
+
+def write_dates(path, dates):
+    """Overwrite date tags in place, without rewriting the file.
+
+    dates maps 'DateTimeOriginal', 'CreateDate' and/or 'ModifyDate' to
+    'YYYY:MM:DD HH:MM:SS' strings, and may hold 'OffsetTimeOriginal' as
+    '+HH:MM', which MP4/MOV files have no room for and ignore. MP4/MOV files
+    store DateTimeOriginal (or CreateDate without it) as their creation time,
+    which is what players show. Only tags that already exist in the file
+    can be patched, since that is a same-length overwrite. Returns True if
+    every tag was written. Returns False and leaves the file untouched if the
+    format is not handled, a tag is missing or a value is empty; the caller
+    should then fall back to exiftool.
+    """
+    if not dates or not all(dates.values()) or not supports(path):
+        return False
+    name = str(path).lower()
+    try:
+        with open(path, 'r+b') as file:
+            with mmap.mmap(file.fileno(), 0) as data:
+                if name.endswith(JPEG_EXTENSIONS):
+                    patches = _jpeg_patches(data, dates)
+                elif name.endswith(PNG_EXTENSIONS):
+                    patches = _png_patches(data, dates)
+                elif name.endswith(HEIF_EXTENSIONS):
+                    patches = _heif_patches(data, dates)
+                else:
+                    patches = _quicktime_patches(data, dates)
+                if not patches:
+                    return False
+                for offset, value in patches:
+                    data[offset:offset + len(value)] = value
+                data.flush()
+    except (OSError, ValueError, struct.error):
+        return False
+    return True
+
+def readable(path):
+    """Return True if read_dates understands the file's format."""
+    return str(path).lower().endswith(JPEG_EXTENSIONS + PNG_EXTENSIONS + HEIF_EXTENSIONS + QUICKTIME_EXTENSIONS + TIFF_EXTENSIONS)
+
+def read_dates(path):
+    """Read the date tags of a JPEG, PNG, HEIC, TIFF or MP4/MOV file, touching only the metadata.
+
+    Returns a dict mapping the tag names found to their string values. For
+    MP4/MOV files these are CreateDate and ModifyDate from the movie header.
+    """
+    name = str(path).lower()
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if name.endswith(QUICKTIME_EXTENSIONS):
+                return _quicktime_dates(data)
+            if name.endswith(JPEG_EXTENSIONS):
+                tiff = _jpeg_tiff(data)
+            elif name.endswith(PNG_EXTENSIONS):
+                chunk = _png_exif_chunk(data)
+                tiff = chunk[1:] if chunk else None
+            elif name.endswith(HEIF_EXTENSIONS):
+                tiff = _heif_tiff(data)
+            elif name.endswith(TIFF_EXTENSIONS):
+                tiff = 0, len(data)
+            else:
+                tiff = None
+            if not tiff:
+                return {}
+            return {
+                tag: bytes(data[offset:offset + length]).split(b'\0', 1)[0].decode('ascii', 'replace').strip()
+                for tag, (offset, length) in _tiff_date_entries(data, *tiff).items()
+            }
+
+def holds_dates(path, dates):
+    """Return True if the file already holds every value in dates, False if not.
+
+    dates is what write_dates would be given. Returns None if the format is
+    not one read_dates understands, so the caller has to find out otherwise.
+    """
+    if not readable(path):
+        return None
+    try:
+        current = read_dates(path)
+    except (OSError, ValueError, struct.error):
+        return False
+    if str(path).lower().endswith(QUICKTIME_EXTENSIONS):
+        # Compare the way write_dates maps the tags onto the movie header
+        created = dates.get('DateTimeOriginal') or dates.get('CreateDate')
+        wanted = {'CreateDate': created, 'ModifyDate': dates.get('ModifyDate')}
+        dates = {tag: value for tag, value in wanted.items() if value}
+    return any(dates.values()) and all(current.get(tag, '') == value for tag, value in dates.items())
+
+def _tiff_date_entries(data, start, end):
+    """Map date tag names to (value offset, length) for the TIFF structure at data[start:end]."""
+    byte_order = bytes(data[start:start + 2])
+    if byte_order == b'II':
+        prefix = '<'
+    elif byte_order == b'MM':
+        prefix = '>'
+    else:
+        return {}
+    if struct.unpack_from(prefix + 'H', data, start + 2)[0] != 42:
+        return {}
+
+    def read_ifd(offset, wanted):
+        """Map tag names in wanted to value locations; also return the Exif IFD pointer if present."""
+        found = {}
+        exif_ifd = None
+        position = start + offset
+        if offset <= 0 or position + 2 > end:
+            return found, exif_ifd
+        count = struct.unpack_from(prefix + 'H', data, position)[0]
+        for index in range(count):
+            entry = position + 2 + index * 12
+            if entry + 12 > end:
+                break
+            tag, kind, length, value = struct.unpack_from(prefix + 'HHII', data, entry)
+            if tag == EXIF_IFD_POINTER:
+                exif_ifd = value
+            elif tag in wanted and kind == ASCII and length > 4 and start + value + length <= end:
+                found[wanted[tag]] = (start + value, length)
+        return found, exif_ifd
+
+    ifd0_offset = struct.unpack_from(prefix + 'I', data, start + 4)[0]
+    entries, exif_ifd = read_ifd(ifd0_offset, IFD0_DATE_TAGS)
+    if exif_ifd:
+        entries.update(read_ifd(exif_ifd, EXIF_IFD_DATE_TAGS)[0])
+    return entries
+
+def _tiff_patches(data, start, end, dates):
+    """Return (offset, bytes) patches for the date tags in the TIFF structure at data[start:end], or None."""
+    entries = _tiff_date_entries(data, start, end)
+    lengths = {tag: OFFSET_LENGTH if tag == 'OffsetTimeOriginal' else EXIF_DATE_LENGTH for tag in dates}
+    if not all(tag in entries and entries[tag][1] == lengths[tag] for tag in dates):
+        return None
+    return [(entries[tag][0], value.encode('ascii')[:lengths[tag] - 1].ljust(lengths[tag], b'\0'))
+            for tag, value in dates.items()]
+
+def _jpeg_patches(data, dates):
+    """Find the APP1 Exif segment of a JPEG and patch its TIFF structure."""
+    tiff = _jpeg_tiff(data)
+    return _tiff_patches(data, *tiff, dates) if tiff else None
+
+def _jpeg_tiff(data):
+    """Return (start, end) of the TIFF structure in a JPEG's APP1 Exif segment, or None."""
+    if data[:2] != b'\xff\xd8':
+        return None
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            position += 1
+            continue
+        if marker == 0xDA or marker == 0xD9:
+            # Start of scan or end of image; no Exif segment before the image data
+            return None
+        length = struct.unpack_from('>H', data, position + 2)[0]
+        segment = position + 4
+        if marker == 0xE1 and data[segment:segment + 6] == b'Exif\0\0':
+            return segment + 6, position + 2 + length
+        position += 2 + length
+    return None
+
+def _png_patches(data, dates):
+    """Find the eXIf chunk of a PNG, patch its TIFF structure and its CRC."""
+    found = _png_exif_chunk(data)
+    if not found:
+        return None
+    position, tiff, chunk_end = found
+    patches = _tiff_patches(data, tiff, chunk_end, dates)
+    if not patches:
+        return None
+    # The chunk CRC covers the type and data, so compute it over the patched bytes
+    patched = bytearray(data[position + 4:chunk_end])
+    for offset, value in patches:
+        patched[offset - position - 4:offset - position - 4 + len(value)] = value
+    patches.append((chunk_end, struct.pack('>I', zlib.crc32(patched))))
+    return patches
+
+def _png_exif_chunk(data):
+    """Return (chunk position, TIFF start, chunk data end) of a PNG's eXIf chunk, or None."""
+    if data[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    position = 8
+    while position + 12 <= len(data):
+        length, kind = struct.unpack_from('>I4s', data, position)
+        chunk = position + 8
+        if kind == b'eXIf':
+            tiff = chunk + 6 if data[chunk:chunk + 6] == b'Exif\0\0' else chunk
+            return position, tiff, chunk + length
+        if kind == b'IEND':
+            return None
+        position = chunk + length + 4
+    return None
+
+def _boxes(data, start, end):
+    """Yield (type, payload start, box end) for the ISO-BMFF boxes in data[start:end]."""
+    position = start
+    while position + 8 <= end:
+        size, kind = struct.unpack_from('>I4s', data, position)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, position + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header or position + size > end:
+            return
+        yield kind, position + header, position + size
+        position += size
+
+def _heif_patches(data, dates):
+    """Find the Exif item of a HEIC/HEIF file and patch its TIFF structure."""
+    tiff = _heif_tiff(data)
+    return _tiff_patches(data, *tiff, dates) if tiff else None
+
+def _heif_tiff(data):
+    """Return (start, end) of the TIFF structure in a HEIC/HEIF Exif item, found through the meta box, or None."""
+    meta = next(((payload, end) for kind, payload, end in _boxes(data, 0, len(data)) if kind == b'meta'), None)
+    if meta is None:
+        return None
+    # meta is a full box: skip version and flags
+    children = {kind: (payload, end) for kind, payload, end in _boxes(data, meta[0] + 4, meta[1])}
+    if b'iinf' not in children or b'iloc' not in children:
+        return None
+
+    exif_item = None
+    payload, end = children[b'iinf']
+    version = data[payload]
+    entries = payload + (8 if version else 6)
+    for kind, infe, infe_end in _boxes(data, entries, end):
+        if kind != b'infe' or data[infe] < 2:
+            continue
+        if data[infe] == 2:
+            item_id = struct.unpack_from('>H', data, infe + 4)[0]
+            item_type = bytes(data[infe + 8:infe + 12])
+        else:
+            item_id = struct.unpack_from('>I', data, infe + 4)[0]
+            item_type = bytes(data[infe + 10:infe + 14])
+        if item_type == b'Exif':
+            exif_item = item_id
+            break
+    if exif_item is None:
+        return None
+
+    payload, end = children[b'iloc']
+    version = data[payload]
+    offset_size, length_size = data[payload + 4] >> 4, data[payload + 4] & 0x0F
+    base_offset_size = data[payload + 5] >> 4
+    index_size = data[payload + 5] & 0x0F if version in (1, 2) else 0
+    position = payload + 6
+
+    def read(size):
+        nonlocal position
+        value = int.from_bytes(data[position:position + size], 'big') if size else 0
+        position += size
+        return value
+
+    item_count = read(2 if version < 2 else 4)
+    for _ in range(item_count):
+        item_id = read(2 if version < 2 else 4)
+        construction_method = read(2) & 0x0F if version in (1, 2) else 0
+        read(2)  # data_reference_index
+        base_offset = read(base_offset_size)
+        extents = []
+        for _ in range(read(2)):
+            read(index_size)
+            extents.append((read(offset_size), read(length_size)))
+        if item_id != exif_item:
+            continue
+        if construction_method != 0 or len(extents) != 1:
+            return None
+        start = base_offset + extents[0][0]
+        end = start + extents[0][1]
+        # The Exif item starts with the offset of the TIFF header within it
+        return start + 4 + struct.unpack_from('>I', data, start)[0], end
+    return None
+
+def _quicktime_time(value):
+    """Convert an EXIF date string to seconds since the QuickTime epoch."""
+    moment = datetime.datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
+    return int((moment - QUICKTIME_EPOCH).total_seconds())
+
+def _quicktime_headers(data):
+    """Return the payload offsets of the mvhd, tkhd and mdhd boxes of an MP4/MOV file, mvhd first."""
+    headers = []
+
+    def collect(start, end):
+        for kind, payload, box_end in _boxes(data, start, end):
+            if kind in (b'mvhd', b'tkhd', b'mdhd'):
+                headers.append(payload)
+            elif kind in (b'moov', b'trak', b'mdia'):
+                collect(payload, box_end)
+
+    collect(0, len(data))
+    return headers
+
+def _quicktime_dates(data):
+    """Return CreateDate and ModifyDate from the movie header of an MP4/MOV file."""
+    headers = _quicktime_headers(data)
+    if not headers:
+        return {}
+    payload = headers[0]
+    size, fmt = (8, '>Q') if data[payload] == 1 else (4, '>I')
+    dates = {}
+    for index, tag in enumerate(('CreateDate', 'ModifyDate')):
+        seconds = struct.unpack_from(fmt, data, payload + 4 + index * size)[0]
+        if seconds:
+            moment = QUICKTIME_EPOCH + datetime.timedelta(seconds=seconds)
+            dates[tag] = moment.strftime('%Y:%m:%d %H:%M:%S')
+    return dates
+
+def _quicktime_patches(data, dates):
+    """Patch creation/modification times in the mvhd, tkhd and mdhd boxes of an MP4/MOV file.
+
+    QuickTime has no DateTimeOriginal; it is written as the creation time,
+    which players show as the date the video was taken. CreateDate is only
+    used when DateTimeOriginal is not given.
+    """
+    created = dates.get('DateTimeOriginal') or dates.get('CreateDate')
+    modified = dates.get('ModifyDate')
+    times = [(0, _quicktime_time(created)) if created else None, (1, _quicktime_time(modified)) if modified else None]
+    times = [time for time in times if time]
+
+    headers = _quicktime_headers(data)
+    if not headers:
+        return None
+
+    patches = []
+    for payload in headers:
+        # Full box: version 1 stores 64-bit times, version 0 32-bit ones
+        size, fmt = (8, '>Q') if data[payload] == 1 else (4, '>I')
+        for index, seconds in times:
+            if seconds < 0 or seconds >= 1 << (8 * size):
+                return None
+            patches.append((payload + 4 + index * size, struct.pack(fmt, seconds)))
+    return patches
@@ -0,0 +1,115 @@
+import queue
+import threading
+
+from . import metrics
+
+# Marks the end of the stream on a stage's input queue
+_end = object()
+
+class Stage:
+    """One step of a Pipeline: func is called on each item by `workers` threads.
+
+    func returns the item to pass to the next stage, or None to drop it.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=64):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+
+class Pipeline:
+    """Stream items from a source generator through Stages connected by bounded queues.
+
+    Every stage runs in its own threads and blocks when the queue to the next
+    stage is full, so a slow stage holds back the ones before it instead of
+    letting work pile up in memory.
+    """
+
+    def __init__(self, source, stages, on_error=None):
+        self.source = source
+        self.stages = stages
+        self.on_error = on_error
+        self.stopped = threading.Event()
+        self.error = None
+        self.error_lock = threading.Lock()
+
+    def stop(self):
+        """Ask the source to stop producing; items already in flight still finish."""
+        self.stopped.set()
+
+    def _fail(self, error):
+        """Remember the first error raised by a stage and stop the source."""
+        with self.error_lock:
+            if self.error is None:
+                self.error = error
+        self.stop()
+        if self.on_error:
+            # Lets a source blocked on something other than the queues be woken up
+            self.on_error(error)
+
+    def _produce(self, output):
+        try:
+            for item in self.source:
+                if self.stopped.is_set():
+                    break
+                output.put(item)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            output.put(_end)
+
+    def _work(self, stage, input, output, remaining, lock):
+        try:
+            while True:
+                item = input.get()
+                if item is _end:
+                    # Let the other workers of this stage see the end marker too
+                    input.put(_end)
+                    break
+                try:
+                    with metrics.timed(stage.name):
+                        result = stage.func(item)
+                except Exception as e:
+                    self._fail(e)
+                    continue
+                if result is not None:
+                    output.put(result)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                output.put(_end)
+
+    def run(self):
+        """Start every stage and yield the items that come out of the last one.
+
+        Re-raises the first exception raised by the source or a stage once the
+        pipeline has drained.
+        """
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues.append(queue.Queue(maxsize=self.stages[-1].queue_size if self.stages else 64))
+        threads = [threading.Thread(target=self._produce, args=(queues[0],), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], queues[index + 1], remaining, lock),
+                    name=f'{stage.name}-worker', daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        while True:
+            item = queues[-1].get()
+            if item is _end:
+                break
+            yield item
+
+        for thread in threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,717 @@
+import subprocess
+import os
+from pathlib import Path
+import shutil
+import queue
+import sys
+import threading
+import time
+import logging
+import argparse
+from concurrent.futures import Future
+
+from . import dedup
+from .exiftool_pool import ExiftoolBatcher, run_exiftool
+from .extract_dates import completed
+from .file_mover import FileMover
+from . import file_scanner
+from .file_scanner import scan, scan_directories
+from .filename_dates import extract_date
+from . import geo_timezone
+from . import native_exif
+from . import log_sink
+from . import metrics
+from .journal import DISCOVERED, JSON_RESOLVED, MOVED, TAGGED, Journal, quick_hash
+from .pipeline import Pipeline, Stage
+from .sidecar_index import SidecarIndex
+from . import sidecar_parser
+from .sidecar_parser import SidecarStore
+from . import sorting
+from . import tag_check
+from .takeout_archive import build_archive_index, extract_member, iter_media, open_archives
+
+# Define source and destination directories
+source_dir = Path('~/takeout').expanduser()
+destination_dir = Path('~/takeout-put').expanduser()
+no_exif_data_dir = destination_dir / 'noexifdata'
+journal_file = destination_dir / 'journal.sqlite'
+sidecar_cache_file = destination_dir / 'sidecar-cache.sqlite'
+duplicates_report_file = destination_dir / 'duplicates.csv'
+
+# Log records go to the shared JSON-lines log (see log_sink). Once the user has confirmed
+# the first batch, suppress_logs drops the per-file info records; errors are still logged.
+logger = logging.getLogger('process_images')
+suppress_logs = False
+
+# Records the state of each file so an interrupted run can be resumed; opened by process_files
+journal = None
+
+# Index of JSON sidecars, filled by scan_files as it reads the takeout
+sidecar_index = None
+
+# Parsed JSON sidecars, prefetched in a process pool as the scan finds them and cached in
+# sidecar_cache_file for the next run; opened by process_files
+sidecars = None
+
+# EXIF writes are grouped and sent to exiftool in batches of up to this many files,
+# or after waiting this many seconds for a batch to fill
+exif_batch_size = 32
+exif_flush_interval = 0.5
+exif_batcher = None
+
+# Patch dates that already exist in JPEG/PNG/HEIC/MP4 files in place instead of having
+# exiftool rewrite the whole file; anything it cannot patch still goes to exiftool
+native_writer = True
+
+# With --dedup, copies of a file found elsewhere in the takeout (album folders repeat the
+# year folders) are not tagged and moved themselves. Maps the copy that is processed to
+# its duplicates; filled by find_duplicate_files.
+duplicates = {}
+duplicate_files = set()
+dedup_mode = None
+
+# Files that already held the dates to be written and were left unchanged (see tag_check);
+# reported at the end of the run
+unchanged_files = 0
+unchanged_lock = threading.Lock()
+
+# In fused mode (see process_files) files go straight to their final/<category> folder
+# through this mover, which never overwrites a file of the same name
+fused_mover = None
+
+# Worker threads for each pipeline stage, and how many files may wait between stages.
+# The writer only queues writes, which fill exiftool batches while the mover waits for them.
+metadata_workers = 2
+writer_workers = 4
+mover_workers = 2
+stage_queue_size = 256
+
+def set_directories(source=None, destination=None):
+    """Read the takeout from source and put results (and the journal) under destination."""
+    global source_dir, destination_dir, no_exif_data_dir, journal_file, sidecar_cache_file, duplicates_report_file
+    if source is not None:
+        source_dir = Path(source).expanduser()
+    if destination is not None:
+        destination_dir = Path(destination).expanduser()
+        no_exif_data_dir = destination_dir / 'noexifdata'
+        journal_file = destination_dir / 'journal.sqlite'
+        sidecar_cache_file = destination_dir / 'sidecar-cache.sqlite'
+        duplicates_report_file = destination_dir / 'duplicates.csv'
+
+def get_exif_batcher():
+    """Return the batcher used for EXIF writes, creating it on first use."""
+    global exif_batcher
+    if exif_batcher is None:
+        exif_batcher = ExiftoolBatcher(batch_size=exif_batch_size, flush_interval=exif_flush_interval)
+    return exif_batcher
+
+def close_exif_batcher():
+    """Send any pending EXIF writes and stop the batcher."""
+    global exif_batcher
+    if exif_batcher is not None:
+        exif_batcher.close()
+        exif_batcher = None
+
+def timestamp_to_exif_date(timestamp, location=None):
+    """Convert Unix timestamp to EXIF date-time format, in local time where the photo was taken (see geo_timezone)."""
+    if timestamp:
+        dt = geo_timezone.local_time(timestamp, location)
+        return dt.strftime('%Y:%m:%d %H:%M:%S')
+    return ''
+
+def read_exif_dates(json_path):
+    """Read the photo taken and creation dates from a JSON file; None if it has neither."""
+    sidecar = sidecars.get(json_path) if sidecars else sidecar_parser.parse_file(json_path)
+    return exif_dates_from_sidecar(sidecar, json_path)
+
+def exif_dates_from_sidecar(sidecar, json_path):
+    """Return the (photo taken, creation, UTC offset) dates of a parsed sidecar; None if it has neither date.
+
+    Dates are local to the photo's geoData location, or to this computer if
+    it has none; the offset is that of the photo taken date, e.g. '+02:00',
+    and is only known with a location, so it is '' without one.
+    """
+    location = sidecar.location
+    taken_timestamp = sidecar.photo_taken
+    creation_time = timestamp_to_exif_date(sidecar.created, location)
+    photo_taken_time = timestamp_to_exif_date(taken_timestamp, location)
+
+    if not creation_time and not photo_taken_time:
+        log_error(f"No valid EXIF data found in {json_path}.")
+        return None
+    offset = ''
+    if photo_taken_time and location is not None:
+        offset = geo_timezone.format_offset(geo_timezone.local_time(taken_timestamp, location))
+    return photo_taken_time, creation_time, offset
+
+def record_unchanged(file_path, start):
+    """Count and log a file whose dates were already right, so nothing was written."""
+    global unchanged_files
+    with unchanged_lock:
+        unchanged_files += 1
+    metrics.count('unchanged')
+    log_info(f"{file_path} already holds its dates, left unchanged",  # Log processing details
+             file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='unchanged')
+
+def write_exif_dates(file_path, json_path, photo_taken_time, creation_time, offset=''):
+    """Queue the write of the dates read from json_path to the image file; returns a Future resolving to True once written.
+
+    The dates are patched in place if possible, otherwise written by
+    exiftool. offset is written as OffsetTimeOriginal; MP4/MOV files, which
+    store UTC, get the dates converted to UTC instead, from this computer's
+    local time if there is no offset. The file's current dates are read
+    first, in the same exiftool batches as the writes (see tag_check), and
+    nothing is written if it already holds these dates. The Future resolves
+    to False if the write failed.
+    """
+    start = time.perf_counter()
+    dates = {
+        'DateTimeOriginal': photo_taken_time,
+        'CreateDate': creation_time,
+        'ModifyDate': creation_time,
+    }
+    if str(file_path).lower().endswith(native_exif.QUICKTIME_EXTENSIONS):
+        dates = {tag: geo_timezone.to_utc(value, offset) for tag, value in dates.items()}
+    elif offset:
+        dates['OffsetTimeOriginal'] = offset
+    done = Future()
+
+    def finish(future, submitted):
+        try:
+            result = future.result()
+            metrics.observe('exiftool', time.perf_counter() - submitted)
+            if result.returncode == 0:
+                log_info(f"Applied EXIF data from {json_path} to {file_path}",  # Log processing details
+                         file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='tagged')
+                done.set_result(True)
+            else:
+                log_error(f"Failed to apply EXIF data: {result.stderr}",
+                          file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='failed')
+                done.set_result(False)
+        except subprocess.CalledProcessError as e:
+            log_error(f"Error applying EXIF data: {e}",
+                      file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='failed')
+            done.set_result(False)
+        except subprocess.TimeoutExpired:
+            log_error(f"Timed out while applying EXIF data to {file_path}",
+                      file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='timeout')
+            done.set_result(False)
+        except Exception as e:
+            done.set_exception(e)
+
+    def write(check):
+        try:
+            if check.result():
+                record_unchanged(file_path, start)
+                done.set_result(True)
+                return
+            with metrics.timed('native_write'):
+                written = native_writer and native_exif.write_dates(file_path, dates)
+            if written:
+                log_info(f"Applied EXIF data from {json_path} to {file_path} in place",  # Log processing details
+                         file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='patched')
+                done.set_result(True)
+                return
+
+            command = [
+                f'-DateTimeOriginal={dates["DateTimeOriginal"]}',
+                f'-CreateDate={dates["CreateDate"]}',
+                f'-ModifyDate={dates["ModifyDate"]}',  # Update modified date
+                str(file_path)
+            ]
+            if 'OffsetTimeOriginal' in dates:
+                command.insert(-1, f'-OffsetTimeOriginal={offset}')
+            submitted = time.perf_counter()
+            get_exif_batcher().submit(command).add_done_callback(lambda future: finish(future, submitted))
+        except Exception as e:
+            done.set_exception(e)
+
+    check_dates(file_path, dates).add_done_callback(write)
+    return done
+
+def write_name_date(file_path, moment):
+    """Queue the write of a date taken from the file name, like extract_dates; returns a Future resolving to True once written.
+
+    The date goes to DateTimeOriginal, and once it is written, to the
+    modification time.
+    """
+    exif_date = moment.strftime('%Y:%m:%d %H:%M:%S')
+    tag_date = exif_date
+    if str(file_path).lower().endswith(native_exif.QUICKTIME_EXTENSIONS):
+        # Names hold this computer's local time; MP4/MOV files store UTC
+        tag_date = geo_timezone.to_utc(exif_date)
+    start = time.perf_counter()
+    done = Future()
+
+    def finish(future, unchanged=False):
+        try:
+            result = future.result()
+            if result.returncode != 0:
+                log_error(f"Failed to apply date from the file name: {result.stderr}",
+                          file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='failed')
+                done.set_result(False)
+                return
+            # Set the modification date after exiftool, which rewrites the file
+            timestamp = moment.timestamp()
+            os.utime(file_path, (timestamp, timestamp))
+            if unchanged:
+                record_unchanged(file_path, start)
+            else:
+                log_info(f"Applied date {exif_date} from the file name to {file_path}",  # Log processing details
+                         file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='name-date')
+            done.set_result(True)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            log_error(f"Error applying date from the file name to {file_path}: {e}",
+                      file=file_path, stage='writer', duration=time.perf_counter() - start, outcome='failed')
+            done.set_result(False)
+        except Exception as e:
+            done.set_exception(e)
+
+    def write(check):
+        try:
+            if check.result():
+                finish(completed(subprocess.CompletedProcess([file_path], 0)), unchanged=True)
+                return
+            with metrics.timed('native_write'):
+                written = native_writer and native_exif.write_dates(file_path, {'DateTimeOriginal': tag_date})
+            if written:
+                finish(completed(subprocess.CompletedProcess([file_path], 0)))
+                return
+            get_exif_batcher().submit([f'-DateTimeOriginal={tag_date}', str(file_path)]).add_done_callback(finish)
+        except Exception as e:
+            done.set_exception(e)
+
+    check_dates(file_path, {'DateTimeOriginal': tag_date}).add_done_callback(write)
+    return done
+
+def check_dates(file_path, dates):
+    """Return a Future resolving to True if the file already holds dates and should be left alone (see tag_check)."""
+    if not tag_check.skip_unchanged:
+        return completed(False)
+    with metrics.timed('tag_check'):
+        return tag_check.check(file_path, dates, get_exif_batcher())
+
+def finish_write(file_path, written):
+    """Wait for a write queued by the writer stage, count it and journal the file as tagged.
+
+    written is None for a file an earlier run already tagged. Returns
+    whether the dates were applied.
+    """
+    if written is None:
+        return True
+    exif_applied = written.result()
+    metrics.count('tagged' if exif_applied else 'untagged')
+    if exif_applied:
+        journal.record(file_path, TAGGED)
+    return exif_applied
+
+def log_info(message, **fields):
+    """Log an informational message, with optional file, stage, duration and outcome fields."""
+    if not suppress_logs:
+        logger.info(message, extra=fields)
+
+def log_error(message, **fields):
+    """Log an error message, with optional file, stage, duration and outcome fields."""
+    logger.error(message, extra=fields)
+
+def move_file(file_path, exif_applied):
+    """Move a file to the destination folder, or to noexifdata if no EXIF data was applied."""
+    file_name = file_path.name
+    dest_folder_path = destination_dir if exif_applied else no_exif_data_dir
+    dest_folder_path.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(file_path), str(dest_folder_path / file_name))  # Move the file
+    log_info(f"Moved {file_name} to {dest_folder_path}", file=file_path, stage='mover', outcome='moved')  # Log processing details
+    return dest_folder_path / file_name
+
+def find_duplicate_files(mode):
+    """Find files in source_dir with identical content before processing starts.
+
+    With mode 'link', each duplicate is later replaced by a hardlink to the
+    processed copy, under its own name in the same destination folder. With
+    mode 'report', duplicates are listed in duplicates.csv and left in place.
+    Either way only one copy is tagged and moved.
+    """
+    global duplicates, duplicate_files, dedup_mode
+    media = [Path(entry.path) for entry in scan(source_dir, exclude=(destination_dir,), name_filter=is_media_name)]
+    print(f"Looking for duplicates among {len(media)} files...")
+    duplicates = dedup.find_duplicates(media)
+    duplicate_files = {copy for copies in duplicates.values() for copy in copies}
+    dedup_mode = mode
+    print(f"Found {len(duplicate_files)} duplicates of {len(duplicates)} files.")
+    if mode == 'report':
+        dedup.write_report(duplicates, duplicates_report_file)
+        print(f"Duplicates listed in {duplicates_report_file}")
+
+def link_duplicates(file_path, destination):
+    """Replace the duplicates of file_path with hardlinks to its destination; return the links made."""
+    links = []
+    for copy in duplicates.get(file_path, ()):
+        link_path = destination.parent / copy.name
+        try:
+            if dedup.link_duplicate(destination, link_path):
+                links.append(link_path)
+                log_info(f"Linked duplicate {copy} to {link_path}")  # Log processing details
+            else:
+                link_path = destination
+                log_info(f"Duplicate {copy} is already in {destination.parent}")  # Log processing details
+            os.remove(copy)
+            journal.record(copy, MOVED, destination=link_path)
+        except OSError as e:
+            log_error(f"Error linking duplicate {copy}: {e}")
+    return links
+
+def is_media_name(file_name):
+    """Return True for files to process: not JSON sidecars and not backups exiftool left behind."""
+    return not file_name.endswith('.json') and '_original_' not in file_name
+
+def scan_files(permits, confirmed, progress):
+    """Pipeline source: scan source_dir once, yielding (file, JSON file) pairs as each directory is read.
+
+    JSON files are indexed before the media files of the same directory are
+    yielded. Files without a JSON file in their own directory are held back
+    until the walk is done and then matched across directories, so the
+    match does not depend on the order directories were read in.
+    Duplicates found by find_duplicate_files are skipped. Until
+    `confirmed` is set, a permit is taken from `permits` before every 5 files;
+    a False permit stops the scan.
+    """
+    global sidecar_index
+    sidecar_index = SidecarIndex()
+    deferred = []
+    emitted = 0
+
+    def gate():
+        if confirmed.is_set() or emitted % 5:
+            return True
+        return permits.get()
+
+    # Directories are read in parallel (see file_scanner); the destination is skipped in case it lies inside the source
+    for _, entries in scan_directories(source_dir, exclude=(destination_dir,)):
+        media = []
+        json_files = []
+        for entry in entries:
+            if entry.name.endswith('.json'):
+                sidecar_index.add(Path(entry.path))
+                json_files.append(entry.path)
+            elif is_media_name(entry.name) and Path(entry.path) not in duplicate_files:
+                media.append(Path(entry.path))
+        progress['found'] += len(media)
+        if json_files:
+            sidecars.prefetch(json_files)
+
+        for file_path in media:
+            state = journal.state(file_path)
+            if state == MOVED:
+                # Already moved by an earlier run; this copy was extracted again
+                progress['found'] -= 1
+                continue
+            if state is None:
+                journal.record(file_path, DISCOVERED)
+            with metrics.timed('json_lookup'):
+                json_file = sidecar_index.lookup(file_path, same_dir_only=True)
+            if json_file is None:
+                deferred.append(file_path)
+                continue
+            if not gate():
+                return
+            emitted += 1
+            yield file_path, json_file
+
+    for file_path in deferred:
+        if not gate():
+            return
+        emitted += 1
+        with metrics.timed('json_lookup'):
+            json_file = sidecar_index.lookup(file_path)
+        yield file_path, json_file
+    progress['scan_complete'] = True
+
+def scan_archives(archives, permits, confirmed, progress, resume=False):
+    """Pipeline source: stream media out of Takeout archives, yielding (file, JSON file, dates) once extracted.
+
+    All JSON files are read first, so media can be matched with a JSON file
+    in any part. Each media file is then written once, straight to the
+    folder it belongs in; the writer and mover stages take it from there.
+    Members with the same name (album copies, or unrelated files) are given
+    ' (1)', ' (2)', ... so none is extracted over another still in the
+    pipeline. Archive order is fixed, so a resumed run gives each member the
+    same name again. Gated by permits and confirmed like scan_files.
+    """
+    print("Reading JSON files from the archives...")
+    index, archive_dates = build_archive_index(archives, exif_dates_from_sidecar)
+    emitted = 0
+    # Lower-cased names given out so far, across both folders, since a file whose write fails moves to noexifdata
+    claimed = set()
+
+    def claim(file_name):
+        stem, ext = os.path.splitext(file_name)
+        counter = 0
+        candidate = file_name
+        while candidate.lower() in claimed:
+            counter += 1
+            candidate = f"{stem} ({counter}){ext}"
+        claimed.add(candidate.lower())
+        return candidate
+
+    for archive, name, opener in iter_media(archives):
+        file_name = name.rsplit('/', 1)[-1]
+        if '_original_' in file_name:
+            continue
+        progress['found'] += 1
+        json_file = index.lookup(name)
+        dates = archive_dates.get(str(json_file)) if json_file else None
+        file_path = (destination_dir if dates else no_exif_data_dir) / claim(file_name)
+        if resume and journal.is_destination(file_path):
+            # Already extracted and moved by the run being resumed
+            progress['found'] -= 1
+            continue
+
+        if not confirmed.is_set() and emitted % 5 == 0 and not permits.get():
+            return
+        emitted += 1
+
+        if json_file:
+            log_info(f"Found JSON file: {archive.path}:{json_file}")  # Log processing details
+        else:
+            log_info(f"No JSON file found for {file_name}")  # Log processing details
+        if journal.state(file_path) != TAGGED:
+            extract_member(opener, file_path)
+            log_info(f"Extracted {archive.path}:{name} to {file_path}")  # Log processing details
+        yield file_path, json_file, dates
+    progress['scan_complete'] = True
+
+def resolve_metadata(item):
+    """Pipeline stage: read the dates from the file's JSON file, if it has one."""
+    file_path, json_file = item
+    if journal.state(file_path) == TAGGED:
+        return file_path, json_file, None
+    if not json_file:
+        log_info(f"No JSON file found for {file_path.name}")  # Log processing details
+        return file_path, None, None
+    with metrics.timed('hash'):
+        content_hash = quick_hash(file_path)
+    journal.record(file_path, JSON_RESOLVED, content_hash=content_hash)
+    log_info(f"Found JSON file: {json_file}")  # Log processing details
+    log_info(f"Processing file: {file_path.name}")  # Log processing details
+    with metrics.timed('json_parse'):
+        return file_path, json_file, read_exif_dates(json_file)
+
+def write_metadata(item):
+    """Pipeline stage: queue the write of the dates to the file; the mover waits for it (see finish_write)."""
+    file_path, json_file, dates = item
+    if journal.state(file_path) == TAGGED:
+        # Tagged by an earlier run that stopped before moving the file
+        return file_path, None
+    with metrics.timed('apply_exif'):
+        return file_path, write_exif_dates(file_path, json_file, *dates) if dates else completed(False)
+
+def write_fused(item):
+    """Pipeline stage for fused mode: queue the write of the JSON dates, or failing those the date in the file name."""
+    file_path, json_file, dates = item
+    if journal.state(file_path) == TAGGED:
+        # Tagged by an earlier run that stopped before moving the file
+        return file_path, None
+    if dates:
+        with metrics.timed('apply_exif'):
+            return file_path, write_exif_dates(file_path, json_file, *dates)
+    with metrics.timed('filename_date'):
+        moment = extract_date(file_path.name)
+    with metrics.timed('apply_exif'):
+        return file_path, write_name_date(file_path, moment) if moment else completed(False)
+
+def place_fused(item):
+    """Pipeline stage for fused mode: once its write is done, rename the file straight into its final/<category> folder."""
+    file_path, written = item
+    exif_applied = finish_write(file_path, written)
+    with metrics.timed('move'):
+        destination = Path(fused_mover.move(file_path, sorting.classify(file_path.name)))
+    journal.record(file_path, MOVED, destination=destination)
+    log_info(f"Moved {file_path.name} to {destination.parent}", file=file_path, stage='mover', outcome='moved')  # Log processing details
+    metrics.count('moved')
+    placed = [destination]
+    if dedup_mode == 'link':
+        placed += link_duplicates(file_path, destination)
+    return file_path, exif_applied, placed
+
+def move_processed(item):
+    """Pipeline stage: once its write is done, move the file to its destination folder.
+
+    Passes on (file, EXIF applied, paths now holding it in the destination).
+    """
+    file_path, written = item
+    exif_applied = finish_write(file_path, written)
+    with metrics.timed('move'):
+        destination = move_file(file_path, exif_applied)
+    journal.record(file_path, MOVED, destination=destination)
+    metrics.count('moved')
+    placed = [destination]
+    if dedup_mode == 'link':
+        placed += link_duplicates(file_path, destination)
+    return file_path, exif_applied, placed
+
+def show_exif_data(file_path):
+    """Retrieve and display EXIF data of the file."""
+    result = run_exiftool([str(file_path)], timeout=30)
+    if result.returncode == 0:
+        log_info(f"EXIF data for {file_path}:\n{result.stdout}")  # Log EXIF data
+        print(f"EXIF data for {file_path}:\n{result.stdout}")  # Print EXIF data for user
+    else:
+        log_error(f"Failed to retrieve EXIF data: {result.stderr}")
+        print(f"Failed to retrieve EXIF data for {file_path}")
+
+def display_progress_bar(current, total):
+    """Display a text-based progress bar."""
+    progress = int((current / total) * 100)
+    bar = '█' * (progress // 2) + '-' * (50 - (progress // 2))
+    print(f"\rProgress |{bar}| {progress:.1f}% Complete", end='')
+
+def display_progress(progress):
+    """Display the progress bar, or a running count while files are still being found."""
+    if progress['scan_complete']:
+        display_progress_bar(progress['processed'], progress['found'])
+    else:
+        print(f"\rProcessed {progress['processed']} of {progress['found']} files found so far", end='')
+
+def process_files(check_individually, resume=False, archives=None, dedup_mode=None, fused=False,
+                  source=None, destination=None):
+    """Process files and handle user input after processing the initial batch of files.
+
+    With resume, files an earlier run already tagged or moved (according to
+    the journal) are not processed again. With archives, media is read from
+    those Takeout .zip/.tgz parts instead of source_dir. With dedup_mode
+    ('link' or 'report'), only one copy of identical files is processed; see
+    find_duplicate_files. Without check_individually the first batch is not
+    shown for confirmation, so nothing is asked.
+
+    With fused, this also does the work of extract_dates and sorting in the
+    same pass: files without JSON dates get the date in their name, and
+    every file is renamed once, straight into final/<category> under
+    destination_dir (see sorting.classify).
+
+    source and destination replace source_dir and destination_dir (see
+    set_directories). Returns the paths of the files placed in the
+    destination folders.
+    """
+    global journal, sidecars, fused_mover, unchanged_files
+    set_directories(source, destination)
+    no_exif_data_dir.mkdir(parents=True, exist_ok=True)
+    journal = Journal(journal_file, 'fused' if fused else 'process_images', resume=resume)
+    sidecars = None if archives else SidecarStore(sidecar_cache_file)
+    if fused:
+        sorting.set_directories(destination_dir)
+        fused_mover = FileMover()
+        fused_mover.prepare(sorting.destination_dirs.values())
+    if dedup_mode and not archives:
+        find_duplicate_files(dedup_mode)
+    unchanged_files = 0
+
+    # Initialize variables
+    processed_files = []
+    placed_files = []
+    json_files_found = 0
+    global suppress_logs
+    suppress_logs = False
+    progress = {'found': 0, 'processed': 0, 'scan_complete': False}
+
+    # The scanner hands out 5 files at a time until the user confirms the first batch
+    permits = queue.Queue()
+    confirmed = threading.Event()
+    permits.put(True)
+    if resume or not check_individually:
+        # The first batch was checked when the interrupted run started, or is not to be checked
+        confirmed.set()
+
+    stages = [
+        Stage('metadata', resolve_metadata, workers=metadata_workers, queue_size=stage_queue_size),
+        Stage('writer', write_fused if fused else write_metadata, workers=writer_workers, queue_size=stage_queue_size),
+        Stage('mover', place_fused if fused else move_processed, workers=mover_workers, queue_size=stage_queue_size),
+    ]
+    if archives:
+        # Files come out of the archive already in place with their dates read
+        source = scan_archives(open_archives(archives), permits, confirmed, progress, resume)
+        stages = stages[1:]
+    else:
+        source = scan_files(permits, confirmed, progress)
+    pipeline = Pipeline(source, stages, on_error=lambda error: permits.put(False))
+
+    print("Processing files as they are found...")
+    try:
+        for file_path, exif_applied, placed in pipeline.run():
+            placed_files.extend(placed)
+            progress['processed'] += 1
+            if exif_applied:
+                json_files_found += 1
+            with metrics.timed('progress'):
+                display_progress(progress)
+
+            if confirmed.is_set():
+                continue
+            processed_files.append((placed[0], exif_applied))
+            if len(processed_files) < 5:
+                continue
+
+            if json_files_found == 0:
+                # No JSON data in this batch yet, let the scanner hand out the next 5 files
+                processed_files = []
+                permits.put(True)
+                continue
+
+            # Show EXIF data for the processed files
+            valid_files = [path for path, applied in processed_files if applied and path.exists()]
+            for path in valid_files:
+                show_exif_data(path)
+
+            # Prompt user for input after processing the batch
+            user_input = input("\nProcessed 5 files with JSON data. Type 'y' to continue processing, 'n' to stop: ").strip().lower()
+            confirmed.set()  # Ensure we only ask once
+            if user_input == 'n':
+                log_info("User chose to stop. Please verify the files and restart the script.")
+                pipeline.stop()
+                permits.put(False)
+            else:
+                log_info("Continuing processing...")
+                suppress_logs = True  # Suppress logs for further processing
+                permits.put(True)
+    finally:
+        close_exif_batcher()
+        journal.close()
+        if sidecars:
+            # Only a full scan knows which cached sidecars are gone
+            sidecars.close(prune=progress['scan_complete'])
+
+    print("\nTotal files processed:", progress['processed'])
+    if unchanged_files:
+        print("Files already holding their dates, left unchanged:", unchanged_files)
+    print("Processing complete.")
+    return placed_files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Restore EXIF dates of Google Photos Takeout files from their JSON files.")
+    parser.add_argument('--resume', action='store_true', help="skip files an interrupted earlier run already tagged or moved")
+    parser.add_argument('--archive', nargs='+', metavar='PART', help="read media from these Takeout .zip/.tgz parts instead of ~/takeout")
+    parser.add_argument('--dedup', choices=('link', 'report'), help="process one copy of identical files; hardlink the others to it, or list them in duplicates.csv")
+    parser.add_argument('--rewrite', action='store_true', help="write dates even to files that already hold them")
+    parser.add_argument('--fused', action='store_true', help="also do the work of extract_dates.py and sorting.py, moving each file once")
+    parser.add_argument('--follow-symlinks', action='store_true', help="also scan directories reached through symbolic links")
+    parser.add_argument('--log-level', choices=log_sink.LEVELS, default='info', help="least severe level written to the log")
+    parser.add_argument('--profile', action='store_true', help="print per-stage timings at the end of the run")
+    parser.add_argument('--profile-output', metavar='FILE', help="also dump cProfile stats to FILE (implies --profile)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help="serve live counters at http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+    if args.dedup and args.archive:
+        parser.error("--dedup works on an extracted takeout and cannot be combined with --archive")
+    log_sink.configure(level=args.log_level)
+    tag_check.skip_unchanged = not args.rewrite
+    file_scanner.follow_symlinks = args.follow_symlinks
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    # Prompt user if they want to check files individually
+    check_mode = input("Do you want to check EXIF data for files and stop after the initial batch of 5 files for user input? Type 'y' for yes, 'n' for no: ").strip().lower()
+    check_individually = check_mode == 'y'
+    
+    run = lambda: process_files(check_individually, resume=args.resume, archives=args.archive, dedup_mode=args.dedup, fused=args.fused)
+    if args.profile or args.profile_output:
+        metrics.profile(run, args.profile_output)
+    else:
+        run()
@@ -0,0 +1,94 @@
+import os
+import re
+from pathlib import Path
+
+from .file_scanner import scan
+
+# Google Photos truncates the sidecar name (everything before '.json') to this
+# many characters. Older takeouts used 47, newer ones use 46.
+MAX_JSON_STEM_LENGTHS = (46, 47)
+
+# Newer takeouts name sidecars '<media>.supplemental-metadata.json'
+SUPPLEMENTAL_SUFFIX = '.supplemental-metadata'
+
+# Suffixes Google appends to edited copies; they share the original's sidecar
+EDITED_SUFFIXES = ('-edited', '-bearbeitet', '-modifié', '-editado', '-modificato', '-bewerkt')
+
+# Matches a trailing duplicate counter such as 'IMG_1234(1)'
+counter_pattern = re.compile(r'^(.*?)(\(\d+\))$')
+
+def sidecar_candidates(media_name):
+    """Return the possible sidecar stems (JSON name without '.json') for a media file name, most specific first."""
+    candidates = [media_name]
+    stem, ext = os.path.splitext(media_name)
+
+    # 'IMG(1).jpg' is described by 'IMG.jpg(1).json'
+    counter = ''
+    match = counter_pattern.match(stem)
+    if match:
+        stem, counter = match.groups()
+
+    bases = [stem]
+    for suffix in EDITED_SUFFIXES:
+        if stem.endswith(suffix):
+            bases.append(stem[:-len(suffix)])
+
+    for base in bases:
+        for name in (base + ext, base + ext + SUPPLEMENTAL_SUFFIX):
+            candidates.append(name + counter)
+            for limit in MAX_JSON_STEM_LENGTHS:
+                candidates.append(name[:limit] + counter)
+        # Some older takeouts drop the media extension: 'IMG_1234.json'
+        candidates.append(base + counter)
+
+    return list(dict.fromkeys(candidates))
+
+class SidecarIndex:
+    """Map media files to their JSON sidecars using a single scan of the takeout tree."""
+
+    def __init__(self):
+        self.by_dir = {}
+        self.by_name = {}
+
+    def add(self, json_path):
+        """Register a JSON sidecar found at json_path."""
+        json_path = Path(json_path)
+        stem = json_path.name[:-len('.json')]
+        self.by_dir[(str(json_path.parent), stem)] = json_path
+        # Directories are scanned in no fixed order, so keep the first path in sort order
+        # for a name, to match the same sidecar on every run
+        known = self.by_name.get(stem)
+        if known is None or str(json_path) < str(known):
+            self.by_name[stem] = json_path
+
+    def lookup(self, media_path, same_dir_only=False):
+        """Return the sidecar for media_path, preferring one in the same directory, or None.
+
+        With same_dir_only, sidecars in other directories are not considered;
+        use that while the index is still being built, as which of them has
+        been seen yet depends on the scan order.
+        """
+        media_path = Path(media_path)
+        directory = str(media_path.parent)
+        candidates = sidecar_candidates(media_path.name)
+        for stem in candidates:
+            json_path = self.by_dir.get((directory, stem))
+            if json_path:
+                return json_path
+        if same_dir_only:
+            return None
+        for stem in candidates:
+            json_path = self.by_name.get(stem)
+            if json_path:
+                return json_path
+        return None
+
+    def __len__(self):
+        return len(self.by_dir)
+
+def build_sidecar_index(source_dir):
+    """Scan source_dir once and index every JSON sidecar in it."""
+    index = SidecarIndex()
+    for entry in scan(source_dir, extensions=('.json',)):
+        index.add(Path(entry.path))
+    return index
@@ -0,0 +1,231 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from . import geo_timezone
+
+try:
+    # Optional: parses sidecars several times faster than the json module
+    import orjson
+except ImportError:
+    orjson = None
+
+# Sidecars parsed per task sent to the process pool
+parse_chunk_size = 256
+
+# Worker processes parsing sidecars; None means one per CPU
+parse_workers = None
+
+# Paths looked up in the cache per query, below SQLite's limit on query parameters
+cache_lookup_size = 500
+
+# The pool is started while the scanner, pipeline and exiftool threads are running, and
+# forking a process that has threads can deadlock the child, so workers are spawned instead
+pool_context = multiprocessing.get_context('spawn')
+
+class Sidecar:
+    """The fields of a Google Photos JSON sidecar the scripts use.
+
+    photo_taken and created are Unix timestamps as strings ('' if missing);
+    latitude and longitude are None when the photo has no location.
+    """
+    __slots__ = ('photo_taken', 'created', 'latitude', 'longitude', 'title', 'description')
+
+    def __init__(self, photo_taken='', created='', latitude=None, longitude=None, title='', description=''):
+        self.photo_taken = photo_taken
+        self.created = created
+        self.latitude = latitude
+        self.longitude = longitude
+        self.title = title
+        self.description = description
+
+    @property
+    def location(self):
+        """(latitude, longitude), or None."""
+        return None if self.latitude is None else (self.latitude, self.longitude)
+
+    def fields(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Sidecar({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+def from_dict(data):
+    """Build a Sidecar from loaded sidecar JSON."""
+    latitude, longitude = geo_timezone.sidecar_location(data) or (None, None)
+    return Sidecar(
+        str(data.get('photoTakenTime', {}).get('timestamp', '')),
+        str(data.get('creationTime', {}).get('timestamp', '')),
+        latitude,
+        longitude,
+        data.get('title') or '',
+        data.get('description') or '',
+    )
+
+def loads(raw):
+    """Parse the bytes of a sidecar; raises ValueError if they are not a JSON object."""
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError("sidecar is not a JSON object")
+    return from_dict(data)
+
+def parse_file(path):
+    """Read and parse the sidecar at path."""
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+def _parse_chunk(paths):
+    """Process pool task: return (path, size, mtime_ns, fields) for each sidecar; fields is None if it cannot be parsed."""
+    rows = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as file:
+                stat = os.fstat(file.fileno())
+                sidecar = loads(file.read())
+            rows.append((path, stat.st_size, stat.st_mtime_ns, sidecar.fields()))
+        except (OSError, ValueError):
+            rows.append((path, None, None, None))
+    return rows
+
+def parse_many(paths, workers=None, chunk_size=None):
+    """Parse many sidecars across a process pool; returns {path: Sidecar, or None if it cannot be parsed}."""
+    paths = [str(path) for path in paths]
+    chunk_size = chunk_size or parse_chunk_size
+    chunks = [paths[index:index + chunk_size] for index in range(0, len(paths), chunk_size)]
+    sidecars = {}
+    with ProcessPoolExecutor(max_workers=workers or parse_workers, mp_context=pool_context) as executor:
+        for rows in executor.map(_parse_chunk, chunks):
+            for path, _, _, fields in rows:
+                sidecars[path] = Sidecar(*fields) if fields else None
+    return sidecars
+
+class SidecarStore:
+    """Sidecars parsed for one run, kept in a SQLite cache between runs.
+
+    prefetch() is given sidecars as the scan finds them, a directory at a
+    time: their cache rows are looked up together, unchanged ones (same size
+    and mtime) are answered from the cache, the rest are parsed in a process
+    pool in chunks while the scan goes on. With a single CPU there is no pool
+    and get() parses each one when asked. get() returns a sidecar, waiting
+    for its chunk if needed. close() saves what was parsed.
+    """
+
+    def __init__(self, cache_file=None, workers=None, chunk_size=None):
+        self.workers = workers or parse_workers
+        self.chunk_size = chunk_size or parse_chunk_size
+        self.parallel = (self.workers or os.cpu_count() or 1) > 1
+        self.lock = threading.Lock()
+        self.records = {}
+        self.pending = {}
+        self.added = []
+        self.executor = None
+        # Every path asked about this run; rows for other paths are dropped on close
+        self.seen = set()
+        self.connection = None
+        if cache_file:
+            # prefetch() is called from the scanning thread
+            self.connection = sqlite3.connect(cache_file, check_same_thread=False)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS sidecars ('
+                'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+                'photo_taken TEXT, created TEXT, latitude REAL, longitude REAL, title TEXT, description TEXT)'
+            )
+
+    def _cached(self, paths):
+        """Return {path: (size, mtime_ns, fields...)} for the paths that have a cache row."""
+        rows = {}
+        if self.connection is None:
+            return rows
+        for index in range(0, len(paths), cache_lookup_size):
+            batch = paths[index:index + cache_lookup_size]
+            query = f"SELECT * FROM sidecars WHERE path IN ({', '.join('?' * len(batch))})"
+            with self.lock:
+                rows.update((row[0], row[1:]) for row in self.connection.execute(query, batch))
+        return rows
+
+    def prefetch(self, paths):
+        """Start parsing the sidecars at paths that are not known yet."""
+        with self.lock:
+            paths = [path for path in map(str, paths) if path not in self.records and path not in self.pending]
+            self.seen.update(paths)
+        cached_rows = self._cached(paths)
+        misses = []
+        for path in paths:
+            cached = cached_rows.get(path)
+            if cached:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if (stat.st_size, stat.st_mtime_ns) == cached[:2]:
+                    with self.lock:
+                        self.records[path] = Sidecar(*cached[2:])
+                    continue
+            misses.append(path)
+        if not misses or not self.parallel:
+            return
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context)
+        for index in range(0, len(misses), self.chunk_size):
+            chunk = misses[index:index + self.chunk_size]
+            future = self.executor.submit(_parse_chunk, chunk)
+            with self.lock:
+                self.pending.update((path, future) for path in chunk)
+
+    def _absorb(self, rows):
+        """Keep the rows of a finished chunk; the caller holds the lock."""
+        for path, size, mtime_ns, fields in rows:
+            if self.pending.pop(path, None) is not None and fields:
+                self.records[path] = Sidecar(*fields)
+                self.added.append((path, size, mtime_ns) + fields)
+
+    def get(self, path):
+        """Return the Sidecar at path; raises OSError or ValueError if it cannot be read, like json.load."""
+        path = str(path)
+        with self.lock:
+            self.seen.add(path)
+            record = self.records.get(path)
+            future = self.pending.get(path)
+        if record is not None:
+            return record
+        if future is not None:
+            rows = future.result()
+            with self.lock:
+                self._absorb(rows)
+                record = self.records.get(path)
+            if record is not None:
+                return record
+        # Not prefetched, or the pool could not parse it: parse it here, raising its error like json.load
+        path, size, mtime_ns, fields = _parse_chunk([path])[0]
+        if fields is None:
+            return parse_file(path)
+        record = Sidecar(*fields)
+        with self.lock:
+            self.records[path] = record
+            self.added.append((path, size, mtime_ns) + fields)
+        return record
+
+    def close(self, prune=False):
+        """Wait for the chunks still being parsed, save every sidecar parsed this run and close the cache.
+
+        With prune, which should only be set once the whole takeout was
+        scanned, rows for sidecars not seen this run are deleted.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            with self.lock:
+                for future in set(self.pending.values()):
+                    self._absorb(future.result())
+            self.executor = None
+        if self.connection is not None:
+            if prune:
+                self.connection.execute('CREATE TEMP TABLE seen (path TEXT PRIMARY KEY)')
+                self.connection.executemany('INSERT INTO seen VALUES (?)', ((path,) for path in self.seen))
+                self.connection.execute('DELETE FROM sidecars WHERE path NOT IN (SELECT path FROM seen)')
+            self.connection.executemany('INSERT OR REPLACE INTO sidecars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', self.added)
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,172 @@
+import os
+import re
+import logging
+import sys
+import argparse
+
+from .file_mover import FileMover
+from . import file_scanner
+from .file_scanner import scan
+from . import log_sink
+from . import metrics
+from .journal import MOVED, Journal
+
+# Log records go to the shared JSON-lines log (see log_sink)
+logger = logging.getLogger('sorting')
+
+# Directories
+source_dir = os.path.expanduser('~/takeout-put/')
+output_dir = os.path.expanduser('~/takeout-put/final')
+journal_file = os.path.expanduser('~/takeout-put/journal.sqlite')
+
+# Databases, reports and the log the scripts keep in ~/takeout-put; they (and the
+# databases' -wal/-shm files) are never sorted
+state_file_names = (os.path.basename(journal_file), 'check-cache.sqlite', 'sidecar-cache.sqlite', 'duplicates.csv',
+                    os.path.basename(log_sink.default_log_file))
+
+# Records the state of each file so an interrupted run can be resumed; opened by main
+journal = None
+
+# Threads moving files at once; a move within one filesystem is a single rename
+mover_workers = 4
+
+# Define patterns for sorting
+prefix_patterns = {
+    'WhatsApp Images': re.compile(r'^IMG.*WA'),
+    'WhatsApp Videos': re.compile(r'^VID.*WA'),
+    'Camera': re.compile(r'^(IMG|VID|LMC|PXL)'),
+    'Screenshot': re.compile(r'^(Screenshot|Screenrecorder)'),
+    'Snapchat': re.compile(r'^Snapchat')
+}
+
+# Destination folder for each pattern, plus the default
+destination_dirs = {folder: os.path.join(output_dir, folder) for folder in list(prefix_patterns) + ['Others']}
+
+def set_directories(destination):
+    """Sort the files under destination into destination/final; the journal lives in destination."""
+    global source_dir, output_dir, journal_file, destination_dirs
+    source_dir = os.path.expanduser(str(destination))
+    output_dir = os.path.join(source_dir, 'final')
+    journal_file = os.path.join(source_dir, 'journal.sqlite')
+    destination_dirs = {folder: os.path.join(output_dir, folder) for folder in destination_dirs}
+
+def classify(filename):
+    """Return the destination folder for a file name."""
+    for folder, pattern in prefix_patterns.items():
+        if pattern.match(filename):
+            return destination_dirs[folder]
+    # If no pattern matched, default to 'Others'
+    return destination_dirs['Others']
+
+def collect_files(directory):
+    """Scan directory once, skipping the output folder, and plan the moves; see plan_moves."""
+    # Never descend into the files this script already sorted
+    return plan_moves(entry.path for entry in scan(directory, exclude=(output_dir,)))
+
+def plan_moves(file_paths):
+    """Return the (path, destination folder) moves to make for file_paths.
+
+    Also returns the '_original' backups exiftool left behind, which are
+    deleted rather than sorted.
+    """
+    moves = []
+    originals = []
+    for file_path in file_paths:
+        file = os.path.basename(file_path)
+        if file.startswith(state_file_names):
+            continue
+        if file.endswith('_original'):
+            originals.append(file_path)
+            continue
+        # Skip files an interrupted earlier run already sorted
+        if journal and (journal.is_destination(file_path) or journal.state(file_path) == MOVED):
+            continue
+        moves.append((file_path, classify(file)))
+    return moves, originals
+
+def delete_files(file_paths):
+    """Delete the given files and return how many were removed."""
+    count_deleted = 0
+    for file_path in file_paths:
+        try:
+            os.remove(file_path)
+            count_deleted += 1
+        except Exception as e:
+            logger.error(f"Error deleting file {file_path}: {e}")
+    return count_deleted
+
+def print_progress_bar(iteration, total, bar_length=50):
+    """Prints a horizontal progress bar in the style of 'Progress |████████████████████████████████████████| 100.0% Complete'."""
+    progress = iteration / total
+    arrow = '█' * int(round(progress * bar_length))
+    spaces = ' ' * (bar_length - len(arrow))
+    percent = f"{progress * 100:.1f}"
+    sys.stdout.write(f'\rProgress |{arrow}{spaces}| {percent}% Complete')
+    sys.stdout.flush()
+
+def main(resume=False, files=None, destination=None):
+    """Sort the files under source_dir, or just the given files, into output_dir.
+
+    With destination, the files under it are sorted into destination/final
+    instead (see set_directories). Returns the paths the files were moved to.
+    """
+    global journal
+    if destination is not None:
+        set_directories(destination)
+    journal = Journal(journal_file, 'sorting', resume=resume)
+    sorted_files = []
+    try:
+        # Classify every file, in one walk of the source directory unless the files are given
+        with metrics.timed('scan'):
+            moves, originals = collect_files(source_dir) if files is None else plan_moves(map(str, files))
+
+        # Create the destination folders once, then move files concurrently
+        mover = FileMover(workers=mover_workers)
+        mover.prepare([output_dir] + list(destination_dirs.values()))
+        total_files = len(moves)
+        for i, (src_path, dest_path, error) in enumerate(mover.move_all(moves)):
+            metrics.count('failed' if error else 'moved')
+            if error:
+                logger.error(f"Error processing file {src_path}: {error}",
+                             extra={'file': src_path, 'stage': 'mover', 'outcome': 'failed'})
+            else:
+                journal.record(src_path, MOVED, destination=dest_path)
+                sorted_files.append(dest_path)
+                logger.info(f"Moved {src_path} to {dest_path}", extra={'file': src_path, 'stage': 'mover', 'outcome': 'moved'})
+            # Print progress
+            with metrics.timed('progress'):
+                print_progress_bar(i + 1, total_files)
+
+        # Print final newline after progress bar
+        print()
+
+        # Delete files ending with '_original'
+        with metrics.timed('delete'):
+            count_deleted = delete_files(originals)
+        if count_deleted > 0:
+            logger.info(f"Deleted {count_deleted} files ending with '_original'.")
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+    finally:
+        journal.close()
+    return sorted_files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sort processed files into folders by file name.")
+    parser.add_argument('--resume', action='store_true', help="skip files an interrupted earlier run already sorted")
+    parser.add_argument('--follow-symlinks', action='store_true', help="also scan directories reached through symbolic links")
+    parser.add_argument('--log-level', choices=log_sink.LEVELS, default='error', help="least severe level written to the log")
+    parser.add_argument('--profile', action='store_true', help="print per-stage timings at the end of the run")
+    parser.add_argument('--profile-output', metavar='FILE', help="also dump cProfile stats to FILE (implies --profile)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help="serve live counters at http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+    log_sink.configure(level=args.log_level)
+    file_scanner.follow_symlinks = args.follow_symlinks
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    run = lambda: main(resume=args.resume)
+    if args.profile or args.profile_output:
+        metrics.profile(run, args.profile_output)
+    else:
+        run()
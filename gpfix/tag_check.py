@@ -0,0 +1,49 @@
+import json
+import subprocess
+from concurrent.futures import Future
+
+from . import native_exif
+
+# Files that already hold the dates about to be written are left alone, so running
+# the scripts again over a finished library only reads it. Set by --rewrite.
+skip_unchanged = True
+
+def read_command(path, tags):
+    """Return exiftool arguments that print the given tags of path as JSON."""
+    return ['-j', *(f'-{tag}' for tag in tags), str(path)]
+
+def parse_tags(result):
+    """Return the tags printed by a read_command, or {} if the read failed."""
+    if result.returncode != 0:
+        return {}
+    try:
+        return json.loads(result.stdout)[0]
+    except (ValueError, IndexError, KeyError, TypeError):
+        return {}
+
+def matches(current, dates):
+    """Return True if the tags in current hold every value in dates; an empty value means the tag is absent."""
+    return any(dates.values()) and all(str(current.get(tag, '')) == value for tag, value in dates.items())
+
+def check(path, dates, batcher=None):
+    """Return a Future resolving to True if path already holds every value in dates.
+
+    Formats native_exif reads are checked at once by reading only their
+    metadata. Other formats are read by exiftool through batcher, in the
+    same batches as the writes; without a batcher they resolve to False.
+    """
+    future = Future()
+    held = native_exif.holds_dates(path, dates)
+    if held is not None or batcher is None:
+        future.set_result(bool(held))
+        return future
+
+    def compare(read):
+        try:
+            current = parse_tags(read.result())
+        except (subprocess.SubprocessError, OSError):
+            current = {}
+        future.set_result(matches(current, dates))
+
+    batcher.submit(read_command(path, dates)).add_done_callback(compare)
+    return future
@@ -0,0 +1,80 @@
+import shutil
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+
+from . import sidecar_parser
+from .sidecar_index import SidecarIndex
+
+# Buffer size used when streaming a member out of an archive
+copy_buffer_size = 1024 * 1024
+
+def is_archive(path):
+    """Return True if path looks like a Takeout .zip or .tgz/.tar.gz part."""
+    name = str(path).lower()
+    return name.endswith(('.zip', '.tgz', '.tar.gz', '.tar'))
+
+class TakeoutArchive:
+    """One part of a Google Takeout export, read without extracting it to disk."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.is_zip = self.path.lower().endswith('.zip')
+
+    def iter_files(self):
+        """Yield (member name, opener) for every regular file, in archive order.
+
+        opener() returns a readable file object for the member. For .tgz parts,
+        which can only be read front to back, it is only valid until the next
+        member is yielded.
+        """
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                # The central directory lists every member without reading their data
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        yield info.filename, lambda info=info: archive.open(info)
+        else:
+            with tarfile.open(self.path, 'r|*') as archive:
+                for member in archive:
+                    if member.isfile():
+                        yield member.name, lambda member=member: archive.extractfile(member)
+
+def open_archives(paths):
+    """Return a TakeoutArchive for each path, in order."""
+    return [TakeoutArchive(path) for path in paths]
+
+def build_archive_index(archives, parse):
+    """Read every JSON sidecar in the archives once.
+
+    Returns a SidecarIndex over member names, which are the same across
+    parts, so a JSON file in one part matches media in another, and a dict
+    mapping each sidecar's member name to parse(sidecar_parser.Sidecar, name).
+    """
+    index = SidecarIndex()
+    sidecars = {}
+    for archive in archives:
+        for name, opener in archive.iter_files():
+            if not name.endswith('.json'):
+                continue
+            with opener() as file:
+                try:
+                    sidecar = sidecar_parser.loads(file.read())
+                except ValueError:
+                    continue
+            path = PurePosixPath(name)
+            index.add(path)
+            sidecars[str(path)] = parse(sidecar, f"{archive.path}:{name}")
+    return index, sidecars
+
+def iter_media(archives):
+    """Yield (archive, member name, opener) for every non-JSON member of the archives."""
+    for archive in archives:
+        for name, opener in archive.iter_files():
+            if not name.endswith('.json'):
+                yield archive, name, opener
+
+def extract_member(opener, destination):
+    """Stream a member straight to destination."""
+    with opener() as source, open(destination, 'wb') as target:
+        shutil.copyfileobj(source, target, copy_buffer_size)
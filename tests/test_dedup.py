@@ -0,0 +1,60 @@
+import os
+
+from gpfix import dedup
+
+SIZE = 200 * 1024  # more than the first and last 64 KB read by quick_hash
+
+def make(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+def changed(content, position):
+    return content[:position] + bytes([content[position] ^ 1]) + content[position + 1:]
+
+def test_groups_by_size_then_quick_hash_then_full_hash(tmp_path, monkeypatch):
+    content = bytes(range(256)) * (SIZE // 256)
+    kept = make(tmp_path / 'Photos from 2020' / 'a.jpg', content)
+    copy = make(tmp_path / 'Holidays' / 'a.jpg', content)
+    other_tail = make(tmp_path / 'Holidays' / 'tail.jpg', changed(content, SIZE - 1))
+    other_middle = make(tmp_path / 'Holidays' / 'middle.jpg', changed(content, SIZE // 2))
+    other_size = make(tmp_path / 'Holidays' / 'size.jpg', content + b'\0')
+
+    hashed = {'quick': [], 'full': []}
+
+    def recording(kind, hash_function):
+        def run(path):
+            hashed[kind].append(path)
+            return hash_function(path)
+        return run
+
+    monkeypatch.setattr(dedup, 'quick_hash', recording('quick', dedup.quick_hash))
+    monkeypatch.setattr(dedup, 'full_hash', recording('full', dedup.full_hash))
+    duplicates = dedup.find_duplicates([copy, other_tail, kept, other_middle, other_size], workers=2)
+
+    assert duplicates == {kept: [copy]}
+    # A different size is never hashed, and a different tail is told apart by the quick hash
+    assert sorted(hashed['quick']) == sorted([kept, copy, other_tail, other_middle])
+    assert sorted(hashed['full']) == sorted([kept, copy, other_middle])
+
+def test_canonical_copy_prefers_the_year_folder(tmp_path):
+    copies = [make(tmp_path / folder / 'a.jpg', b'same') for folder in ('Album', 'B', 'Photos from 2019')]
+    assert dedup.find_duplicates(copies) == {copies[2]: [copies[1], copies[0]]}
+
+def test_unreadable_file_is_left_out(tmp_path):
+    copies = [make(tmp_path / folder / 'a.jpg', b'same') for folder in ('A', 'B')]
+    assert dedup.find_duplicates(copies + [tmp_path / 'missing.jpg']) == {copies[0]: [copies[1]]}
+
+def test_link_duplicate(tmp_path):
+    target = make(tmp_path / 'out' / 'a.jpg', b'kept')
+    link_path = tmp_path / 'out' / 'b.jpg'
+    assert dedup.link_duplicate(target, link_path)
+    assert link_path.read_bytes() == b'kept'
+    assert os.path.samefile(target, link_path)
+
+def test_link_duplicate_keeps_an_existing_file(tmp_path):
+    target = make(tmp_path / 'out' / 'a.jpg', b'kept')
+    existing = make(tmp_path / 'out' / 'b.jpg', b'something else')
+    assert not dedup.link_duplicate(target, existing)
+    assert existing.read_bytes() == b'something else'
+    assert not os.path.samefile(target, existing)
@@ -0,0 +1,87 @@
+import os
+import subprocess
+
+import pytest
+
+from gpfix import exiftool_pool
+from gpfix.exiftool_pool import ExiftoolBatcher, ExiftoolPool, ExiftoolWorker
+
+FAKE_EXIFTOOL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fake_exiftool.py')
+
+@pytest.fixture(autouse=True)
+def fake_exiftool(monkeypatch):
+    """Run the stand-in from benchmarks/ instead of exiftool, as EXIFTOOL_PATH does."""
+    monkeypatch.setenv('EXIFTOOL_PATH', FAKE_EXIFTOOL)
+    monkeypatch.setattr(exiftool_pool, 'exiftool_path', FAKE_EXIFTOOL)
+
+@pytest.fixture
+def photos(tmp_path):
+    paths = []
+    for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+        path = tmp_path / name
+        path.write_bytes(b'')
+        paths.append(str(path))
+    return paths
+
+@pytest.fixture
+def worker():
+    worker = ExiftoolWorker()
+    yield worker
+    worker.stop()
+
+def test_commands_end_at_their_ready_marker(worker, photos):
+    results = worker.execute_many([[path] for path in photos])
+    assert [result.returncode for result in results] == [0, 0, 0]
+    for path, result in zip(photos, results):
+        assert result.stdout.strip() == f"File Name                       : {os.path.basename(path)}"
+        assert result.stderr == ''
+    # The counter keeps going, so a later command is not cut short by an earlier marker
+    assert worker.execute([photos[0]]).stdout == results[0].stdout
+
+def test_errors_stay_with_their_command(worker, photos, tmp_path):
+    missing = str(tmp_path / 'missing.jpg')
+    ok, failed = worker.execute_many([['-DateTimeOriginal=2020:01:01 00:00:00', photos[0]],
+                                      ['-DateTimeOriginal=2020:01:01 00:00:00', missing]])
+    assert ok.returncode == 0 and ok.stderr == ''
+    assert '1 image files updated' in ok.stdout
+    assert failed.returncode == 1
+    assert failed.stderr.strip() == f"Error: File not found - {missing}"
+    assert 'Error' not in failed.stdout
+
+def test_hung_worker_is_restarted(monkeypatch, photos):
+    monkeypatch.setenv('FAKE_EXIFTOOL_HANG', photos[1])
+    worker = ExiftoolWorker()
+    try:
+        process = worker.process
+        with pytest.raises(subprocess.TimeoutExpired):
+            worker.execute([photos[1]], timeout=0.5)
+        assert process.poll() is not None
+        assert worker.process is not process
+        assert worker.execute([photos[0]], timeout=5).returncode == 0
+    finally:
+        worker.stop()
+
+def test_batch_is_retried_file_by_file_after_a_failure(monkeypatch, photos):
+    monkeypatch.setenv('FAKE_EXIFTOOL_HANG', photos[1])
+    pool = ExiftoolPool(size=1)
+    batcher = ExiftoolBatcher(pool, batch_size=3, flush_interval=60, timeout=0.3)
+    try:
+        futures = [batcher.submit([path]) for path in photos]
+        assert futures[0].result(timeout=10).returncode == 0
+        assert futures[2].result(timeout=10).returncode == 0
+        with pytest.raises(subprocess.TimeoutExpired):
+            futures[1].result(timeout=10)
+    finally:
+        batcher.close()
+        pool.close()
+
+def test_close_flushes_pending_commands(photos):
+    pool = ExiftoolPool(size=1)
+    batcher = ExiftoolBatcher(pool, batch_size=100, flush_interval=60)
+    try:
+        futures = [batcher.submit([path]) for path in photos]
+        assert not any(future.done() for future in futures)
+        batcher.close()
+        assert [future.result(timeout=0).returncode for future in futures] == [0, 0, 0]
+    finally:
+        pool.close()
@@ -0,0 +1,76 @@
+import errno
+import os
+
+import pytest
+
+from gpfix import file_mover
+from gpfix.file_mover import FileMover
+
+def make(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+def test_same_names_get_numbered(tmp_path):
+    destination = tmp_path / 'out'
+    make(destination / 'a.jpg', b'existing')
+    sources = [make(tmp_path / folder / 'a.jpg', folder.encode()) for folder in ('one', 'two', 'three')]
+    mover = FileMover(workers=3, chunk_size=1)
+    mover.prepare([destination])
+    results = list(mover.move_all((source, destination) for source in sources))
+    assert [error for _, _, error in results] == [None] * 3
+    assert sorted(os.path.basename(path) for _, path, _ in results) == ['a (1).jpg', 'a (2).jpg', 'a (3).jpg']
+    assert (destination / 'a.jpg').read_bytes() == b'existing'
+    assert sorted(path.read_bytes() for path in destination.iterdir()) == [b'existing', b'one', b'three', b'two']
+    assert not any(source.exists() for source in sources)
+
+def test_unprepared_folder_checks_the_filesystem(tmp_path):
+    destination = tmp_path / 'out'
+    make(destination / 'a.jpg', b'existing')
+    moved = FileMover().move(make(tmp_path / 'in' / 'a.jpg', b'new'), destination)
+    assert moved == str(destination / 'a (1).jpg')
+    assert (destination / 'a.jpg').read_bytes() == b'existing'
+
+def test_other_filesystem_is_copied_then_renamed(tmp_path, monkeypatch):
+    rename = os.rename
+    renamed = []
+
+    def cross_device_rename(src, dst):
+        if not str(src).endswith('.partial'):
+            raise OSError(errno.EXDEV, os.strerror(errno.EXDEV), src)
+        renamed.append((src, dst))
+        rename(src, dst)
+
+    monkeypatch.setattr(file_mover.os, 'rename', cross_device_rename)
+    source = make(tmp_path / 'in' / 'a.jpg', b'content')
+    destination = tmp_path / 'out'
+    mover = FileMover()
+    mover.prepare([destination])
+    moved = mover.move(source, destination)
+    assert moved == str(destination / 'a.jpg')
+    assert renamed == [(moved + '.partial', moved)]
+    assert (destination / 'a.jpg').read_bytes() == b'content'
+    assert not source.exists()
+    assert os.listdir(destination) == ['a.jpg']
+
+def test_failed_copy_leaves_nothing_behind(tmp_path, monkeypatch):
+    def cross_device_rename(src, dst):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV), src)
+
+    def failing_copy(src, dst):
+        with open(dst, 'wb') as file:
+            file.write(b'half')
+        raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), dst)
+
+    monkeypatch.setattr(file_mover.os, 'rename', cross_device_rename)
+    monkeypatch.setattr(file_mover.shutil, 'copy2', failing_copy)
+    source = make(tmp_path / 'in' / 'a.jpg', b'content')
+    destination = tmp_path / 'out'
+    mover = FileMover()
+    mover.prepare([destination])
+    with pytest.raises(OSError):
+        mover.move(source, destination)
+    assert os.listdir(destination) == []
+    assert source.read_bytes() == b'content'
+    # The name was given back, so the next file gets it
+    assert mover.claim(str(destination), 'a.jpg') == str(destination / 'a.jpg')
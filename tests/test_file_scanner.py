@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from gpfix import file_scanner
+
+def make_tree(root):
+    """Create root/a.jpg, root/b.json, root/one/c.jpg, root/one/two/d.JPG and root/out/e.jpg."""
+    for path in ('a.jpg', 'b.json', 'one/c.jpg', 'one/two/d.JPG', 'out/e.jpg'):
+        path = root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'')
+
+def names(root, **options):
+    return sorted(os.path.relpath(entry.path, root) for entry in file_scanner.scan(root, **options))
+
+def test_scan_lists_files_by_extension(tmp_path):
+    make_tree(tmp_path)
+    assert names(tmp_path) == ['a.jpg', 'b.json', os.path.join('one', 'c.jpg'),
+                               os.path.join('one', 'two', 'd.JPG'), os.path.join('out', 'e.jpg')]
+    assert names(tmp_path, extensions=('.json',)) == ['b.json']
+
+def test_scan_skips_excluded_directories(tmp_path):
+    make_tree(tmp_path)
+    assert names(tmp_path, extensions=('.jpg',), exclude=(tmp_path / 'out', tmp_path / 'one' / 'two')) == [
+        'a.jpg', os.path.join('one', 'c.jpg')]
+    assert names(tmp_path, exclude=(tmp_path,)) == []
+
+def test_failing_filter_is_raised_in_the_consumer(tmp_path):
+    make_tree(tmp_path)
+
+    def name_filter(name):
+        if name == 'c.jpg':
+            raise ValueError(name)
+        return True
+
+    with pytest.raises(ValueError, match='c.jpg'):
+        names(tmp_path, name_filter=name_filter, workers=2)
+
+def test_symlink_loop_is_read_once(tmp_path):
+    make_tree(tmp_path)
+    os.symlink(tmp_path, tmp_path / 'one' / 'loop')
+    expected = ['a.jpg', os.path.join('one', 'c.jpg'), os.path.join('one', 'two', 'd.JPG'), os.path.join('out', 'e.jpg')]
+    assert names(tmp_path, extensions=('.jpg',), follow=True) == expected
+    assert names(tmp_path, extensions=('.jpg',), follow=False) == expected
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from gpfix import filename_dates
+from gpfix.filename_dates import extract_date, register_pattern
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Let a test register patterns, restoring the built-in ones afterwards."""
+    monkeypatch.setattr(filename_dates, 'DATE_PATTERNS', list(filename_dates.DATE_PATTERNS))
+    yield
+    monkeypatch.undo()
+    filename_dates._compile()
+
+@pytest.mark.parametrize('name, expected', [
+    ('IMG_20200102_030405.jpg', datetime(2020, 1, 2, 3, 4, 5)),
+    ('PXL_20200102_030405123.jpg', datetime(2020, 1, 2, 3, 4, 5)),
+    ('Screenshot_20200102-030405.png', datetime(2020, 1, 2, 3, 4, 5)),
+    ('Screen Shot 2020-01-02 at 03.04.05.png', datetime(2020, 1, 2, 3, 4, 5)),
+    ('signal-2020-01-02-030405.jpg', datetime(2020, 1, 2, 3, 4, 5)),
+    ('20200102_030405.mp4', datetime(2020, 1, 2, 3, 4, 5)),
+    ('holiday.jpg', None),
+])
+def test_dated_names(name, expected):
+    assert extract_date(name) == expected
+
+@pytest.mark.parametrize('name, expected', [
+    ('FB_20200102_photo.jpg', datetime(2020, 1, 2)),        # _YYYYMMDD_
+    ('scan-20200102-page1.jpg', datetime(2020, 1, 2)),      # -YYYYMMDD-
+    ('IMG-20200102-WA0003.jpg', datetime(2020, 1, 2)),      # IMG-YYYYMMDD-WA
+    ('VID-20200102-WA0003.mp4', datetime(2020, 1, 2)),
+])
+def test_date_only_names_are_midnight(name, expected):
+    assert extract_date(name) == expected
+
+def test_earliest_match_wins_whatever_its_pattern():
+    # underscore-date and camera both match, underscore-date first in the name
+    assert extract_date('x_20210304_20200102_030405.jpg') == datetime(2021, 3, 4)
+    # img and camera/underscore-date match the same digits; the time comes from img
+    assert extract_date('IMG_20200102_030405.jpg') == datetime(2020, 1, 2, 3, 4, 5)
+    # dash-date is the last pattern but matches earliest
+    assert extract_date('a-20210304-IMG_20200102_030405.jpg') == datetime(2021, 3, 4)
+
+def test_impossible_date_falls_through_to_a_later_match():
+    assert extract_date('IMG_20201340_030405-20200102-.jpg') == datetime(2020, 1, 2)
+
+def test_register_pattern(registry):
+    assert extract_date('DJI_20200102030405.jpg') is None
+    register_pattern('dji', r'DJI_(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})(?P<H>\d{2})(?P<M>\d{2})(?P<S>\d{2})')
+    assert extract_date('DJI_20200102030405.jpg') == datetime(2020, 1, 2, 3, 4, 5)
+    # Built-in patterns keep their own fields after the registry is recompiled
+    assert extract_date('IMG-20200102-WA0003.jpg') == datetime(2020, 1, 2)
+
+def test_registered_pattern_first_wins_at_the_same_position(registry):
+    register_pattern('day-first', r'IMG_(?P<Y>\d{4})(?P<d>\d{2})(?P<m>\d{2})', first=True)
+    assert extract_date('IMG_20200102_030405.jpg') == datetime(2020, 2, 1)
@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+
+from gpfix import geo_timezone
+
+def test_to_utc():
+    assert geo_timezone.to_utc('2020:06:01 12:00:00', '+02:00') == '2020:06:01 10:00:00'
+    assert geo_timezone.to_utc('2020:06:01 22:00:00', '-05:30') == '2020:06:02 03:30:00'
+    assert geo_timezone.to_utc('2020:06:01 12:00:00', '+00:00') == '2020:06:01 12:00:00'
+    assert geo_timezone.to_utc('', '+02:00') == ''
+
+def test_to_utc_without_offset_uses_local_time():
+    local = datetime.datetime(2020, 6, 1, 12).astimezone()
+    expected = local.astimezone(datetime.timezone.utc).strftime('%Y:%m:%d %H:%M:%S')
+    assert geo_timezone.to_utc('2020:06:01 12:00:00') == expected
+
+@pytest.mark.parametrize('offset, expected', [
+    (datetime.timedelta(0), '+00:00'),
+    (datetime.timedelta(hours=2), '+02:00'),
+    (datetime.timedelta(hours=5, minutes=30), '+05:30'),
+    (datetime.timedelta(hours=-3, minutes=-30), '-03:30'),
+    (datetime.timedelta(hours=-10), '-10:00'),
+])
+def test_format_offset(offset, expected):
+    moment = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone(offset))
+    assert geo_timezone.format_offset(moment) == expected
+
+@pytest.mark.parametrize('data, expected', [
+    ({'geoData': {'latitude': 48.85, 'longitude': 2.35}}, (48.85, 2.35)),
+    ({'geoData': {'latitude': '48.85', 'longitude': '2.35'}}, (48.85, 2.35)),
+    ({'geoData': {'latitude': 0.0, 'longitude': 0.0}}, None),
+    ({'geoData': {'latitude': 95.0, 'longitude': 2.35}}, None),
+    ({'geoData': {'latitude': 48.85, 'longitude': 200.0}}, None),
+    ({'geoData': {'latitude': 'north', 'longitude': 2.35}}, None),
+    ({'geoData': {'latitude': 0.0, 'longitude': 0.0},
+      'geoDataExif': {'latitude': 35.68, 'longitude': 139.69}}, (35.68, 139.69)),
+    ({'geoDataExif': {'latitude': 35.68, 'longitude': 139.69}}, (35.68, 139.69)),
+    ({}, None),
+])
+def test_sidecar_location(data, expected):
+    assert geo_timezone.sidecar_location(data) == expected
+
+@pytest.mark.parametrize('latitude, longitude, zone', [
+    (48.8566, 2.3522, 'Europe/Paris'),
+    (51.5074, -0.1278, 'Europe/London'),
+    (40.7128, -74.0060, 'America/New_York'),
+    (34.0522, -118.2437, 'America/Los_Angeles'),
+    (35.6762, 139.6503, 'Asia/Tokyo'),
+    (28.6139, 77.2090, 'Asia/Kolkata'),
+    (-33.8688, 151.2093, 'Australia/Sydney'),
+    (-23.5505, -46.6333, 'America/Sao_Paulo'),
+])
+def test_zone_at_known_cities(latitude, longitude, zone):
+    assert geo_timezone.zone_at(latitude, longitude) == zone
+
+def test_zone_at_open_sea():
+    assert geo_timezone.zone_at(-45.0, -20.0) is None
+
+def test_tzinfo_at_open_sea_uses_longitude():
+    moment = datetime.datetime(2020, 6, 1, tzinfo=geo_timezone.tzinfo_at(-45.0, -20.0))
+    assert geo_timezone.format_offset(moment) == '-01:00'
+
+@pytest.mark.skipif(geo_timezone.zoneinfo is None or geo_timezone._load_zone('Europe/Paris') is None,
+                    reason="no tz database")
+def test_local_time_follows_daylight_saving():
+    summer = datetime.datetime(2020, 7, 1, 12, tzinfo=datetime.timezone.utc).timestamp()
+    winter = datetime.datetime(2020, 1, 1, 12, tzinfo=datetime.timezone.utc).timestamp()
+    paris = (48.8566, 2.3522)
+    assert geo_timezone.format_offset(geo_timezone.local_time(summer, paris)) == '+02:00'
+    assert geo_timezone.format_offset(geo_timezone.local_time(winter, paris)) == '+01:00'
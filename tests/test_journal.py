@@ -0,0 +1,69 @@
+from gpfix.journal import DISCOVERED, JSON_RESOLVED, MOVED, TAGGED, Journal
+
+def record_run(path):
+    """Record one file at each state, as an interrupted process_images run leaves them."""
+    journal = Journal(path, 'process_images')
+    journal.record('in/a.jpg', DISCOVERED)
+    journal.record('in/b.jpg', DISCOVERED)
+    journal.record('in/b.jpg', JSON_RESOLVED, content_hash='b-hash')
+    journal.record('in/b.jpg', TAGGED)
+    journal.record('in/c.jpg', TAGGED)
+    journal.record('in/c.jpg', MOVED, destination='out/c.jpg')
+    journal.record('in/d.jpg', MOVED, destination='out/d.jpg')
+    journal.close()
+
+def test_resume_loads_the_previous_run(tmp_path):
+    path = tmp_path / 'journal.sqlite'
+    record_run(path)
+    journal = Journal(path, 'process_images', resume=True)
+    try:
+        assert journal.state('in/a.jpg') == DISCOVERED
+        assert journal.state('in/b.jpg') == TAGGED
+        assert journal.state('in/c.jpg') == MOVED
+        assert journal.state('in/e.jpg') is None
+        assert sorted(journal.in_state(MOVED)) == [('in/c.jpg', 'out/c.jpg'), ('in/d.jpg', 'out/d.jpg')]
+        assert journal.in_state(TAGGED) == [('in/b.jpg', None)]
+        assert journal.is_destination('out/c.jpg')
+        assert not journal.is_destination('in/c.jpg')
+        # A resumed run carries on from the loaded states
+        journal.record('in/b.jpg', MOVED, destination='out/b.jpg')
+        assert journal.in_state(TAGGED) == []
+    finally:
+        journal.close()
+    journal = Journal(path, 'process_images', resume=True)
+    try:
+        assert journal.state('in/b.jpg') == MOVED
+        assert journal.is_destination('out/b.jpg')
+    finally:
+        journal.close()
+
+def test_new_run_clears_only_its_own_stage(tmp_path):
+    path = tmp_path / 'journal.sqlite'
+    record_run(path)
+    Journal(path, 'sorting').close()
+    journal = Journal(path, 'process_images', resume=True)
+    try:
+        assert journal.state('in/c.jpg') == MOVED
+    finally:
+        journal.close()
+    Journal(path, 'process_images').close()
+    journal = Journal(path, 'process_images', resume=True)
+    try:
+        assert journal.state('in/c.jpg') is None
+        assert journal.in_state(MOVED) == []
+        assert not journal.is_destination('out/c.jpg')
+    finally:
+        journal.close()
+
+def test_records_are_committed_in_batches(tmp_path):
+    path = tmp_path / 'journal.sqlite'
+    journal = Journal(path, 'sorting', commit_size=2, commit_interval=3600)
+    journal.record('in/a.jpg', MOVED, destination='out/a.jpg')
+    reader = Journal(path, 'sorting', resume=True)
+    assert reader.state('in/a.jpg') is None
+    reader.close()
+    journal.record('in/b.jpg', MOVED, destination='out/b.jpg')
+    reader = Journal(path, 'sorting', resume=True)
+    assert reader.state('in/a.jpg') == reader.state('in/b.jpg') == MOVED
+    reader.close()
+    journal.close()
@@ -0,0 +1,187 @@
+import datetime
+import struct
+import zlib
+
+import pytest
+
+from gpfix import native_exif
+
+OLD = {'DateTimeOriginal': '2001:02:03 04:05:06', 'CreateDate': '2001:02:03 04:05:07', 'ModifyDate': '2001:02:03 04:05:08',
+       'OffsetTimeOriginal': '+00:00'}
+NEW = {'DateTimeOriginal': '2010:05:05 10:00:00', 'CreateDate': '2020:01:01 00:00:00', 'ModifyDate': '2020:01:01 00:00:01',
+       'OffsetTimeOriginal': '+02:00'}
+
+TAGS = {'ModifyDate': (0x0132, 20), 'DateTimeOriginal': (0x9003, 20), 'CreateDate': (0x9004, 20),
+        'OffsetTimeOriginal': (0x9011, 7)}
+
+def tiff(dates, byte_order='II'):
+    """Build a TIFF structure with ModifyDate in IFD0 and the other date tags in the Exif IFD."""
+    prefix = '<' if byte_order == 'II' else '>'
+    ifd0 = [tag for tag in ('ModifyDate',) if tag in dates]
+    exif = [tag for tag in ('DateTimeOriginal', 'CreateDate', 'OffsetTimeOriginal') if tag in dates]
+    ifd0_offset = 8
+    exif_offset = ifd0_offset + 2 + 12 * (len(ifd0) + 1) + 4
+    values_offset = exif_offset + 2 + 12 * len(exif) + 4
+    values = b''
+    locations = {}
+    for tag in ifd0 + exif:
+        locations[tag] = values_offset + len(values)
+        values += dates[tag].encode().ljust(TAGS[tag][1], b'\0')
+
+    def ifd(tags, pointer=None):
+        entries = [struct.pack(prefix + 'HHII', TAGS[tag][0], 2, TAGS[tag][1], locations[tag]) for tag in tags]
+        if pointer is not None:
+            entries.append(struct.pack(prefix + 'HHII', 0x8769, 4, 1, pointer))
+        return struct.pack(prefix + 'H', len(entries)) + b''.join(entries) + b'\0' * 4
+
+    header = byte_order.encode() + struct.pack(prefix + 'HI', 42, ifd0_offset)
+    return header + ifd(ifd0, exif_offset) + ifd(exif) + values
+
+def jpeg(dates, byte_order='II'):
+    app1 = b'Exif\0\0' + tiff(dates, byte_order)
+    return b'\xff\xd8\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + b'\xff\xda\0\x02\0\0\xff\xd9'
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def png(dates):
+    return (b'\x89PNG\r\n\x1a\n'
+            + png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+            + png_chunk(b'eXIf', tiff(dates, 'MM'))
+            + png_chunk(b'IDAT', zlib.compress(b'\0\0'))
+            + png_chunk(b'IEND', b''))
+
+def box(kind, payload):
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+def heic(dates, iinf_version=0, iloc_version=0):
+    """Build a HEIC with an image item and an Exif item, located through iinf and iloc of the given versions."""
+    exif_item = struct.pack('>I', 0) + tiff(dates, 'MM')
+    image_item = b'\0' * 16
+
+    def infe(item_id, item_type):
+        if iinf_version:
+            return box(b'infe', struct.pack('>B3xIH4s', 3, item_id, 0, item_type) + b'\0')
+        return box(b'infe', struct.pack('>B3xHH4s', 2, item_id, 0, item_type) + b'\0')
+
+    count = struct.pack('>I', 2) if iinf_version else struct.pack('>H', 2)
+    iinf = box(b'iinf', struct.pack('>B3x', iinf_version) + count + infe(1, b'hvc1') + infe(2, b'Exif'))
+
+    def iloc(offsets):
+        id_format = '>I' if iloc_version == 2 else '>H'
+        # 4-byte offsets and lengths; version 1 and 2 also carry a 4-byte base offset and index size 0
+        sizes = struct.pack('>BB', 0x44, 0x40 if iloc_version else 0)
+        items = b''
+        for item_id, (offset, length) in enumerate(offsets, 1):
+            items += struct.pack(id_format, item_id)
+            if iloc_version:
+                items += struct.pack('>H', 0)
+            items += struct.pack('>H', 0)
+            if iloc_version:
+                items += struct.pack('>I', offset - 8)
+                offset = 8
+            items += struct.pack('>HII', 1, offset, length)
+        return box(b'iloc', struct.pack('>B3x', iloc_version) + sizes + struct.pack(id_format, len(offsets)) + items)
+
+    ftyp = box(b'ftyp', b'heic' + b'\0' * 4 + b'mif1heic')
+    placeholder = [(8, len(image_item)), (8, len(exif_item))]
+    meta_size = len(box(b'meta', b'\0' * 4 + iinf + iloc(placeholder)))
+    data_start = len(ftyp) + meta_size + 8
+    offsets = [(data_start, len(image_item)), (data_start + len(image_item), len(exif_item))]
+    meta = box(b'meta', b'\0' * 4 + iinf + iloc(offsets))
+    return ftyp + meta + box(b'mdat', image_item + exif_item)
+
+def quicktime_seconds(value):
+    moment = datetime.datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
+    return int((moment - datetime.datetime(1904, 1, 1)).total_seconds())
+
+def mp4(created, modified, version=0):
+    """Build an MP4 whose mvhd, tkhd and mdhd boxes all carry created and modified."""
+    times = struct.pack('>QQ' if version else '>II', quicktime_seconds(created), quicktime_seconds(modified))
+
+    def header(kind, rest):
+        return box(kind, struct.pack('>B3x', version) + times + b'\0' * rest)
+
+    trak = box(b'trak', header(b'tkhd', 72) + box(b'mdia', header(b'mdhd', 12)))
+    moov = box(b'moov', header(b'mvhd', 88) + trak)
+    return box(b'ftyp', b'isom' + b'\0' * 4) + moov + box(b'mdat', b'\0' * 16)
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+# A file patched from OLD to NEW must be byte for byte the file built with NEW
+
+@pytest.mark.parametrize('byte_order', ['II', 'MM'])
+def test_jpeg_round_trip(tmp_path, byte_order):
+    path = write(tmp_path, 'photo.jpg', jpeg(OLD, byte_order))
+    assert native_exif.read_dates(path) == OLD
+    assert native_exif.write_dates(path, NEW)
+    assert path.read_bytes() == jpeg(NEW, byte_order)
+    assert native_exif.read_dates(path) == NEW
+
+def test_png_round_trip_updates_crc(tmp_path):
+    path = write(tmp_path, 'photo.png', png(OLD))
+    assert native_exif.write_dates(path, NEW)
+    # png() computes the chunk CRC over the new dates
+    assert path.read_bytes() == png(NEW)
+
+@pytest.mark.parametrize('iinf_version', [0, 1])
+@pytest.mark.parametrize('iloc_version', [0, 1, 2])
+def test_heic_round_trip(tmp_path, iinf_version, iloc_version):
+    path = write(tmp_path, 'photo.heic', heic(OLD, iinf_version, iloc_version))
+    assert native_exif.write_dates(path, NEW)
+    assert path.read_bytes() == heic(NEW, iinf_version, iloc_version)
+    assert native_exif.read_dates(path) == NEW
+
+@pytest.mark.parametrize('version', [0, 1])
+def test_mp4_round_trip(tmp_path, version):
+    path = write(tmp_path, 'video.mp4', mp4(OLD['CreateDate'], OLD['ModifyDate'], version))
+    assert native_exif.write_dates(path, NEW)
+    # The date the video was taken becomes its creation time, in every header
+    assert path.read_bytes() == mp4(NEW['DateTimeOriginal'], NEW['ModifyDate'], version)
+    assert native_exif.read_dates(path) == {'CreateDate': NEW['DateTimeOriginal'], 'ModifyDate': NEW['ModifyDate']}
+    assert native_exif.holds_dates(path, NEW)
+    assert not native_exif.holds_dates(path, dict(NEW, DateTimeOriginal=NEW['CreateDate']))
+
+def test_mp4_uses_create_date_without_date_time_original(tmp_path):
+    path = write(tmp_path, 'video.mov', mp4(OLD['CreateDate'], OLD['ModifyDate']))
+    assert native_exif.write_dates(path, {'CreateDate': NEW['CreateDate']})
+    assert path.read_bytes() == mp4(NEW['CreateDate'], OLD['ModifyDate'])
+
+def test_mp4_date_before_epoch_leaves_file_unchanged(tmp_path):
+    content = mp4(OLD['CreateDate'], OLD['ModifyDate'])
+    path = write(tmp_path, 'video.mp4', content)
+    assert not native_exif.write_dates(path, {'DateTimeOriginal': '1900:01:01 00:00:00'})
+    assert path.read_bytes() == content
+
+@pytest.mark.parametrize('name, build', [
+    ('photo.jpg', jpeg),
+    ('photo.png', png),
+    ('photo.heic', heic),
+])
+@pytest.mark.parametrize('missing', ['ModifyDate', 'CreateDate', 'OffsetTimeOriginal'])
+def test_missing_tag_leaves_file_unchanged(tmp_path, name, build, missing):
+    content = build({tag: value for tag, value in OLD.items() if tag != missing})
+    path = write(tmp_path, name, content)
+    assert not native_exif.write_dates(path, NEW)
+    assert path.read_bytes() == content
+
+def test_mp4_without_movie_header_is_unchanged(tmp_path):
+    content = box(b'ftyp', b'isom' + b'\0' * 4) + box(b'mdat', b'\0' * 16)
+    path = write(tmp_path, 'video.mp4', content)
+    assert not native_exif.write_dates(path, NEW)
+    assert path.read_bytes() == content
+
+def test_empty_value_leaves_file_unchanged(tmp_path):
+    content = jpeg(OLD)
+    path = write(tmp_path, 'photo.jpg', content)
+    assert not native_exif.write_dates(path, dict(NEW, CreateDate=''))
+    assert path.read_bytes() == content
+
+def test_holds_dates(tmp_path):
+    path = write(tmp_path, 'photo.jpg', jpeg(OLD))
+    assert native_exif.holds_dates(path, OLD)
+    assert not native_exif.holds_dates(path, NEW)
+    assert native_exif.holds_dates(tmp_path / 'photo.gif', OLD) is None
@@ -0,0 +1,19 @@
+import pytest
+
+from gpfix import geo_timezone, process_images
+from gpfix.sidecar_parser import Sidecar
+
+TAKEN = '1590000000'  # 2020-05-20 18:40:00 UTC
+
+@pytest.mark.skipif(geo_timezone.zoneinfo is None or geo_timezone._load_zone('Europe/Paris') is None,
+                    reason="no tz database")
+def test_sidecar_dates_carry_the_offset_of_their_location():
+    sidecar = Sidecar(TAKEN, TAKEN, 48.85, 2.35, '', '')
+    assert process_images.exif_dates_from_sidecar(sidecar, 'photo.jpg.json') == (
+        '2020:05:20 20:40:00', '2020:05:20 20:40:00', '+02:00')
+
+def test_sidecar_dates_without_location_have_no_offset():
+    taken, created, offset = process_images.exif_dates_from_sidecar(Sidecar(TAKEN, TAKEN, None, None, '', ''),
+                                                                    'photo.jpg.json')
+    assert taken == created != ''
+    assert offset == ''
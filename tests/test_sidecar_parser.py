@@ -0,0 +1,59 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from gpfix.sidecar_parser import SidecarStore
+
+def write_sidecar(path, timestamp, mtime_ns=None):
+    path.write_text(json.dumps({'photoTakenTime': {'timestamp': timestamp}, 'title': path.stem}))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+def read(cache_file, paths, prune=False):
+    """Look paths up through a store as process_images does; returns their photo taken timestamps."""
+    store = SidecarStore(cache_file, workers=1)
+    store.prefetch(paths)
+    taken = [store.get(path).photo_taken for path in paths]
+    store.close(prune=prune)
+    return taken
+
+def cached_paths(cache_file):
+    with sqlite3.connect(cache_file) as connection:
+        return sorted(row[0] for row in connection.execute('SELECT path FROM sidecars'))
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / 'sidecar-cache.sqlite')
+
+def test_unchanged_sidecar_comes_from_the_cache(tmp_path, cache_file):
+    path = write_sidecar(tmp_path / 'a.jpg.json', '1000000001', mtime_ns=10 ** 18)
+    assert read(cache_file, [path]) == ['1000000001']
+    # Same size and mtime: the cached fields are used without reading the file
+    write_sidecar(path, '1000000002', mtime_ns=10 ** 18)
+    assert read(cache_file, [path]) == ['1000000001']
+
+@pytest.mark.parametrize('timestamp, mtime_ns', [
+    ('1000000002', 2 * 10 ** 18),   # same size, new mtime
+    ('10000000020', 10 ** 18),      # new size, same mtime
+])
+def test_changed_sidecar_is_parsed_again(tmp_path, cache_file, timestamp, mtime_ns):
+    path = write_sidecar(tmp_path / 'a.jpg.json', '1000000001', mtime_ns=10 ** 18)
+    assert read(cache_file, [path]) == ['1000000001']
+    write_sidecar(path, timestamp, mtime_ns=mtime_ns)
+    assert read(cache_file, [path]) == [timestamp]
+    # The new fields replaced the old row: same size and mtime again are served from the cache
+    write_sidecar(path, timestamp[:-1] + '9', mtime_ns=mtime_ns)
+    assert read(cache_file, [path]) == [timestamp]
+
+def test_rows_not_seen_are_pruned(tmp_path, cache_file):
+    paths = [write_sidecar(tmp_path / f'{name}.jpg.json', '1000000001') for name in 'abc']
+    read(cache_file, paths)
+    assert cached_paths(cache_file) == [str(path) for path in paths]
+    # A partial run keeps every row
+    read(cache_file, paths[:1])
+    assert cached_paths(cache_file) == [str(path) for path in paths]
+    read(cache_file, paths[1:], prune=True)
+    assert cached_paths(cache_file) == [str(path) for path in paths[1:]]